@@ -1,12 +1,14 @@
 """Centralized configuration for the Talking Rabbitt backend."""
 from __future__ import annotations
 
+import os
 from pathlib import Path
-from typing import Final
+from typing import Final, Optional
 
 BASE_DIR: Final[Path] = Path(__file__).resolve().parents[2]
 DATA_DIR: Final[Path] = BASE_DIR / "data"
 WAREHOUSE_DIR: Final[Path] = DATA_DIR / "warehouse"
+# Legacy single-file fact table; the warehouse is now partitioned and manifest-driven.
 FACT_TABLE_PATH: Final[Path] = WAREHOUSE_DIR / "sales_fact.parquet"
 UPLOAD_DIR: Final[Path] = DATA_DIR / "uploads"
 SEED_DATA_PATH: Final[Path] = DATA_DIR / "sales_seed.csv"
@@ -14,4 +16,88 @@ SEED_DATA_PATH: Final[Path] = DATA_DIR / "sales_seed.csv"
 # LangChain / LLM settings
 DEFAULT_LLM_MODEL: Final[str] = "gpt-4o-mini"
 MAX_CHAT_HISTORY: Final[int] = 8
+# "openai" (used when OPENAI_API_KEY is set) or "fake", an offline streaming stand-in.
+CHAT_MODEL: Final[str] = os.environ.get("RABBITT_CHAT_MODEL", "openai").lower()
+# LLM narratives are reused for identical questions over unchanged insights and data.
+CHAT_CACHE_TTL_SECONDS: Final[float] = float(
+    os.environ.get("RABBITT_CHAT_CACHE_TTL_SECONDS", "900")
+)
+CHAT_CACHE_MAX_ENTRIES: Final[int] = int(os.environ.get("RABBITT_CHAT_CACHE_MAX_ENTRIES", "1024"))
+CHAT_CACHE_MAX_BYTES: Final[int] = int(
+    os.environ.get("RABBITT_CHAT_CACHE_MAX_BYTES", str(4 * 1024 * 1024))
+)
+# Conversation history per session: least recently used sessions leave memory past either
+# bound. Set RABBITT_CHAT_SESSION_DB to a file path to keep sessions in SQLite as well.
+CHAT_SESSION_MAX: Final[int] = int(os.environ.get("RABBITT_CHAT_SESSION_MAX", "10000"))
+CHAT_SESSION_MAX_BYTES: Final[int] = int(
+    os.environ.get("RABBITT_CHAT_SESSION_MAX_BYTES", str(16 * 1024 * 1024))
+)
+_CHAT_SESSION_DB = os.environ.get("RABBITT_CHAT_SESSION_DB", "")
+CHAT_SESSION_DB: Final[Optional[Path]] = Path(_CHAT_SESSION_DB) if _CHAT_SESSION_DB else None
 
+# Text-to-speech: "gtts" (when installed) or "fake", an offline stand-in emitting silent MP3.
+VOICE_ENGINE: Final[str] = os.environ.get("RABBITT_VOICE_ENGINE", "gtts").lower()
+# Synthesized audio is cached on disk per (engine, language, text), least recently used first out.
+VOICE_CACHE_DIR: Final[Path] = DATA_DIR / "voice-cache"
+VOICE_CACHE_MAX_BYTES: Final[int] = int(
+    os.environ.get("RABBITT_VOICE_CACHE_MAX_BYTES", str(256 * 1024 * 1024))
+)
+# Speech-to-text: "openai" (used when OPENAI_API_KEY is set) or "fake", a local stand-in.
+TRANSCRIBE_BACKEND: Final[str] = os.environ.get("RABBITT_TRANSCRIBE_BACKEND", "openai").lower()
+TRANSCRIBE_MAX_CONCURRENCY: Final[int] = int(
+    os.environ.get("RABBITT_TRANSCRIBE_MAX_CONCURRENCY", "4")
+)
+TRANSCRIBE_TIMEOUT_SECONDS: Final[float] = float(
+    os.environ.get("RABBITT_TRANSCRIBE_TIMEOUT_SECONDS", "60")
+)
+# Larger recordings are refused while the upload is still arriving (OpenAI accepts 25 MB).
+TRANSCRIBE_MAX_UPLOAD_BYTES: Final[int] = int(
+    os.environ.get("RABBITT_TRANSCRIBE_MAX_UPLOAD_BYTES", str(25 * 1024 * 1024))
+)
+
+
+# Insight engine backend: "pandas" (in-memory frame + aggregate cube) or "duckdb"
+# (SQL pushdown over the Parquet warehouse, for datasets larger than worker RAM).
+INSIGHT_ENGINE: Final[str] = os.environ.get("RABBITT_INSIGHT_ENGINE", "pandas").lower()
+DUCKDB_THREADS: Final[int] = int(os.environ.get("RABBITT_DUCKDB_THREADS", "0"))
+
+# Compact in-memory fact table: categorical text dimensions, narrow integers and float32
+# ratios (see ``services/dtypes.py``). Set to 0 to keep the 64-bit/object types.
+COMPACT_FRAME: Final[bool] = os.environ.get("RABBITT_COMPACT_FRAME", "1") != "0"
+
+# Result cache shared by all metric/insight endpoints (bytes of pickled results).
+RESULT_CACHE_MAX_BYTES: Final[int] = int(
+    os.environ.get("RABBITT_RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+)
+
+# Background compaction merges partitions holding this many files below the size threshold.
+COMPACTION_MIN_FILES: Final[int] = int(os.environ.get("RABBITT_COMPACTION_MIN_FILES", "4"))
+COMPACTION_SMALL_FILE_BYTES: Final[int] = int(
+    os.environ.get("RABBITT_COMPACTION_SMALL_FILE_BYTES", str(32 * 1024 * 1024))
+)
+# After an upload, other workers keep serving the previous version until the uploading
+# worker's background compaction has written the new shared snapshot, for at most this long.
+SNAPSHOT_GRACE_SECONDS: Final[float] = float(
+    os.environ.get("RABBITT_SNAPSHOT_GRACE_SECONDS", "30")
+)
+
+# Uploads are streamed to disk in chunks and parsed this many rows at a time, which bounds
+# ingest memory independently of the file size. Larger uploads are refused with 413 while
+# they are still arriving.
+UPLOAD_CHUNK_BYTES: Final[int] = int(os.environ.get("RABBITT_UPLOAD_CHUNK_BYTES", str(1024 * 1024)))
+UPLOAD_MAX_BYTES: Final[int] = int(
+    os.environ.get("RABBITT_UPLOAD_MAX_BYTES", str(2 * 1024 * 1024 * 1024))
+)
+UPLOAD_BATCH_ROWS: Final[int] = int(os.environ.get("RABBITT_UPLOAD_BATCH_ROWS", "100000"))
+
+# Exports are produced in batches of this many rows so memory stays flat for large results.
+EXPORT_BATCH_ROWS: Final[int] = int(os.environ.get("RABBITT_EXPORT_BATCH_ROWS", "50000"))
+
+# Worker threads and queued-job limits for the engine pool (cheap filtered reads) and the
+# heavy pool (exports, uploads, full-history scans, LLM/speech calls). 0 queue = unbounded.
+ENGINE_WORKERS: Final[int] = int(
+    os.environ.get("RABBITT_ENGINE_WORKERS", str(min(32, (os.cpu_count() or 1) + 4)))
+)
+ENGINE_QUEUE_LIMIT: Final[int] = int(os.environ.get("RABBITT_ENGINE_QUEUE_LIMIT", "256"))
+HEAVY_WORKERS: Final[int] = int(os.environ.get("RABBITT_HEAVY_WORKERS", "2"))
+HEAVY_QUEUE_LIMIT: Final[int] = int(os.environ.get("RABBITT_HEAVY_QUEUE_LIMIT", "16"))
@@ -1,10 +1,35 @@
 from __future__ import annotations
 
-from fastapi import FastAPI, UploadFile, File, HTTPException
+import asyncio
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Literal, Optional
+
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
-
-from .config import DATA_DIR
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+from .config import (
+    CHAT_SESSION_DB,
+    CHAT_SESSION_MAX,
+    CHAT_SESSION_MAX_BYTES,
+    DATA_DIR,
+    DUCKDB_THREADS,
+    ENGINE_QUEUE_LIMIT,
+    ENGINE_WORKERS,
+    EXPORT_BATCH_ROWS,
+    HEAVY_QUEUE_LIMIT,
+    HEAVY_WORKERS,
+    INSIGHT_ENGINE,
+    RESULT_CACHE_MAX_BYTES,
+    TRANSCRIBE_MAX_UPLOAD_BYTES,
+    UPLOAD_CHUNK_BYTES,
+    UPLOAD_MAX_BYTES,
+    VOICE_CACHE_DIR,
+    VOICE_CACHE_MAX_BYTES,
+)
 from .models.schemas import (
     FilterResponse,
     KPIResponse,
@@ -17,19 +42,29 @@ from .models.schemas import (
     TranscriptionResponse,
     RecommendationResponse,
     AnomalyResponse,
+    AnomalyScanRequest,
     ExportRequest,
     ComparisonRequest,
+    PeriodKPIRequest,
+    DashboardRequest,
     InventorySummaryResponse,
     InventorySeriesResponse,
     SupplyChainResponse,
     MarketingPerformanceResponse,
 )
+from .services.anomalies import AnomalyMonitor
+from .services.cache import ResultCache
 from .services.data_loader import DataRepository
-from .services.insights import InsightEngine
+from .services.duckdb_engine import DuckDBInsightEngine
+from .services.insights import BaseInsightEngine, InsightEngine
 from .services.chat import ChatService
-from .services.voice import VoiceService
+from .services.sessions import SessionStore
+from .services.voice import AudioCache, VoiceService
 from .services.transcribe import TranscriptionService
+from .services.uploads import FileReceiver, UploadError
+from .services.executors import BoundedExecutor, ExecutorSaturated
 from .services.export import ExportService
+from .services.serialization import FastJSONResponse, head, sse_event
 
 
 app = FastAPI(title="Talking Rabbitt API", version="0.1.0")
@@ -41,17 +76,162 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Hot list endpoints accept ``?shape=columns`` for ``{"key": [...], ...}`` payloads.
+Shape = Literal["records", "columns"]
+
 repository = DataRepository()
-engine = InsightEngine(repository.bootstrap().frame)
-chat_service = ChatService(engine)
-voice_service = VoiceService()
+result_cache = ResultCache(RESULT_CACHE_MAX_BYTES)
+# Opened once, off the event loop, by ``_open_engine``; importing this module reads no rows.
+engine: Optional[BaseInsightEngine] = None
+chat_service: Optional[ChatService] = None
+voice_service = VoiceService(cache=AudioCache(VOICE_CACHE_DIR, VOICE_CACHE_MAX_BYTES))
 transcription_service = TranscriptionService()
+# Cheap engine reads and heavy jobs (exports, uploads, full-history scans, LLM and speech
+# calls) run on separate pools so slow work cannot occupy the workers KPI calls need.
+engine_pool = BoundedExecutor("engine", ENGINE_WORKERS, ENGINE_QUEUE_LIMIT)
+heavy_pool = BoundedExecutor("heavy", HEAVY_WORKERS, HEAVY_QUEUE_LIMIT)
+
+
+def _open_engine() -> None:
+    """
+    Load the dataset once and build the engine. The pandas engine maps the shared snapshot
+    (rows, index and cube) when the current version has one, so a restart reopens it
+    instead of reading the warehouse and rebuilding.
+    """
+    global engine, chat_service
+    started = time.perf_counter()
+    if INSIGHT_ENGINE == "duckdb":
+        opened = DuckDBInsightEngine(repository.fact_files(), threads=DUCKDB_THREADS or None)
+    else:
+        dataset = repository.dataset
+        opened = InsightEngine(dataset.frame, dataset.index, dataset.cube)
+    opened.cache = result_cache
+    opened.monitor = AnomalyMonitor()
+    opened.track_anomalies()
+    result_cache.set_version(repository.version)
+    sessions = SessionStore(CHAT_SESSION_MAX, CHAT_SESSION_MAX_BYTES, CHAT_SESSION_DB)
+    engine, chat_service = opened, ChatService(opened, sessions)
+    _readiness["load_seconds"] = round(time.perf_counter() - started, 3)
+
+
+_opening: Optional[asyncio.Future] = None
+_readiness = {"load_seconds": None, "error": None}
+
+
+def _ensure_open() -> asyncio.Future:
+    """
+    Start opening the engine on first use; every caller awaits the same load. A failed
+    load is forgotten once it settles, so its waiters see the error and the next request
+    (or readiness probe) starts a fresh attempt.
+    """
+    global _opening
+    if _opening is None:
+        _opening = asyncio.ensure_future(heavy_pool.run(_open_engine))
+        _opening.add_done_callback(_opened)
+    return _opening
+
+
+def _opened(future: asyncio.Future) -> None:
+    global _opening
+    error = "cancelled" if future.cancelled() else future.exception()
+    _readiness["error"] = None if error is None else str(error)
+    if error is not None and _opening is future:
+        _opening = None
+
+
+def _sync_engine(changed_from: Optional[str] = None, data_changed: bool = True) -> None:
+    """
+    Point the engine at the current dataset. ``changed_from`` is the earliest date whose
+    rows changed, so the anomaly monitor only re-scores from there (everything when None).
+    """
+    if isinstance(engine, DuckDBInsightEngine):
+        engine.update_source(repository.fact_files())
+    else:
+        dataset = repository.dataset
+        engine.update_frame(dataset.frame, dataset.index, dataset.cube)
+    if data_changed:
+        engine.track_anomalies(since=changed_from)
+    result_cache.set_version(repository.version)
+
+
+async def _compact_warehouse() -> None:
+    # Also writes the shared snapshot of an upload, so the engine moves to the mapping.
+    if await heavy_pool.run(repository.compact):
+        _sync_engine(data_changed=False)
+
+
+def _follow_published_version() -> None:
+    """Adopt a version published by another worker process."""
+    if isinstance(engine, InsightEngine):
+        # Maps the shared snapshot the publishing worker writes; until it is there, this
+        # worker keeps serving the version it has.
+        if not repository.follow():
+            return
+    else:
+        repository.reload()
+    _sync_engine()
+
+
+_follow_lock = asyncio.Lock()
+# A version whose adoption was skipped (pool saturated) is retried at most this often.
+FOLLOW_RETRY_SECONDS = 1.0
+_follow_attempt = {"key": None, "at": 0.0}
+
+
+def _follow_due() -> bool:
+    """
+    Whether this request should adopt the version another worker published. Checked on the
+    event loop from the manifest and the snapshot pointer alone, so no pool job is queued
+    while the publishing worker is still writing the snapshot.
+    """
+    if _follow_lock.locked():
+        return False  # another request is adopting it; serve the current version meanwhile
+    if isinstance(engine, InsightEngine) and not repository.can_follow():
+        return False
+    key = repository.published_key()
+    if _follow_attempt["key"] == key:
+        return time.monotonic() - _follow_attempt["at"] >= FOLLOW_RETRY_SECONDS
+    return True
+
+
+# Probes answer while the dataset is still opening; every other route waits for it.
+UNGATED_PATHS = {"/api/health", "/api/ready"}
+
+
+@app.middleware("http")
+async def _pick_up_published_version(request: Request, call_next):
+    if request.url.path in UNGATED_PATHS:
+        return await call_next(request)
+    await asyncio.shield(_ensure_open())
+    # One stat() of the manifest per request; uploads and compactions in other workers
+    # are adopted before this request reads the data (uploads once their snapshot is out).
+    if repository.stale() and _follow_due():
+        async with _follow_lock:
+            _follow_attempt.update(key=repository.published_key(), at=time.monotonic())
+            try:
+                await heavy_pool.run(_follow_published_version)
+            except ExecutorSaturated:
+                pass  # serve this request from the current version; retried after a pause
+    return await call_next(request)
 
 
 @app.on_event("startup")
 async def _startup() -> None:
-    dataset = repository.refresh()
-    engine.update_frame(dataset.frame)
+    # Open in the background: the worker accepts connections and reports readiness on
+    # /api/ready while a large table is mapped or built.
+    _ensure_open()
+
+
+@app.on_event("shutdown")
+async def _shutdown() -> None:
+    engine_pool.shutdown()
+    heavy_pool.shutdown()
+    await transcription_service.aclose()
+
+
+@app.exception_handler(ExecutorSaturated)
+async def _saturated(request: Request, exc: ExecutorSaturated) -> JSONResponse:
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
 
 
 @app.get("/api/health")
@@ -59,27 +239,63 @@ async def healthcheck() -> dict:
     return {"status": "ok", "data_dir": str(DATA_DIR)}
 
 
+@app.get("/api/ready")
+async def readiness() -> JSONResponse:
+    """
+    Readiness probe: 503 until the dataset is open, so traffic waits for a warm worker.
+    After a failed load it reports the last error and starts another attempt.
+    """
+    opening = _ensure_open()
+    ready = opening.done() and not opening.cancelled() and opening.exception() is None
+    content = {
+        "ready": ready,
+        "engine": INSIGHT_ENGINE,
+        "version": repository.version if ready else None,
+        "load_seconds": _readiness["load_seconds"],
+    }
+    if not ready and _readiness["error"] is not None:
+        content["error"] = _readiness["error"]
+    return JSONResponse(status_code=200 if ready else 503, content=content)
+
+
+@app.get("/api/cache/stats")
+async def cache_stats() -> dict:
+    return result_cache.stats()
+
+
+@app.get("/api/chat/stats")
+async def chat_stats() -> dict:
+    return chat_service.stats()
+
+
+@app.get("/api/executors/stats")
+async def executor_stats() -> dict:
+    return {"engine": engine_pool.stats(), "heavy": heavy_pool.stats()}
+
+
+@app.get("/api/memory")
+async def memory() -> dict:
+    if not isinstance(engine, InsightEngine):
+        raise HTTPException(
+            status_code=400, detail="The memory report covers the in-memory (pandas) engine."
+        )
+    return await engine_pool.run(engine.memory_report)
+
+
 @app.get("/api/filters", response_model=FilterResponse)
 async def filters() -> FilterResponse:
-    return FilterResponse(**repository.dataset.to_filters())
+    return FilterResponse(**await engine_pool.run(engine.filter_options))
 
 
 @app.get("/api/profile")
 async def profile() -> dict:
-    frame = repository.dataset.frame
-    return {
-        "rows": len(frame),
-        "columns": len(frame.columns),
-        "latest_date": frame["date"].max().date().isoformat(),
-        "earliest_date": frame["date"].min().date().isoformat(),
-        "categories": frame["category"].nunique(),
-        "regions": frame["region"].nunique(),
-    }
+    return await engine_pool.run(engine.profile)
 
 
 @app.post("/api/metrics/kpi", response_model=KPIResponse)
 async def kpi(payload: MetricRequest) -> KPIResponse:
-    block = engine.kpis(
+    block = await engine_pool.run(
+        engine.kpis,
         start=payload.start,
         end=payload.end,
         region=payload.region,
@@ -92,8 +308,9 @@ async def kpi(payload: MetricRequest) -> KPIResponse:
 
 
 @app.post("/api/metrics/breakdown")
-async def breakdown(payload: MetricRequest, group_by: str = "region"):
-    data = engine.breakdown(
+async def breakdown(payload: MetricRequest, group_by: str = "region", shape: Shape = "records"):
+    data = await engine_pool.run(
+        engine.breakdown,
         by=group_by,
         start=payload.start,
         end=payload.end,
@@ -102,13 +319,17 @@ async def breakdown(payload: MetricRequest, group_by: str = "region"):
         channel=payload.channel,
         promo_flag=payload.promo_flag,
         campaign=payload.campaign,
+        shape=shape,
     )
-    return {"group_by": group_by, "data": data}
+    return FastJSONResponse({"group_by": group_by, "data": data})
 
 
 @app.post("/api/metrics/series")
-async def series(payload: MetricRequest, metric: str = "net_sales", freq: str = "M"):
-    data = engine.series(
+async def series(
+    payload: MetricRequest, metric: str = "net_sales", freq: str = "M", shape: Shape = "records"
+):
+    data = await engine_pool.run(
+        engine.series,
         metric=metric,
         freq=freq,
         start=payload.start,
@@ -118,14 +339,41 @@ async def series(payload: MetricRequest, metric: str = "net_sales", freq: str =
         channel=payload.channel,
         promo_flag=payload.promo_flag,
         campaign=payload.campaign,
+        shape=shape,
     )
-    return {"metric": metric, "freq": freq, "data": data}
+    return FastJSONResponse({"metric": metric, "freq": freq, "data": data})
+
+
+@app.post("/api/dashboard")
+async def dashboard(payload: DashboardRequest):
+    """Compute several dashboard widgets from a single filtered pass."""
+    try:
+        widgets = await engine_pool.run(
+            engine.dashboard,
+            widgets=payload.widgets,
+            freq=payload.freq,
+            start=payload.start,
+            end=payload.end,
+            region=payload.region,
+            category=payload.category,
+            channel=payload.channel,
+            promo_flag=payload.promo_flag,
+            campaign=payload.campaign,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    widgets = dict(widgets)
+    if "anomalies" in widgets:
+        widgets["anomalies"] = widgets["anomalies"][:5]
+    return FastJSONResponse({"freq": payload.freq, "widgets": widgets})
 
 
 @app.post("/api/chat", response_model=ChatResponse)
 async def chat(payload: ChatRequest) -> ChatResponse:
-    result = chat_service.ask(
+    result = await heavy_pool.run(
+        chat_service.ask,
         payload.question,
+        session_id=payload.session_id,
         start=payload.start,
         end=payload.end,
         region=payload.region,
@@ -137,22 +385,150 @@ async def chat(payload: ChatRequest) -> ChatResponse:
     return ChatResponse(**result)
 
 
+@app.post("/api/chat/stream")
+async def chat_stream(payload: ChatRequest) -> StreamingResponse:
+    """
+    The chat answer as server-sent events: ``insight`` (structured data), ``token``
+    (narrative chunks as the model produces them) and a final ``history`` event.
+    """
+    events = chat_service.stream(
+        payload.question,
+        session_id=payload.session_id,
+        start=payload.start,
+        end=payload.end,
+        region=payload.region,
+        category=payload.category,
+        channel=payload.channel,
+        promo_flag=payload.promo_flag,
+        campaign=payload.campaign,
+    )
+    # The first step goes through admission control, so a saturated pool answers 503
+    # before the stream starts.
+    first = await heavy_pool.run(next, events)
+
+    async def body():
+        yield sse_event(*first)
+        try:
+            async for event, data in heavy_pool.iterate(events):
+                yield sse_event(event, data)
+        except Exception as exc:  # the status line is already sent; report in-band
+            yield sse_event("error", {"detail": str(exc)})
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.post("/api/voice/speak", response_model=VoiceResponse)
 async def voice(payload: VoiceRequest) -> VoiceResponse:
-    result = voice_service.synthesize(payload.text)
+    result = await heavy_pool.run(voice_service.synthesize, payload.text, payload.lang)
     return VoiceResponse(**result)
 
 
-@app.post("/api/voice/transcribe", response_model=TranscriptionResponse)
-async def transcribe_audio(file: UploadFile = File(...)) -> TranscriptionResponse:
-    contents = await file.read()
-    result = transcription_service.transcribe(contents, file.filename)
+@app.get("/api/voice/speak/stream")
+async def voice_stream(
+    request: Request,
+    text: str = Query(..., min_length=1, max_length=5000),
+    lang: str = Query("en", max_length=16),
+) -> Response:
+    """
+    The spoken ``text`` as ``audio/mpeg``, streamed while it is synthesized. A GET, so an
+    ``<audio>`` element can start playing before synthesis finishes; the URL names the
+    content, so browsers may cache it and revalidate by ETag.
+    """
+    if not voice_service.available:
+        raise HTTPException(status_code=503, detail="Voice synthesis is unavailable.")
+    etag = f'"{voice_service.key(text, lang)}"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=86400"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    chunks = voice_service.stream(text, lang)
+    # As for chat streams, the first chunk passes admission control before the 200 is sent.
+    first = await heavy_pool.run(next, chunks, b"")
+
+    async def body():
+        yield first
+        async for chunk in heavy_pool.iterate(chunks):
+            yield chunk
+
+    return StreamingResponse(body(), media_type="audio/mpeg", headers=headers)
+
+
+@app.get("/api/voice/stats")
+async def voice_stats() -> dict:
+    return voice_service.stats()
+
+
+async def _limited_body(request: Request, max_bytes: int):
+    """The request body, cut off with a 413 as soon as more than ``max_bytes`` arrive."""
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > max_bytes:
+            raise HTTPException(status_code=413, detail=f"Upload exceeds {max_bytes} bytes.")
+        yield chunk
+
+
+@app.post(
+    "/api/voice/transcribe",
+    response_model=TranscriptionResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": {"file": {"type": "string", "format": "binary"}},
+                        "required": ["file"],
+                    }
+                }
+            },
+        }
+    },
+)
+async def transcribe_audio(request: Request) -> TranscriptionResponse:
+    """
+    Transcribe the uploaded ``file``. The multipart body is parsed here rather than by
+    FastAPI so the size limit applies while it streams in: an oversized recording is
+    refused without being spooled. The audio lands in a private temporary directory that
+    is removed however the request ends, 413 included, and is handed to the async
+    backend as a file, without copying it into memory; the call never occupies a pool
+    worker.
+    """
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > TRANSCRIBE_MAX_UPLOAD_BYTES:
+        raise HTTPException(
+            status_code=413, detail=f"Upload exceeds {TRANSCRIBE_MAX_UPLOAD_BYTES} bytes."
+        )
+    with tempfile.TemporaryDirectory(prefix="transcribe-") as spool:
+        try:
+            receiver = FileReceiver(
+                request.headers.get("content-type", ""),
+                "file",
+                lambda filename: Path(spool) / "audio",
+            )
+            received = await receiver.receive(
+                _limited_body(request, TRANSCRIBE_MAX_UPLOAD_BYTES)
+            )
+        except UploadError as exc:
+            raise HTTPException(status_code=422, detail=str(exc)) from exc
+        with received.path.open("rb") as audio:
+            result = await transcription_service.transcribe(audio, received.filename)
     return TranscriptionResponse(**result)
 
 
+@app.get("/api/voice/transcribe/stats")
+async def transcription_stats() -> dict:
+    return transcription_service.stats()
+
+
 @app.post("/api/insights/recommendations", response_model=RecommendationResponse)
 async def recommendations(payload: MetricRequest) -> RecommendationResponse:
-    items = engine.recommendations(
+    items = await engine_pool.run(
+        engine.recommendations,
         start=payload.start,
         end=payload.end,
         region=payload.region,
@@ -164,9 +540,14 @@ async def recommendations(payload: MetricRequest) -> RecommendationResponse:
     return RecommendationResponse(items=items)
 
 
-@app.post("/api/insights/anomalies", response_model=AnomalyResponse)
-async def anomalies(payload: MetricRequest) -> AnomalyResponse:
-    data = engine.anomalies(
+@app.post(
+    "/api/insights/anomalies",
+    response_class=FastJSONResponse,
+    responses={200: {"model": AnomalyResponse}},
+)
+async def anomalies(payload: MetricRequest, shape: Shape = "records"):
+    data = await heavy_pool.run(
+        engine.anomalies,
         start=payload.start,
         end=payload.end,
         region=payload.region,
@@ -174,28 +555,99 @@ async def anomalies(payload: MetricRequest) -> AnomalyResponse:
         channel=payload.channel,
         promo_flag=payload.promo_flag,
         campaign=payload.campaign,
+        shape=shape,
     )
-    return AnomalyResponse(items=data[:5])
-
-
-@app.post("/api/upload", response_model=UploadResponse)
-async def upload(file: UploadFile = File(...)) -> UploadResponse:
-    if not file.filename.endswith(".csv"):
+    return FastJSONResponse({"items": head(data, 5)})
+
+
+@app.post("/api/insights/anomalies/segments")
+async def anomaly_scan(payload: AnomalyScanRequest, shape: Shape = "records"):
+    """Rank anomalies across every region x category x channel segment in one scan."""
+    try:
+        data = await heavy_pool.run(
+            engine.anomaly_scan,
+            metrics=payload.metrics,
+            window=payload.window,
+            threshold=payload.threshold,
+            limit=payload.limit,
+            start=payload.start,
+            end=payload.end,
+            region=payload.region,
+            category=payload.category,
+            channel=payload.channel,
+            promo_flag=payload.promo_flag,
+            campaign=payload.campaign,
+            shape=shape,
+        )
+    except KeyError as exc:
+        raise HTTPException(status_code=400, detail=f"Unknown metric: {exc.args[0]}") from exc
+    return FastJSONResponse({"items": data})
+
+
+def _csv_upload_path(filename: str) -> Path:
+    if not filename.endswith(".csv"):
         raise HTTPException(status_code=400, detail="Only CSV uploads are supported.")
-    contents = await file.read()
-    before = len(repository.dataset.frame)
-    dataset = repository.append_upload(contents, file.filename)
-    engine.update_frame(dataset.frame)
+    return repository.upload_path(filename)
+
+
+@app.post(
+    "/api/upload",
+    response_model=UploadResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": {"file": {"type": "string", "format": "binary"}},
+                        "required": ["file"],
+                    }
+                }
+            },
+        }
+    },
+)
+async def upload(request: Request, background_tasks: BackgroundTasks) -> UploadResponse:
+    """
+    Ingest the uploaded CSV ``file``. The multipart body streams straight into the upload
+    directory, written on the thread pool and cut off with a 413 past
+    ``RABBITT_UPLOAD_MAX_BYTES``; it is then parsed in bounded batches on the heavy pool so
+    progress stays queryable while a large file is ingested.
+    """
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > UPLOAD_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds {UPLOAD_MAX_BYTES} bytes.")
+    try:
+        receiver = FileReceiver(
+            request.headers.get("content-type", ""),
+            "file",
+            _csv_upload_path,
+            buffer_bytes=UPLOAD_CHUNK_BYTES,
+        )
+        received = await receiver.receive(_limited_body(request, UPLOAD_MAX_BYTES))
+    except UploadError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    progress = repository.track_ingest(Path(received.filename).name, received.size)
+    rows = await heavy_pool.run(repository.ingest_csv, received.path, progress=progress)
+    await heavy_pool.run(_sync_engine, changed_from=progress.min_date)
+    background_tasks.add_task(_compact_warehouse)
     return UploadResponse(
-        rows_ingested=len(dataset.frame) - before,
-        total_rows=len(dataset.frame),
-        message=f"File {file.filename} ingested successfully.",
+        rows_ingested=rows,
+        total_rows=repository.total_rows,
+        message=f"File {received.filename} ingested successfully.",
     )
 
 
+@app.get("/api/upload/progress")
+async def upload_progress() -> list:
+    return [asdict(progress) for progress in reversed(repository.ingests.values())]
+
+
 @app.post("/api/inventory/summary", response_model=InventorySummaryResponse)
 async def inventory_summary(payload: MetricRequest) -> InventorySummaryResponse:
-    summary = engine.inventory_summary(
+    summary = await engine_pool.run(
+        engine.inventory_summary,
         start=payload.start,
         end=payload.end,
         region=payload.region,
@@ -207,9 +659,14 @@ async def inventory_summary(payload: MetricRequest) -> InventorySummaryResponse:
     return InventorySummaryResponse(**summary)
 
 
-@app.post("/api/inventory/series", response_model=InventorySeriesResponse)
-async def inventory_series(payload: MetricRequest) -> InventorySeriesResponse:
-    points = engine.inventory_series(
+@app.post(
+    "/api/inventory/series",
+    response_class=FastJSONResponse,
+    responses={200: {"model": InventorySeriesResponse}},
+)
+async def inventory_series(payload: MetricRequest, shape: Shape = "records"):
+    points = await engine_pool.run(
+        engine.inventory_series,
         start=payload.start,
         end=payload.end,
         region=payload.region,
@@ -217,13 +674,15 @@ async def inventory_series(payload: MetricRequest) -> InventorySeriesResponse:
         channel=payload.channel,
         promo_flag=payload.promo_flag,
         campaign=payload.campaign,
+        shape=shape,
     )
-    return InventorySeriesResponse(points=points)
+    return FastJSONResponse({"points": points})
 
 
 @app.post("/api/supply/summary", response_model=SupplyChainResponse)
 async def supply_summary(payload: MetricRequest) -> SupplyChainResponse:
-    summary = engine.supply_chain_summary(
+    summary = await engine_pool.run(
+        engine.supply_chain_summary,
         start=payload.start,
         end=payload.end,
         region=payload.region,
@@ -235,9 +694,14 @@ async def supply_summary(payload: MetricRequest) -> SupplyChainResponse:
     return SupplyChainResponse(**summary)
 
 
-@app.post("/api/marketing/performance", response_model=MarketingPerformanceResponse)
-async def marketing_performance(payload: MetricRequest) -> MarketingPerformanceResponse:
-    campaigns = engine.marketing_performance(
+@app.post(
+    "/api/marketing/performance",
+    response_class=FastJSONResponse,
+    responses={200: {"model": MarketingPerformanceResponse}},
+)
+async def marketing_performance(payload: MetricRequest, shape: Shape = "records"):
+    campaigns = await engine_pool.run(
+        engine.marketing_performance,
         start=payload.start,
         end=payload.end,
         region=payload.region,
@@ -245,14 +709,15 @@ async def marketing_performance(payload: MetricRequest) -> MarketingPerformanceR
         channel=payload.channel,
         promo_flag=payload.promo_flag,
         campaign=payload.campaign,
+        shape=shape,
     )
-    return MarketingPerformanceResponse(campaigns=campaigns)
+    return FastJSONResponse({"campaigns": campaigns})
 
 
 @app.post("/api/export")
 async def export_data(payload: ExportRequest):
     """Export filtered data in requested format."""
-    filtered = engine._filter_frame(
+    filters = dict(
         start=payload.start,
         end=payload.end,
         region=payload.region,
@@ -261,14 +726,27 @@ async def export_data(payload: ExportRequest):
         promo_flag=payload.promo_flag,
         campaign=payload.campaign,
     )
-    result = ExportService.prepare_export(
-        filtered,
-        fmt=payload.format,
-        metric=payload.metric,
-    )
+    if payload.format == "excel":
+        # XLSX is a zip archive written in one go, so it is still built in memory.
+        frame = await heavy_pool.run(engine._filter_frame, **filters)
+        result = await heavy_pool.run(
+            ExportService.prepare_export, frame, fmt=payload.format, metric=payload.metric
+        )
+        filename = f"rabbitt_export_{payload.format}.{result['extension']}"
+        return Response(
+            content=result["data"],
+            media_type=result["content_type"],
+            headers={"Content-Disposition": f"attachment; filename={filename}"},
+        )
+    columns = None if payload.metric == "all" else ["date", payload.metric]
+    batches = await heavy_pool.run(engine.export_batches, columns, EXPORT_BATCH_ROWS, **filters)
+    try:
+        result = ExportService.stream_export(batches, fmt=payload.format)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     filename = f"rabbitt_export_{payload.format}.{result['extension']}"
-    return Response(
-        content=result["data"],
+    return StreamingResponse(
+        heavy_pool.iterate(result["chunks"]),
         media_type=result["content_type"],
         headers={"Content-Disposition": f"attachment; filename={filename}"},
     )
@@ -277,17 +755,9 @@ async def export_data(payload: ExportRequest):
 @app.post("/api/comparison")
 async def comparison(payload: ComparisonRequest):
     """Compare KPIs between two time periods."""
-    base_kpi = engine.kpis(
-        start=payload.base_start,
-        end=payload.base_end,
-        region=payload.region,
-        category=payload.category,
-        channel=payload.channel,
-        campaign=payload.campaign,
-    )
-    compare_kpi = engine.kpis(
-        start=payload.compare_start,
-        end=payload.compare_end,
+    base_kpi, compare_kpi = await engine_pool.run(
+        engine.period_kpis,
+        [(payload.base_start, payload.base_end), (payload.compare_start, payload.compare_end)],
         region=payload.region,
         category=payload.category,
         channel=payload.channel,
@@ -303,3 +773,28 @@ async def comparison(payload: ComparisonRequest):
         },
     }
 
+
+@app.post("/api/metrics/periods")
+async def period_metrics(payload: PeriodKPIRequest):
+    """KPIs for any number of periods, aggregated in one pass over their combined range."""
+    blocks = await engine_pool.run(
+        engine.period_kpis,
+        [(period.start, period.end) for period in payload.periods],
+        region=payload.region,
+        category=payload.category,
+        channel=payload.channel,
+        promo_flag=payload.promo_flag,
+        campaign=payload.campaign,
+    )
+    return {
+        "periods": [
+            {
+                "label": period.label,
+                "start": period.start,
+                "end": period.end,
+                **block.__dict__,
+            }
+            for period, block in zip(payload.periods, blocks)
+        ]
+    }
+
@@ -41,8 +41,21 @@ class MetricRequest(BaseModel):
     campaign: Optional[List[str]] = Field(default=None)
 
 
+class DashboardRequest(MetricRequest):
+    widgets: Optional[List[str]] = None  # defaults to every dashboard widget
+    freq: str = "M"
+
+
+class AnomalyScanRequest(MetricRequest):
+    metrics: Optional[List[str]] = None  # defaults to net_sales, units_sold, marketing_spend
+    window: int = 7
+    threshold: float = 2.0
+    limit: int = 20
+
+
 class ChatRequest(MetricRequest):
     question: str
+    session_id: Optional[str] = Field(default=None, max_length=128)  # omitted: a new session
 
 
 class ChatResponse(BaseModel):
@@ -50,10 +63,13 @@ class ChatResponse(BaseModel):
     narrative: str
     data: Union[dict, list]
     history: List[dict]
+    session_id: str
+    plan: Optional[dict] = None  # how the question was interpreted
 
 
 class VoiceRequest(BaseModel):
     text: str
+    lang: str = "en"
 
 
 class VoiceResponse(BaseModel):
@@ -79,12 +95,20 @@ class AnomalyItem(BaseModel):
     z_score: float
 
 
+class AnomalyColumns(BaseModel):
+    date: List[str]
+    metric: List[str]
+    value: List[float]
+    z_score: List[float]
+
+
 class AnomalyResponse(BaseModel):
-    items: List[AnomalyItem]
+    # ``?shape=columns`` returns one list per field instead of one object per row.
+    items: Union[List[AnomalyItem], AnomalyColumns]
 
 
 class ExportRequest(BaseModel):
-    format: str = "csv"  # csv, json, excel
+    format: str = "csv"  # csv, ndjson, json, parquet, arrow, excel
     metric: str = "all"
     start: Optional[date] = None
     end: Optional[date] = None
@@ -114,6 +138,21 @@ class ComparisonRequest(BaseModel):
     campaign: Optional[List[str]] = None
 
 
+class Period(BaseModel):
+    start: Optional[date] = None
+    end: Optional[date] = None
+    label: Optional[str] = None
+
+
+class PeriodKPIRequest(BaseModel):
+    periods: List[Period] = Field(min_length=1, max_length=64)
+    region: Optional[List[str]] = Field(default=None)
+    category: Optional[List[str]] = Field(default=None)
+    channel: Optional[List[str]] = Field(default=None)
+    promo_flag: Optional[List[str]] = Field(default=None)
+    campaign: Optional[List[str]] = Field(default=None)
+
+
 class InventorySummaryResponse(BaseModel):
     total_inventory: int
     forecast_demand: int
@@ -128,8 +167,14 @@ class InventorySeriesPoint(BaseModel):
     forecast: float
 
 
+class InventorySeriesColumns(BaseModel):
+    date: List[str]
+    inventory: List[float]
+    forecast: List[float]
+
+
 class InventorySeriesResponse(BaseModel):
-    points: List[InventorySeriesPoint]
+    points: Union[List[InventorySeriesPoint], InventorySeriesColumns]
 
 
 class SupplyChainResponse(BaseModel):
@@ -145,6 +190,13 @@ class MarketingPerformanceItem(BaseModel):
     roi: float
 
 
+class MarketingPerformanceColumns(BaseModel):
+    campaign_name: List[str]
+    net_sales: List[float]
+    marketing_spend: List[float]
+    roi: List[float]
+
+
 class MarketingPerformanceResponse(BaseModel):
-    campaigns: List[MarketingPerformanceItem]
+    campaigns: Union[List[MarketingPerformanceItem], MarketingPerformanceColumns]
 
@@ -0,0 +1,180 @@
+"""Rolling z-score anomaly detection: segment-wide scans and incrementally kept results."""
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .serialization import iso_dates, shaped
+
+
+SEGMENT_DIMENSIONS: List[str] = ["region", "category", "channel"]
+SCAN_METRICS: List[str] = ["net_sales", "units_sold", "marketing_spend"]
+ANOMALY_KEYS: List[str] = ["date", "metric", "value", "z_score"]
+
+
+def rolling_z_scores(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    z-score of each value against the ``window`` values ending at it, along the last axis.
+    The first ``window - 1`` positions have no full window and are left out.
+    """
+    windows = sliding_window_view(values, window, axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (values[..., window - 1 :] - windows.mean(axis=-1)) / windows.std(
+            axis=-1, ddof=1
+        )
+
+
+def scan_segments(
+    daily: pd.DataFrame,
+    metrics: Sequence[str],
+    window: int = 7,
+    threshold: float = 2.0,
+    limit: int = 20,
+    dimensions: Sequence[str] = SEGMENT_DIMENSIONS,
+    shape: str = "records",
+):
+    """
+    Score every segment's daily series in one pass and return the top ``limit`` anomalies.
+
+    ``daily`` holds ``metrics`` per segment and date; repeated keys are summed. Segments are
+    laid out as rows of a dense segment x day panel (missing days count as zero, as in the
+    single-series scan), so the rolling mean and standard deviation of all segments come
+    from one strided window view. A segment is only scored between its own first and
+    last dates, which gives the same z-scores as filtering the engine down to it.
+    """
+    dimensions = list(dimensions)
+    empty = shaped({key: [] for key in dimensions + ANOMALY_KEYS}, shape)
+    daily = daily.dropna(subset=dimensions + ["date"])
+    if daily.empty:
+        return empty
+    segment, keys = pd.MultiIndex.from_frame(daily[dimensions]).factorize(sort=True)
+    origin = daily["date"].min()
+    day = ((daily["date"] - origin) // pd.Timedelta(days=1)).to_numpy()
+    days = int(day.max()) + 1
+    if days < window:
+        return empty
+    first = np.full(len(keys), days, dtype=np.int64)
+    last = np.zeros(len(keys), dtype=np.int64)
+    np.minimum.at(first, segment, day)
+    np.maximum.at(last, segment, day)
+    end = np.arange(window - 1, days)
+    scored = (end[None, :] - (window - 1) >= first[:, None]) & (end[None, :] <= last[:, None])
+
+    found = []
+    for metric in metrics:
+        panel = np.zeros((len(keys), days))
+        np.add.at(panel, (segment, day), daily[metric].to_numpy(dtype=float))
+        current = panel[:, window - 1 :]
+        z_scores = rolling_z_scores(panel, window)
+        hits = scored & np.isfinite(z_scores) & (np.abs(z_scores) >= threshold)
+        rows, cols = np.nonzero(hits)
+        found.append((metric, rows, cols, current[rows, cols], z_scores[rows, cols]))
+
+    order = np.concatenate([np.full(len(rows), rank) for rank, (_, rows, *_) in enumerate(found)])
+    rows = np.concatenate([item[1] for item in found])
+    cols = np.concatenate([item[2] for item in found])
+    values = np.round(np.concatenate([item[3] for item in found]), 2)
+    z_scores = np.round(np.concatenate([item[4] for item in found]), 2)
+    # Rank on the reported (rounded) score, then metric, segment and date, so ties resolve
+    # the same way whichever engine produced ``daily``.
+    top = np.lexsort((cols, rows, order, -np.abs(z_scores)))[:limit]
+    segments = keys[rows[top]]
+    columns = {
+        name: list(segments.get_level_values(level)) for level, name in enumerate(dimensions)
+    }
+    columns["date"] = iso_dates(origin + pd.to_timedelta(cols[top] + window - 1, unit="D"))
+    columns["metric"] = [found[rank][0] for rank in order[top]]
+    columns["value"] = values[top].tolist()
+    columns["z_score"] = z_scores[top].tolist()
+    return shaped(columns, shape)
+
+
+class AnomalyMonitor:
+    """
+    Stored anomaly results for the unfiltered daily total of each monitored metric.
+    Daily totals are kept as one float per day next to the anomalies found so far, so an
+    ingest only re-scores the days it touched: the rolling window is re-seeded from the
+    stored totals just before the earliest changed day and advanced over the new days.
+    """
+
+    def __init__(
+        self,
+        metrics: Sequence[str] = SCAN_METRICS,
+        window: int = 7,
+        threshold: float = 2.0,
+    ) -> None:
+        self.metrics = list(metrics)
+        self.window = window
+        self.threshold = threshold
+        self.origin: Optional[pd.Timestamp] = None
+        self._totals: Dict[str, np.ndarray] = {}
+        self._found: Dict[str, Dict[str, list]] = {}  # metric -> anomaly columns by date
+        self._lock = threading.Lock()
+
+    def covers(self, metric: str, window: int) -> bool:
+        return self.origin is not None and metric in self._found and window == self.window
+
+    def anomalies(self, metric: str, shape: str = "records"):
+        return shaped(self._found[metric], shape)
+
+    def update(self, load_daily: Callable[..., pd.DataFrame], since=None) -> None:
+        """
+        Re-score days from ``since`` onward; ``load_daily(start=...)`` returns per-day totals
+        of the monitored metrics. Without ``since``, or when it precedes the tracked range,
+        every day is rebuilt.
+        """
+        with self._lock:
+            if since is None or self.origin is None or pd.Timestamp(since) < self.origin:
+                self._fold(load_daily(), first_day=0, origin=None)
+            else:
+                start = pd.Timestamp(since).normalize()
+                first_day = (start - self.origin) // pd.Timedelta(days=1)
+                self._fold(load_daily(start=start), first_day=first_day, origin=self.origin)
+
+    def _fold(self, daily: pd.DataFrame, first_day: int, origin: Optional[pd.Timestamp]) -> None:
+        daily = daily.dropna(subset=["date"])
+        if origin is None:
+            if daily.empty:
+                self.origin, self._totals, self._found = None, {}, {}
+                return
+            origin = daily["date"].min()
+        day = ((daily["date"] - origin) // pd.Timedelta(days=1)).to_numpy()
+        # Days before ``first_day`` are unchanged. Days between the previous end and
+        # ``first_day`` are new zero-filled gaps, so scoring restarts at the earlier of the two.
+        kept_days = min(first_day, len(self._totals[self.metrics[0]])) if first_day else 0
+        days = max(kept_days, int(day.max()) + 1 if len(day) else first_day)
+        cutoff = iso_dates([origin + pd.Timedelta(days=kept_days)])[0]
+        totals, found = {}, {}
+        for metric in self.metrics:
+            values = np.zeros(days)
+            if kept_days:
+                values[:kept_days] = self._totals[metric][:kept_days]
+            np.add.at(values, day, daily[metric].to_numpy(dtype=float))
+            kept = self._found.get(metric, {key: [] for key in ANOMALY_KEYS})
+            before = bisect_left(kept["date"], cutoff)  # anomalies are kept in date order
+            scored = self._score(metric, values, origin, kept_days)
+            totals[metric] = values
+            found[metric] = {key: kept[key][:before] + scored[key] for key in ANOMALY_KEYS}
+        # Readers see either the previous or the new results, never a mix.
+        self.origin, self._totals, self._found = origin, totals, found
+
+    def _score(
+        self, metric: str, values: np.ndarray, origin: pd.Timestamp, first_day: int
+    ) -> Dict[str, list]:
+        begin = max(first_day, self.window - 1)
+        if len(values) <= begin:
+            return {key: [] for key in ANOMALY_KEYS}
+        current = values[begin:]
+        z_scores = rolling_z_scores(values[begin - self.window + 1 :], self.window)
+        hits = np.flatnonzero(np.isfinite(z_scores) & (np.abs(z_scores) >= self.threshold))
+        return {
+            "date": iso_dates(origin + pd.to_timedelta(begin + hits, unit="D")),
+            "metric": [metric] * len(hits),
+            "value": np.round(current[hits], 2).tolist(),
+            "z_score": np.round(z_scores[hits], 2).tolist(),
+        }
@@ -0,0 +1,313 @@
+"""Versioned in-process caches for insight engine results and LLM narratives."""
+from __future__ import annotations
+
+import functools
+import hashlib
+import inspect
+import json
+import pickle
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import pandas as pd
+
+from .filtering import DIMENSIONS
+
+
+_MISSING = object()
+
+
+def normalize_argument(name: str, value: Any) -> Any:
+    """Canonical, hashable form of one engine argument (``None`` means "not filtered")."""
+    if value is None or (isinstance(value, (str, list, tuple, set)) and len(value) == 0):
+        return None
+    if name == "shape" and value == "records":
+        return None  # the default response shape; callers that never pass it share keys
+    if name in ("start", "end") or name.endswith(("_start", "_end")):
+        return pd.Timestamp(value).isoformat()
+    if name == "periods":  # ordered (start, end) pairs
+        return tuple(
+            tuple(normalize_argument("start", bound) for bound in period) for period in value
+        )
+    if isinstance(value, (list, tuple, set)):
+        return tuple(sorted(set(value), key=str))
+    if name in DIMENSIONS:
+        return (value,)
+    return value
+
+
+class ResultCache:
+    """
+    LRU cache of engine results keyed by method, normalized arguments and dataset version.
+    Entries are sized by their pickled footprint and evicted once ``max_bytes`` is exceeded;
+    moving to a new dataset version drops every entry computed against the old one.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._bytes = 0
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, method: str, arguments: Dict[str, Any]) -> Hashable:
+        normalized = (
+            (name, normalize_argument(name, value)) for name, value in arguments.items()
+        )
+        return (
+            method,
+            self.version,
+            tuple(sorted((name, value) for name, value in normalized if value is not None)),
+        )
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        size = len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key[1] != self.version:
+                return  # computed against a dataset that has since been replaced
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+
+    def set_version(self, version: int) -> None:
+        with self._lock:
+            if version == self.version:
+                return
+            self.version = version
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "version": self.version,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def cached_result(method: Callable) -> Callable:
+    """Serve an engine method from ``self.cache`` when the engine has one attached."""
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if getattr(self, "cache", None) is None:
+            return method(self, *args, **kwargs)
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        arguments: Dict[str, Any] = {}
+        for name, value in list(bound.arguments.items())[1:]:
+            if signature.parameters[name].kind is inspect.Parameter.VAR_KEYWORD:
+                arguments.update(value)
+            else:
+                arguments[name] = value
+        return cached_call(self, method.__name__, arguments, lambda: method(self, *args, **kwargs))
+
+    return wrapper
+
+
+def cached_call(owner: Any, method: str, arguments: Dict[str, Any], compute: Callable) -> Any:
+    """Serve ``compute()`` from ``owner.cache`` under the key ``owner.<method>`` would use."""
+    cache: Optional[ResultCache] = getattr(owner, "cache", None)
+    if cache is None:
+        return compute()
+    key = cache.key(method, arguments)
+    result = cache.get(key)
+    if result is _MISSING:
+        result = compute()
+        cache.put(key, result)
+    return result
+
+
+def cached_batch(
+    owner: Any,
+    method: str,
+    calls: List[Dict[str, Any]],
+    compute: Callable[[List[int]], List[Any]],
+) -> List[Any]:
+    """
+    Serve a batch of ``owner.<method>`` calls from ``owner.cache``, each under the key the
+    single call would use. ``compute`` gets the positions of the calls that missed and
+    returns their results, so the misses are still answered in one pass.
+    """
+    cache: Optional[ResultCache] = getattr(owner, "cache", None)
+    if cache is None:
+        return compute(list(range(len(calls))))
+    keys = [cache.key(method, arguments) for arguments in calls]
+    results = [cache.get(key) for key in keys]
+    missing = [position for position, result in enumerate(results) if result is _MISSING]
+    if missing:
+        for position, result in zip(missing, compute(missing)):
+            results[position] = result
+            cache.put(keys[position], result)
+    return results
+
+
+def answer_key(question: str, structured: Dict[str, Any], version: Any) -> Hashable:
+    """
+    Key of an LLM narrative: the question with case, spacing and trailing punctuation
+    folded, a digest of the structured insight the prompt is built from, and the dataset
+    version it was computed against.
+    """
+    folded = re.sub(r"\s+", " ", question).strip().rstrip("?!. ").lower()
+    payload = json.dumps(structured, sort_keys=True, default=str).encode("utf-8")
+    return (folded, hashlib.sha256(payload).hexdigest(), version)
+
+
+class AnswerCache:
+    """
+    LRU cache of LLM narratives with a time-to-live and entry/byte bounds.
+    Concurrent requests for a key that is being computed wait for that one call instead
+    of each calling the model; hits and coalesced waits are credited with the latency of
+    the call they reused.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.seconds_saved = 0.0
+        self._clock = clock
+        self._bytes = 0
+        # key -> (answer, size, stored at, seconds the model took)
+        self._entries: "OrderedDict[Hashable, Tuple[str, int, float, float]]" = OrderedDict()
+        self._pending: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[str]:
+        """The cached answer for ``key``, or ``None`` (counted as a miss)."""
+        with self._lock:
+            answer = self._fresh(key)
+            if answer is None:
+                self.misses += 1
+            return answer
+
+    def put(self, key: Hashable, answer: str, elapsed: float) -> None:
+        """Store an answer the model took ``elapsed`` seconds to produce."""
+        with self._lock:
+            self._store(key, answer, elapsed)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], str]) -> str:
+        with self._lock:
+            answer = self._fresh(key)
+            if answer is not None:
+                return answer
+            pending = self._pending.get(key)
+            leader = pending is None
+            if leader:
+                pending = self._pending[key] = Future()
+                self.misses += 1
+        if not leader:
+            answer, elapsed = pending.result()
+            with self._lock:
+                self.coalesced += 1
+                self.seconds_saved += elapsed
+            return answer
+
+        started = time.perf_counter()
+        try:
+            answer = compute()
+        except BaseException as exc:
+            with self._lock:
+                del self._pending[key]
+            pending.set_exception(exc)
+            raise
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            del self._pending[key]
+            self._store(key, answer, elapsed)
+        pending.set_result((answer, elapsed))
+        return answer
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.coalesced + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "coalesced": self.coalesced,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "in_flight": len(self._pending),
+                "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+                "seconds_saved": round(self.seconds_saved, 3),
+            }
+
+    def _fresh(self, key: Hashable) -> Optional[str]:
+        """Unexpired answer for ``key``, counted as a hit; call with the lock held."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if self._clock() - entry[2] > self.ttl_seconds:
+            self._drop(key)
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        self.seconds_saved += entry[3]
+        return entry[0]
+
+    def _store(self, key: Hashable, answer: str, elapsed: float) -> None:
+        size = len(answer.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        self._drop(key)
+        self._entries[key] = (answer, size, self._clock(), elapsed)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, evicted, _, _) = self._entries.popitem(last=False)
+            self._bytes -= evicted
+            self.evictions += 1
+
+    def _drop(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
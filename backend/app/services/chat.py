@@ -2,12 +2,21 @@
 from __future__ import annotations
 
 import os
-from dataclasses import dataclass, field
-from typing import Deque, Dict, List
-from collections import deque
+import time
+from typing import Dict, Iterator, Optional, Tuple
 
-from .insights import InsightEngine
-from ..config import DEFAULT_LLM_MODEL, MAX_CHAT_HISTORY
+from .cache import AnswerCache, answer_key
+from .insights import BaseInsightEngine
+from .sessions import SessionStore, new_session_id
+from ..config import (
+    CHAT_CACHE_MAX_BYTES,
+    CHAT_CACHE_MAX_ENTRIES,
+    CHAT_CACHE_TTL_SECONDS,
+    CHAT_MODEL,
+    CHAT_SESSION_MAX,
+    CHAT_SESSION_MAX_BYTES,
+    DEFAULT_LLM_MODEL,
+)
 
 try:
     from langchain.chat_models import ChatOpenAI  # type: ignore
@@ -15,45 +24,119 @@ except Exception:  # pragma: no cover - optional dependency
     ChatOpenAI = None  # type: ignore
 
 
-@dataclass
-class ConversationMemory:
-    max_items: int = MAX_CHAT_HISTORY
-    items: Deque[Dict[str, str]] = field(default_factory=lambda: deque(maxlen=MAX_CHAT_HISTORY))
+class FakeStreamingModel:
+    """
+    Offline stand-in for the chat model with the same ``predict``/``stream`` surface.
+    It restates the prompt's question one word per chunk, pausing ``delay`` seconds
+    between chunks to imitate token latency.
+    """
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
 
-    def add(self, role: str, content: str) -> None:
-        self.items.append({"role": role, "content": content})
+    def stream(self, prompt: str) -> Iterator[str]:
+        lines = prompt.splitlines()
+        question = next(
+            (line[len("Question: "):] for line in lines if line.startswith("Question: ")),
+            "your question",
+        )
+        words = f"Here is what the data says about: {question}".split(" ")
+        for position, word in enumerate(words):
+            if self.delay:
+                time.sleep(self.delay)
+            yield word if position == 0 else " " + word
 
-    def as_ctx(self) -> List[Dict[str, str]]:
-        return list(self.items)
+    def predict(self, prompt: str) -> str:
+        return "".join(self.stream(prompt))
 
 
 class ChatService:
     """
     Combines structured insights with optional LLM-backed narratives.
     Falls back to rule-based summaries when LLM credentials are absent.
+    LLM narratives are cached per question, insight payload and dataset version.
+    History is kept per session; a request without a session ID starts a new one.
     """
 
-    def __init__(self, engine: InsightEngine) -> None:
+    def __init__(self, engine: BaseInsightEngine, sessions: Optional[SessionStore] = None) -> None:
         self.engine = engine
-        self.memory = ConversationMemory()
+        self.sessions = sessions or SessionStore(CHAT_SESSION_MAX, CHAT_SESSION_MAX_BYTES)
+        self.answers = AnswerCache(
+            CHAT_CACHE_MAX_ENTRIES, CHAT_CACHE_MAX_BYTES, CHAT_CACHE_TTL_SECONDS
+        )
         self.llm = None
         api_key = os.environ.get("OPENAI_API_KEY")
-        if api_key and ChatOpenAI:
+        if CHAT_MODEL == "fake":
+            self.llm = FakeStreamingModel()
+        elif api_key and ChatOpenAI:
             self.llm = ChatOpenAI(model_name=DEFAULT_LLM_MODEL, temperature=0.2)
 
-    def ask(self, question: str, **filters) -> Dict:
-        self.memory.add("user", question)
+    def ask(self, question: str, session_id: Optional[str] = None, **filters) -> Dict:
+        session_id = session_id or new_session_id()
+        self.sessions.add(session_id, "user", question)
         structured = self.engine.narrative_answer(question, **filters)
 
         if self.llm:
             prompt = self._build_prompt(question, structured)
-            llm_answer = self.llm.predict(prompt)  # type: ignore[attr-defined]
-            structured["narrative"] = llm_answer.strip()
+            version = getattr(self.engine.cache, "version", None)
+            structured["narrative"] = self.answers.get_or_compute(
+                answer_key(question, structured, version),
+                lambda: self.llm.predict(prompt).strip(),  # type: ignore[attr-defined]
+            )
 
-        self.memory.add("assistant", structured["narrative"])
-        structured["history"] = self.memory.as_ctx()
+        structured["history"] = self.sessions.add(session_id, "assistant", structured["narrative"])
+        structured["session_id"] = session_id
         return structured
 
+    def stream(
+        self, question: str, session_id: Optional[str] = None, **filters
+    ) -> Iterator[Tuple[str, Dict]]:
+        """
+        :meth:`ask` as ``(event, payload)`` pairs: ``insight`` with the structured answer as
+        soon as it is computed, ``token`` chunks of the narrative as the model produces
+        them, then ``history`` with the full narrative and the session's conversation.
+        """
+        session_id = session_id or new_session_id()
+        self.sessions.add(session_id, "user", question)
+        structured = self.engine.narrative_answer(question, **filters)
+        yield "insight", {key: value for key, value in structured.items() if key != "narrative"}
+
+        if self.llm:
+            parts = []
+            for text in self._narrative_tokens(question, structured):
+                parts.append(text)
+                yield "token", {"text": text}
+            narrative = "".join(parts).strip()
+        else:
+            narrative = structured["narrative"]
+            yield "token", {"text": narrative}
+
+        history = self.sessions.add(session_id, "assistant", narrative)
+        yield "history", {"narrative": narrative, "history": history, "session_id": session_id}
+
+    def _narrative_tokens(self, question: str, structured: Dict) -> Iterator[str]:
+        version = getattr(self.engine.cache, "version", None)
+        key = answer_key(question, structured, version)
+        cached = self.answers.get(key)
+        if cached is not None:
+            yield cached
+            return
+        started = time.perf_counter()
+        parts = []
+        for chunk in self.llm.stream(self._build_prompt(question, structured)):  # type: ignore
+            text = getattr(chunk, "content", chunk)  # LangChain yields message chunks
+            if text:
+                parts.append(text)
+                yield text
+        self.answers.put(key, "".join(parts).strip(), time.perf_counter() - started)
+
+    def stats(self) -> Dict:
+        return {
+            "llm_enabled": self.llm is not None,
+            "answers": self.answers.stats(),
+            "sessions": self.sessions.stats(),
+        }
+
     def _build_prompt(self, question: str, structured: Dict) -> str:
         return (
             "You are Talking Rabbitt, a concise sales-analytics AI. "
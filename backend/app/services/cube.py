@@ -0,0 +1,104 @@
+"""Pre-aggregated daily cube over the low-cardinality filter dimensions."""
+from __future__ import annotations
+
+from typing import Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .dtypes import concat_frames
+from .filtering import FrameIndex
+
+
+CUBE_DIMENSIONS: List[str] = [
+    "date",
+    "region",
+    "category",
+    "channel",
+    "promo_flag",
+    "campaign_name",
+]
+# Additive measures keep their fact-table names so aggregations run unchanged on the cube.
+SUM_MEASURES: List[str] = [
+    "net_sales",
+    "units_sold",
+    "marketing_spend",
+    "inventory_level",
+    "forecast_demand",
+]
+# Averaged measures are stored as ``<name>_sum`` / ``<name>_count`` pairs.
+MEAN_MEASURES: List[str] = [
+    "discount_rate",
+    "supply_lead_time_days",
+    "fulfillment_rate",
+    "backorder_rate",
+]
+
+
+def aggregate(frame: pd.DataFrame) -> pd.DataFrame:
+    """Collapse fact rows to one row per cube cell, sorted by date."""
+    parts = {column: frame[column] for column in CUBE_DIMENSIONS}
+    # Compact fact columns (int16/int32, float32) are widened so sums cannot overflow or
+    # lose precision.
+    for column in SUM_MEASURES:
+        parts[column] = _widened(frame[column])
+    for column in MEAN_MEASURES:
+        parts[f"{column}_sum"] = _widened(frame[column]).astype(np.float64)
+        parts[f"{column}_count"] = frame[column].notna().astype(np.int64)
+    parts["rows"] = np.ones(len(frame), dtype=np.int64)
+    return _collapse(pd.DataFrame(parts))
+
+
+def _widened(values: pd.Series) -> pd.Series:
+    if pd.api.types.is_float_dtype(values.dtype):
+        return values.astype(np.float64)
+    if pd.api.types.is_integer_dtype(values.dtype):
+        return values.astype("Int64" if values.hasnans else np.int64)
+    return values
+
+
+def _collapse(cells: pd.DataFrame) -> pd.DataFrame:
+    return (
+        cells.groupby(CUBE_DIMENSIONS, sort=True, dropna=False, observed=True)
+        .sum()
+        .reset_index()
+    )
+
+
+class AggregateCube:
+    """
+    Daily sums and counts at date x region x category x channel x promo_flag x campaign grain.
+    Every ``MetricRequest`` filter is a cube dimension, so any query that does not group by
+    or read a finer column (``sku``, ``country``, ...) can be answered from here.
+    """
+
+    def __init__(self, frame: pd.DataFrame, index: Optional[FrameIndex] = None) -> None:
+        self.frame = frame
+        self.index = index if index is not None else FrameIndex(frame)
+
+    @classmethod
+    def build(cls, facts: pd.DataFrame) -> "AggregateCube":
+        return cls(aggregate(facts))
+
+    def covers(self, columns: Iterable[str]) -> bool:
+        return all(column in self.frame.columns for column in columns)
+
+    def extend(self, facts: pd.DataFrame) -> "AggregateCube":
+        """Fold newly ingested fact rows into the cube, re-aggregating only affected dates."""
+        delta = aggregate(facts)
+        if delta.empty:
+            return self
+        if self.frame.empty or (
+            self.index.date_sorted
+            and delta["date"].notna().all()
+            and delta["date"].min() > self.frame["date"].max()
+        ):
+            merged = concat_frames([self.frame, delta])
+            return AggregateCube(merged, self.index.extend(merged))
+        if self.index.date_sorted and delta["date"].notna().all():
+            boundary = self.index.date_range(start=delta["date"].min()).start
+        else:
+            boundary = 0
+        head = self.frame.iloc[:boundary]
+        tail = _collapse(concat_frames([self.frame.iloc[boundary:], delta]))
+        return AggregateCube(concat_frames([head, tail]))
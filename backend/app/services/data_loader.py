@@ -1,17 +1,47 @@
 """Utilities for loading, persisting, and filtering sales data."""
 from __future__ import annotations
 
-import io
-from dataclasses import dataclass
+import fcntl
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from functools import cached_property
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Iterator, List, Optional, Sequence
 
 import duckdb
 import pandas as pd
 
-from ..config import FACT_TABLE_PATH, SEED_DATA_PATH, UPLOAD_DIR, WAREHOUSE_DIR
+from ..config import (
+    COMPACT_FRAME,
+    COMPACTION_MIN_FILES,
+    COMPACTION_SMALL_FILE_BYTES,
+    FACT_TABLE_PATH,
+    SEED_DATA_PATH,
+    SNAPSHOT_GRACE_SECONDS,
+    UPLOAD_BATCH_ROWS,
+    UPLOAD_DIR,
+    WAREHOUSE_DIR,
+)
+from .cube import AggregateCube
+from .dtypes import compact_frame, concat_frames
+from .filtering import FrameIndex
+from .shared_frame import SharedFrameStore, Snapshot
 
 
+MANIFEST_NAME = "manifest.json"
+LOCK_NAME = "manifest.lock"
+PARTITION_ROOT = "sales_fact"
+SHARED_ROOT = "shared"
+NULL_PARTITION = "year=__HIVE_DEFAULT_PARTITION__/month=__HIVE_DEFAULT_PARTITION__"
+MAX_TRACKED_INGESTS = 20
+
 REQUIRED_COLUMNS = {
     "date": "datetime64[ns]",
     "week": "Int64",
@@ -42,6 +72,14 @@ REQUIRED_COLUMNS = {
 class Dataset:
     frame: pd.DataFrame
 
+    @cached_property
+    def index(self) -> FrameIndex:
+        return FrameIndex(self.frame)
+
+    @cached_property
+    def cube(self) -> AggregateCube:
+        return AggregateCube.build(self.frame)
+
     def to_filters(self) -> Dict[str, list]:
         return {
             "regions": sorted(self.frame["region"].dropna().unique().tolist()),
@@ -56,29 +94,186 @@ class Dataset:
             ],
         }
 
+    def profile(self) -> Dict:
+        return {
+            "rows": len(self.frame),
+            "columns": len(self.frame.columns),
+            "latest_date": self.frame["date"].max().date().isoformat(),
+            "earliest_date": self.frame["date"].min().date().isoformat(),
+            "categories": self.frame["category"].nunique(),
+            "regions": self.frame["region"].nunique(),
+        }
+
+
+@dataclass
+class IngestProgress:
+    """Progress of one streaming upload, reported by ``/api/upload/progress``."""
+
+    upload_id: str
+    filename: str
+    total_bytes: int
+    bytes_read: int = 0
+    rows: int = 0
+    batches: int = 0
+    min_date: Optional[str] = None  # ISO date range of the ingested rows
+    max_date: Optional[str] = None
+    done: bool = False
+    error: Optional[str] = None
+
+    def advance(self, batch: pd.DataFrame, bytes_read: int) -> None:
+        self.rows += len(batch)
+        self.batches += 1
+        self.bytes_read = bytes_read
+        dates = batch["date"].dropna()
+        if not dates.empty:
+            low, high = dates.min().date().isoformat(), dates.max().date().isoformat()
+            self.min_date = min(self.min_date or low, low)
+            self.max_date = max(self.max_date or high, high)
+
+
+@dataclass
+class Manifest:
+    """The set of Parquet files that make up one version of the fact table."""
+
+    version: int = 0
+    files: List[Dict] = field(default_factory=list)  # {"path", "rows", "bytes"}
+    # Random id written with every publish, naming these exact files; the shared snapshot
+    # is keyed by it, since version numbers restart when a warehouse is reseeded.
+    id: str = ""
+    # Files replaced by the last compaction; kept until the next one so in-flight readers
+    # of the previous version can finish.
+    retired: List[str] = field(default_factory=list)
+
+    @property
+    def rows(self) -> int:
+        return sum(entry["rows"] for entry in self.files)
+
 
 class DataRepository:
-    """Manages the canonical dataset stored as Parquet."""
+    """
+    Manages the canonical dataset stored as an append-only, Hive-style partitioned Parquet
+    warehouse (``sales_fact/year=YYYY/month=MM/part-*.parquet``). ``manifest.json`` lists
+    the files of the current version and is replaced atomically on every publish.
 
-    def __init__(self) -> None:
+    The in-memory dataset is served from a memory-mapped snapshot under ``shared/``, so
+    worker processes on one host share a single copy of the table. An upload is appended
+    in memory and the full snapshot is rewritten later by :meth:`compact`, off the request
+    path; other workers notice the new version through :meth:`stale` and adopt it with
+    :meth:`follow` once its snapshot is there. Publishing holds an
+    exclusive lock on ``manifest.lock`` and starts from the manifest on disk, so workers
+    uploading or compacting at the same time never overwrite each other's files.
+    """
+
+    def __init__(self, warehouse_dir: Path = WAREHOUSE_DIR, upload_dir: Path = UPLOAD_DIR) -> None:
+        self.warehouse_dir = warehouse_dir
+        self.upload_dir = upload_dir
+        self.manifest_path = warehouse_dir / MANIFEST_NAME
+        self.shared = SharedFrameStore(
+            warehouse_dir / SHARED_ROOT, layout="compact" if COMPACT_FRAME else "wide"
+        )
+        self._manifest_stamp: Optional[tuple] = None
         self._dataset: Optional[Dataset] = None
-        WAREHOUSE_DIR.mkdir(parents=True, exist_ok=True)
-        UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+        self._behind = False  # a publish here found a version from another process
+        self._pending: Optional[tuple] = None  # (stamp, contents key) of the manifest on disk
+        self._lock = threading.RLock()
+        self.ingests: "OrderedDict[str, IngestProgress]" = OrderedDict()
+        self.warehouse_dir.mkdir(parents=True, exist_ok=True)
+        self.upload_dir.mkdir(parents=True, exist_ok=True)
+        self._manifest = self._load_manifest()
+
+    @property
+    def version(self) -> int:
+        """Dataset version; bumped by every upload or compaction published to the manifest."""
+        return self._manifest.version
+
+    @property
+    def total_rows(self) -> int:
+        return self._manifest.rows
+
+    @property
+    def snapshot_key(self) -> str:
+        """
+        Identity of the current warehouse contents: the manifest's id, or for a legacy
+        table (or a manifest written before ids) a hash of its files' paths and stats.
+        """
+        return self._contents_key(self._manifest)
 
     def bootstrap(self) -> Dataset:
-        if FACT_TABLE_PATH.exists():
+        """
+        Open the current version: map its shared snapshot when one exists, otherwise read
+        the warehouse once, build the index and cube, and publish them as the snapshot that
+        later restarts and other workers reopen.
+        """
+        with self._lock:
+            self._manifest = self._load_manifest()
+            files = self.fact_files()
+            key = self.snapshot_key
+            self._behind = False
+        snapshot = self.shared.load(key)
+        if snapshot is None:
             con = duckdb.connect()
-            frame = con.execute(
-                f"SELECT * FROM read_parquet('{FACT_TABLE_PATH.as_posix()}')"
-            ).df()
+            frame = con.execute(f"SELECT * FROM {parquet_source(files)}").df()
             con.close()
-        else:
-            frame = pd.read_csv(SEED_DATA_PATH)
-            frame["date"] = pd.to_datetime(frame["date"])
-            self._write_frame(frame)
-        self._dataset = Dataset(frame=frame)
+            if not frame["date"].is_monotonic_increasing:
+                frame.sort_values("date", kind="mergesort", inplace=True, ignore_index=True)
+            return self._share(Dataset(frame=_compacted(frame)), key)
+        self._dataset = _from_snapshot(snapshot)
         return self._dataset
 
+    def stale(self) -> bool:
+        """Whether another process has published a version since the manifest was read."""
+        return self._behind or _stamp(self.manifest_path) != self._manifest_stamp
+
+    def published_key(self) -> Optional[str]:
+        """
+        Contents key of the version on disk, which may be newer than the loaded one. The
+        manifest is parsed once per published version, so this is cheap enough to call
+        from the event loop on every request; ``None`` when there is no manifest.
+        """
+        published = self._published()
+        return published[1] if published else None
+
+    def can_follow(self, grace_seconds: float = SNAPSHOT_GRACE_SECONDS) -> bool:
+        """
+        Whether :meth:`follow` would move now: the published version's shared snapshot
+        exists, or it has gone without one for ``grace_seconds`` (its publisher may have
+        died) and is read from the warehouse instead. Only reads the manifest and the
+        snapshot pointer, without taking the repository lock.
+        """
+        published = self._published()
+        if published is None or self.shared.key == published[1]:
+            return True
+        return time.time() - published[0][0] / 1e9 >= grace_seconds
+
+    def follow(self, grace_seconds: float = SNAPSHOT_GRACE_SECONDS) -> bool:
+        """
+        Adopt the version another process published, once :meth:`can_follow`; returns
+        whether the dataset moved. The publishing worker writes the snapshot in its
+        background compaction, and until then the loaded version keeps serving.
+        """
+        with self._lock:
+            if not self.can_follow(grace_seconds):
+                return False
+            self.bootstrap()
+            return True
+
+    def reload(self) -> None:
+        """Re-read the manifest published by another process."""
+        with self._lock:
+            self._manifest = self._load_manifest()
+            self._behind = False
+
+    def fact_files(self) -> List[Path]:
+        """Parquet files of the current version, seeding the warehouse if it is empty."""
+        with self._lock:
+            if not self._manifest.files:
+                with self._publishing():
+                    if not self._manifest.files:  # no other worker seeded it meanwhile
+                        frame = pd.read_csv(SEED_DATA_PATH)
+                        frame["date"] = pd.to_datetime(frame["date"])
+                        self._publish(added=self._write_partitions(frame))
+            return [self.warehouse_dir / entry["path"] for entry in self._manifest.files]
+
     @property
     def dataset(self) -> Dataset:
         if self._dataset is None:
@@ -88,17 +283,120 @@ class DataRepository:
     def refresh(self) -> Dataset:
         return self.bootstrap()
 
-    def append_upload(self, file_bytes: bytes, filename: str) -> Dataset:
-        upload_path = UPLOAD_DIR / filename
-        upload_path.write_bytes(file_bytes)
+    def upload_path(self, filename: str) -> Path:
+        """
+        A fresh path to spool one upload to before ingestion. Concurrent uploads of the same
+        filename each get their own file; the client's name is kept only as a suffix.
+        """
+        return self.upload_dir / f"{uuid.uuid4().hex}-{Path(filename).name}"
 
-        new_frame = pd.read_csv(io.BytesIO(file_bytes))
-        new_frame["date"] = pd.to_datetime(new_frame["date"])
-        new_frame = _harmonize_columns(new_frame)
-        combined = pd.concat([self.dataset.frame, new_frame], ignore_index=True)
-        self._write_frame(combined)
-        self._dataset = Dataset(frame=combined)
-        return self._dataset
+    def append_upload(self, file_bytes: bytes, filename: str) -> int:
+        """Ingest an in-memory CSV upload; see :meth:`ingest_csv`."""
+        path = self.upload_path(filename)
+        path.write_bytes(file_bytes)
+        progress = self.track_ingest(Path(filename).name, len(file_bytes))
+        return self.ingest_csv(path, progress=progress)
+
+    def ingest_csv(
+        self,
+        path: Path,
+        batch_rows: int = UPLOAD_BATCH_ROWS,
+        progress: Optional[IngestProgress] = None,
+    ) -> int:
+        """
+        Parse a CSV on disk in batches of ``batch_rows`` and append each batch to the
+        warehouse as new partition files; returns rows ingested. Peak memory is bounded by
+        the batch size, not the file size. The files are published in one manifest update
+        once the whole file has parsed, so readers never see a partial upload. A loaded
+        dataset is extended in memory; its shared snapshot is left to :meth:`compact`.
+        """
+        if progress is None:
+            progress = self.track_ingest(path.name, path.stat().st_size)
+        added: List[Dict] = []
+        try:
+            with path.open("rb") as handle:
+                for batch in pd.read_csv(handle, chunksize=batch_rows):
+                    batch["date"] = pd.to_datetime(batch["date"])
+                    added += self._write_partitions(_harmonize_columns(batch))
+                    progress.advance(batch, bytes_read=handle.tell())
+        except Exception as exc:
+            for entry in added:
+                (self.warehouse_dir / entry["path"]).unlink(missing_ok=True)
+            progress.error = str(exc)
+            raise
+
+        self.fact_files()
+        with self._publishing():
+            if self._dataset is not None and added:
+                # The in-memory engine holds the whole table anyway; fold the upload in
+                # from the files just written rather than keeping the batches around.
+                con = duckdb.connect()
+                new_frame = con.execute(
+                    "SELECT * FROM "
+                    + parquet_source([self.warehouse_dir / entry["path"] for entry in added])
+                ).df()
+                con.close()
+                new_frame.sort_values("date", kind="mergesort", inplace=True, ignore_index=True)
+                self._dataset = _append_in_memory(self._dataset, _compacted(new_frame))
+            self._publish(added=added)
+        progress.done = True
+        return progress.rows
+
+    def track_ingest(self, filename: str, total_bytes: int) -> IngestProgress:
+        """Register a progress record for an upload, keeping the most recent ones."""
+        progress = IngestProgress(
+            upload_id=uuid.uuid4().hex, filename=filename, total_bytes=total_bytes
+        )
+        with self._lock:
+            self.ingests[progress.upload_id] = progress
+            while len(self.ingests) > MAX_TRACKED_INGESTS:
+                self.ingests.popitem(last=False)
+        return progress
+
+    def compact(
+        self,
+        min_files: int = COMPACTION_MIN_FILES,
+        small_file_bytes: int = COMPACTION_SMALL_FILE_BYTES,
+    ) -> bool:
+        """
+        Write the shared snapshot of the loaded dataset if the current version has none
+        (after an upload), then merge small files into one file per partition and publish
+        the result. Unpartitioned files (the legacy single-file fact table) are always split
+        into partitions. Returns whether the dataset was remapped or a new version published.
+        """
+        with self._publishing():
+            shared = self._share_loaded()
+            for path in self._manifest.retired:
+                (self.warehouse_dir / path).unlink(missing_ok=True)
+            self._manifest.retired = []
+
+            partitions: Dict[str, List[Dict]] = {}
+            for entry in self._manifest.files:
+                if entry["bytes"] < small_file_bytes or not _is_partitioned(entry["path"]):
+                    partitions.setdefault(str(Path(entry["path"]).parent), []).append(entry)
+            selected = [
+                entry
+                for partition, entries in partitions.items()
+                if len(entries) >= min_files or not _is_partitioned(entries[0]["path"])
+                for entry in entries
+            ]
+            if not selected:
+                self._save_manifest(self._manifest)
+                return shared
+            con = duckdb.connect()
+            frame = con.execute(
+                "SELECT * FROM "
+                + parquet_source([self.warehouse_dir / entry["path"] for entry in selected])
+            ).df()
+            con.close()
+            manifest_id = uuid.uuid4().hex
+            self.shared.retag(self.snapshot_key, manifest_id)
+            self._publish(
+                added=self._write_partitions(frame),
+                removed=[entry["path"] for entry in selected],
+                manifest_id=manifest_id,
+            )
+            return True
 
     def filtered_frame(
         self,
@@ -111,34 +409,182 @@ class DataRepository:
         start=None,
         end=None,
     ) -> pd.DataFrame:
-        frame = self.dataset.frame.copy()
-        if region:
-            frame = frame[frame["region"].isin(region if isinstance(region, list) else [region])]
-        if category:
-            frame = frame[frame["category"].isin(category if isinstance(category, list) else [category])]
-        if channel:
-            frame = frame[frame["channel"].isin(channel if isinstance(channel, list) else [channel])]
-        if promo_flag:
-            frame = frame[
-                frame["promo_flag"].isin(promo_flag if isinstance(promo_flag, list) else [promo_flag])
-            ]
-        if campaign:
-            frame = frame[
-                frame["campaign_name"].isin(campaign if isinstance(campaign, list) else [campaign])
-            ]
-        if start:
-            frame = frame[frame["date"] >= pd.to_datetime(start)]
-        if end:
-            frame = frame[frame["date"] <= pd.to_datetime(end)]
-        return frame
-
-    def _write_frame(self, frame: pd.DataFrame) -> None:
-        frame.sort_values("date", inplace=True)
+        return self.dataset.index.select(
+            start=start,
+            end=end,
+            region=region,
+            category=category,
+            channel=channel,
+            promo_flag=promo_flag,
+            campaign=campaign,
+        ).to_frame()
+
+    def _share(self, dataset: Dataset, key: str) -> Dataset:
+        """Publish ``dataset`` as the shared snapshot and serve it from the mapping."""
+        snapshot = self.shared.publish(dataset.frame, dataset.index, dataset.cube, key)
+        self._dataset = _from_snapshot(snapshot)
+        return self._dataset
+
+    def _published(self) -> Optional[tuple]:
+        stamp = _stamp(self.manifest_path)
+        if stamp is None:
+            return None
+        pending = self._pending
+        if pending is None or pending[0] != stamp:
+            manifest = Manifest(**json.loads(self.manifest_path.read_text()))
+            pending = self._pending = (stamp, self._contents_key(manifest))
+        return pending
+
+    def _share_loaded(self) -> bool:
+        """Share the loaded dataset if the snapshot does not hold the current version yet."""
+        if self._dataset is None or self.shared.key == self.snapshot_key:
+            return False
+        self._share(self._dataset, self.snapshot_key)
+        return True
+
+    def _contents_key(self, manifest: Manifest) -> str:
+        if manifest.id:
+            return manifest.id
+        digest = hashlib.sha256()
+        for entry in manifest.files:
+            stamp = _stamp(self.warehouse_dir / entry["path"])
+            digest.update(f"{entry['path']}:{stamp}\n".encode())
+        return digest.hexdigest()
+
+    @contextmanager
+    def _publishing(self) -> Iterator[None]:
+        """
+        Hold the warehouse lock across processes and re-read the manifest under it, so a
+        publish always extends the latest version rather than this worker's copy. When
+        another process published meanwhile, the loaded dataset no longer matches and is
+        reopened on next use, and :meth:`stale` stays true until the caller resyncs.
+        """
+        with self._lock, open(self.warehouse_dir / LOCK_NAME, "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                version = self._manifest.version
+                self._manifest = self._load_manifest()
+                if self._manifest.version != version:
+                    self._dataset = None
+                    self._behind = True
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _load_manifest(self) -> Manifest:
+        self._manifest_stamp = _stamp(self.manifest_path)
+        if self.manifest_path.exists():
+            return Manifest(**json.loads(self.manifest_path.read_text()))
+        legacy = self.warehouse_dir / FACT_TABLE_PATH.name
+        if legacy.exists():
+            # Pre-manifest warehouses are served as-is until the first compaction splits them.
+            return Manifest(files=[self._entry(legacy)])
+        return Manifest()
+
+    def _save_manifest(self, manifest: Manifest) -> None:
+        staging = self.manifest_path.with_suffix(".json.tmp")
+        staging.write_text(json.dumps(asdict(manifest), indent=2))
+        os.replace(staging, self.manifest_path)
+        self._manifest_stamp = _stamp(self.manifest_path)
+
+    def _publish(
+        self, added: List[Dict], removed: Sequence[str] = (), manifest_id: Optional[str] = None
+    ) -> None:
+        removed = set(removed)
+        manifest = Manifest(
+            version=self._manifest.version + 1,
+            files=[entry for entry in self._manifest.files if entry["path"] not in removed]
+            + added,
+            retired=sorted(removed),
+            id=manifest_id or uuid.uuid4().hex,
+        )
+        self._save_manifest(manifest)
+        self._manifest = manifest
+
+    def _write_partitions(self, frame: pd.DataFrame) -> List[Dict]:
+        """Write ``frame`` as one new file per year/month partition; returns manifest entries."""
+        partitions = (
+            frame["date"].dt.strftime("year=%Y/month=%m").fillna(NULL_PARTITION).to_numpy()
+        )
+        entries = []
+        for partition in sorted(set(partitions)):
+            target = (
+                self.warehouse_dir / PARTITION_ROOT / partition / f"part-{uuid.uuid4().hex}.parquet"
+            )
+            target.parent.mkdir(parents=True, exist_ok=True)
+            _write_parquet(frame[partitions == partition], target)
+            entries.append(self._entry(target))
+        return entries
+
+    def _entry(self, path: Path) -> Dict:
         con = duckdb.connect()
-        con.register("sales_df", frame)
-        con.execute(f"COPY sales_df TO '{FACT_TABLE_PATH.as_posix()}' (FORMAT PARQUET)")
-        con.unregister("sales_df")
+        rows = con.execute(
+            f"SELECT COUNT(*) FROM {parquet_source([path])}"
+        ).fetchone()[0]
         con.close()
+        return {
+            "path": path.relative_to(self.warehouse_dir).as_posix(),
+            "rows": int(rows),
+            "bytes": path.stat().st_size,
+        }
+
+
+def parquet_source(files: Sequence[Path]) -> str:
+    """``read_parquet`` table expression over warehouse files."""
+    paths = ", ".join("'" + Path(path).as_posix().replace("'", "''") + "'" for path in files)
+    # Partition directories must not be decoded into columns: ``month`` is a real column.
+    return f"read_parquet([{paths}], hive_partitioning = false, union_by_name = true)"
+
+
+def _write_parquet(frame: pd.DataFrame, target: Path) -> None:
+    """Write atomically: readers only ever see complete files."""
+    frame = frame.sort_values("date", kind="mergesort")
+    staging = target.with_suffix(".parquet.tmp")
+    con = duckdb.connect()
+    con.register("part_df", frame)
+    con.execute(f"COPY part_df TO '{staging.as_posix()}' (FORMAT PARQUET)")
+    con.unregister("part_df")
+    con.close()
+    os.replace(staging, target)
+
+
+def _from_snapshot(snapshot: Snapshot) -> Dataset:
+    dataset = Dataset(frame=snapshot.frame)
+    dataset.index = snapshot.index
+    dataset.cube = snapshot.cube
+    return dataset
+
+
+def _stamp(path: Path) -> Optional[tuple]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+def _is_partitioned(path: str) -> bool:
+    return path.startswith(PARTITION_ROOT + "/")
+
+
+def _append_in_memory(previous: Dataset, new_frame: pd.DataFrame) -> Dataset:
+    """Extend a loaded dataset, reusing its index and cube where the upload allows."""
+    combined = concat_frames([previous.frame, new_frame])
+    # Uploads of newer dates keep the table sorted, so the date index can be extended
+    # in place instead of re-sorting and re-encoding history.
+    appends_tail = new_frame["date"].notna().all() and (
+        previous.frame.empty
+        or new_frame.empty
+        or new_frame["date"].min() >= previous.frame["date"].max()
+    )
+    if not appends_tail:
+        combined.sort_values("date", kind="mergesort", inplace=True, ignore_index=True)
+    dataset = Dataset(frame=combined)
+    if appends_tail and "index" in previous.__dict__ and previous.index.date_sorted:
+        dataset.index = previous.index.extend(combined)
+    if "cube" in previous.__dict__:
+        dataset.cube = previous.cube.extend(new_frame)
+    return dataset
 
 
 def _harmonize_columns(frame: pd.DataFrame) -> pd.DataFrame:
@@ -153,5 +599,10 @@ def _harmonize_columns(frame: pd.DataFrame) -> pd.DataFrame:
             frame[column] = pd.to_numeric(frame[column], errors="coerce")
         else:
             frame[column] = frame[column].astype("string")
-    return frame
+    # Uploads get the loaded table's compact types, so appending them keeps those types.
+    return _compacted(frame)
+
+
+def _compacted(frame: pd.DataFrame) -> pd.DataFrame:
+    return compact_frame(frame) if COMPACT_FRAME else frame
 
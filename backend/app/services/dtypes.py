@@ -0,0 +1,135 @@
+"""Compact column types for the in-memory fact table."""
+from __future__ import annotations
+
+from typing import Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# Low-cardinality text columns are dictionary-encoded.
+CATEGORICAL_COLUMNS: List[str] = [
+    "quarter",
+    "region",
+    "country",
+    "channel",
+    "category",
+    "subcategory",
+    "sku",
+    "promo_flag",
+    "campaign_name",
+]
+# Integer columns and the narrowest type their value domain fits. Columns whose values do
+# not fit keep 64 bits rather than wrapping.
+INTEGER_COLUMNS: Dict[str, str] = {
+    "week": "int8",
+    "month": "int8",
+    "units_sold": "int32",
+    "inventory_level": "int32",
+    "forecast_demand": "int32",
+    "supply_lead_time_days": "int16",
+}
+# Ratios in [0, 1] (and ROI multiples) need no more than single precision. Money columns
+# stay float64 so totals are exact to the cent.
+FLOAT32_COLUMNS: List[str] = [
+    "discount_rate",
+    "fulfillment_rate",
+    "backorder_rate",
+    "marketing_roi",
+]
+
+
+def compact_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """Convert known fact-table columns in place to their compact types; returns ``frame``."""
+    for column in CATEGORICAL_COLUMNS:
+        if column in frame.columns and not isinstance(frame[column].dtype, pd.CategoricalDtype):
+            frame[column] = _categorical(frame[column])
+    for column, dtype in INTEGER_COLUMNS.items():
+        if column in frame.columns:
+            frame[column] = _narrow_integer(frame[column], np.dtype(dtype))
+    for column in FLOAT32_COLUMNS:
+        if column in frame.columns:
+            frame[column] = pd.to_numeric(frame[column], errors="coerce").astype(np.float32)
+    return frame
+
+
+def concat_frames(frames: Sequence[pd.DataFrame]) -> pd.DataFrame:
+    """
+    ``pd.concat(frames, ignore_index=True)`` that keeps categorical columns categorical:
+    plain concatenation falls back to ``object`` as soon as the category sets differ.
+    """
+    combined = pd.concat(frames, ignore_index=True)
+    for column in combined.columns:
+        if isinstance(combined[column].dtype, pd.CategoricalDtype):
+            continue  # identical categories already concatenate as categorical
+        parts = [frame[column] for frame in frames if column in frame.columns]
+        if len(parts) == len(frames) and any(
+            isinstance(part.dtype, pd.CategoricalDtype) for part in parts
+        ):
+            parts = [
+                part if isinstance(part.dtype, pd.CategoricalDtype) else _categorical(part)
+                for part in parts
+            ]
+            # Sorted categories keep group-by output in the same order as plain strings.
+            combined[column] = union_categoricals(parts, sort_categories=True)
+    return combined
+
+
+def widen_floats(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    float32 columns as float64 holding their shortest decimal form, so exported files show
+    the uploaded ``0.12`` rather than the nearest single-precision value ``0.1199999973``.
+    """
+    narrow = [column for column in frame.columns if frame[column].dtype == np.float32]
+    if not narrow:
+        return frame
+    widened = {column: frame[column].astype(str).astype(np.float64) for column in narrow}
+    return frame.assign(**widened)
+
+
+def memory_report(frame: pd.DataFrame) -> Dict:
+    """
+    Bytes held per column (codes and categories for categorical columns). ``shared`` marks
+    columns served from the memory-mapped snapshot, whose pages all workers share.
+    """
+    usage = frame.memory_usage(index=False, deep=True)
+    columns = [
+        {
+            "column": column,
+            "dtype": str(frame[column].dtype),
+            "bytes": int(usage[column]),
+            "shared": _mapped(frame[column]),
+        }
+        for column in frame.columns
+    ]
+    return {"rows": len(frame), "total_bytes": int(usage.sum()), "columns": columns}
+
+
+def _mapped(series: pd.Series) -> bool:
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        values = series.array.codes
+    elif isinstance(series.dtype, np.dtype):
+        values = series.to_numpy()
+    else:
+        values = getattr(series.array, "_data", None)  # masked (nullable) arrays
+    while values is not None:
+        if isinstance(values, np.memmap):
+            return True
+        values = getattr(values, "base", None)
+    return False
+
+
+def _categorical(series: pd.Series) -> pd.Categorical:
+    # Object categories, so columns from CSV ("string") and Parquet ("object") unite.
+    return pd.Categorical(series.astype(object))
+
+
+def _narrow_integer(series: pd.Series, dtype: np.dtype) -> pd.Series:
+    values = pd.to_numeric(series, errors="coerce").astype("Int64")
+    limits = np.iinfo(dtype)
+    present = values.dropna()
+    if not present.empty and (present.min() < limits.min or present.max() > limits.max):
+        dtype = np.dtype(np.int64)
+    if values.isna().any():
+        return values.astype(dtype.name.capitalize())  # nullable, e.g. "Int32"
+    return pd.Series(values.to_numpy(dtype=dtype), index=series.index, name=series.name)
@@ -0,0 +1,375 @@
+"""Insight engine that pushes aggregations down to DuckDB over the Parquet warehouse."""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import duckdb
+import pandas as pd
+
+from .anomalies import SEGMENT_DIMENSIONS
+from .cache import cached_result
+from .cube import MEAN_MEASURES, SUM_MEASURES
+from .data_loader import REQUIRED_COLUMNS, parquet_source
+from .filtering import DIMENSIONS, as_list
+from .insights import DASHBOARD_CELLS, BaseInsightEngine, KPIBlock, Window
+
+
+class DuckDBInsightEngine(BaseInsightEngine):
+    """
+    Compiles every insight method into parameterized SQL against the Parquet store.
+    Scans, filters and group-bys run in DuckDB's multi-threaded vectorized executor, so
+    only already-aggregated rows (at most one per day or per group) reach Python and
+    the fact table never has to fit in worker memory.
+    """
+
+    def __init__(self, files: Sequence[Path], threads: Optional[int] = None) -> None:
+        self._con = duckdb.connect()
+        if threads:
+            self._con.execute(f"SET threads = {int(threads)}")
+        self.update_source(files)
+
+    def update_source(self, files: Sequence[Path]) -> None:
+        """Point the ``sales_fact`` view at the Parquet files of the current manifest."""
+        self._con.execute(
+            f"CREATE OR REPLACE VIEW sales_fact AS SELECT * FROM {parquet_source(files)}"
+        )
+        self._parser = None  # dimension values may have changed
+
+    def kpis(
+        self,
+        start=None,
+        end=None,
+        region=None,
+        category=None,
+        channel=None,
+        promo_flag=None,
+        campaign=None,
+    ) -> KPIBlock:
+        return self.period_kpis(
+            [(start, end)],
+            region=region,
+            category=category,
+            channel=channel,
+            promo_flag=promo_flag,
+            campaign=campaign,
+        )[0]
+
+    @cached_result
+    def series(
+        self, metric: str = "net_sales", freq: str = "M", shape: str = "records", **filters
+    ):
+        return self._series_points(self._daily([metric], **filters), metric, freq, shape)
+
+    @cached_result
+    def breakdown(
+        self, by: str = "region", metric: str = "net_sales", shape: str = "records", **filters
+    ):
+        _check_columns(by, metric)
+        where, params = _where(**filters)
+        grouped = self._frame(
+            f"""
+            SELECT {by}, COALESCE(SUM({metric}), 0) AS {metric}
+            FROM sales_fact
+            WHERE {where} AND {by} IS NOT NULL
+            GROUP BY {by}
+            """,
+            params,
+        )
+        return self._breakdown_rows(grouped, by, metric, shape)
+
+    @cached_result
+    def anomalies(
+        self, metric: str = "net_sales", window: int = 7, shape: str = "records", **filters
+    ):
+        if self._monitored(metric, window, filters):
+            return self.monitor.anomalies(metric, shape)
+        return self._anomaly_points(self._daily([metric], **filters), metric, window, shape)
+
+    @cached_result
+    def inventory_summary(self, **filters) -> Dict:
+        where, params = _where(**filters)
+        row = self._row(
+            f"""
+            WITH filtered AS (
+                SELECT date, inventory_level, forecast_demand FROM sales_fact WHERE {where}
+            )
+            SELECT
+                COALESCE((SELECT SUM(inventory_level) FROM filtered), 0),
+                COALESCE((SELECT SUM(forecast_demand) FROM filtered), 0),
+                (
+                    SELECT AVG(daily) FROM (
+                        SELECT COALESCE(SUM(forecast_demand), 0) AS daily
+                        FROM filtered
+                        WHERE date IS NOT NULL
+                        GROUP BY date
+                    )
+                )
+            """,
+            params,
+        )
+        return self._inventory_block(
+            total_inventory=row[0],
+            forecast=row[1],
+            daily_demand=row[2] or 0,
+        )
+
+    @cached_result
+    def inventory_series(self, shape: str = "records", **filters):
+        return self._inventory_points(
+            self._daily(["inventory_level", "forecast_demand"], **filters), shape
+        )
+
+    @cached_result
+    def supply_chain_summary(self, **filters) -> Dict:
+        where, params = _where(**filters)
+        row = self._row(
+            f"""
+            SELECT AVG(supply_lead_time_days), AVG(fulfillment_rate), AVG(backorder_rate)
+            FROM sales_fact
+            WHERE {where}
+            """,
+            params,
+        )
+        return self._supply_block(*(_nan_if_null(value) for value in row))
+
+    @cached_result
+    def marketing_performance(self, limit: int = 10, shape: str = "records", **filters):
+        where, params = _where(**filters)
+        grouped = self._frame(
+            f"""
+            SELECT
+                campaign_name,
+                COALESCE(SUM(net_sales), 0) AS net_sales,
+                COALESCE(SUM(marketing_spend), 0) AS marketing_spend
+            FROM sales_fact
+            WHERE {where} AND campaign_name IS NOT NULL
+            GROUP BY campaign_name
+            ORDER BY campaign_name
+            """,
+            params,
+        )
+        return self._campaign_rows(grouped, limit, shape)
+
+    def filter_options(self) -> Dict[str, list]:
+        row = self._row(
+            """
+            SELECT
+                list_sort(list_distinct(list(region))),
+                list_sort(list_distinct(list(country))),
+                list_sort(list_distinct(list(channel))),
+                list_sort(list_distinct(list(category))),
+                list_sort(list_distinct(list(promo_flag))),
+                list_sort(list_distinct(list(campaign_name))),
+                CAST(MIN(date) AS DATE),
+                CAST(MAX(date) AS DATE)
+            FROM sales_fact
+            """
+        )
+        keys = ["regions", "countries", "channels", "categories", "promo_flags", "campaigns"]
+        options = {key: list(values or []) for key, values in zip(keys, row)}
+        options["date_range"] = [row[6].isoformat(), row[7].isoformat()]
+        return options
+
+    def profile(self) -> Dict:
+        row = self._row(
+            """
+            SELECT
+                COUNT(*),
+                CAST(MAX(date) AS DATE),
+                CAST(MIN(date) AS DATE),
+                COUNT(DISTINCT category),
+                COUNT(DISTINCT region)
+            FROM sales_fact
+            """
+        )
+        columns = len(self._rows("DESCRIBE sales_fact"))
+        return {
+            "rows": row[0],
+            "columns": columns,
+            "latest_date": row[1].isoformat(),
+            "earliest_date": row[2].isoformat(),
+            "categories": row[3],
+            "regions": row[4],
+        }
+
+    def export_batches(
+        self, columns: Optional[List[str]] = None, batch_rows: int = 50_000, **filters
+    ) -> Iterator[pd.DataFrame]:
+        """Stream filtered rows out of DuckDB without materializing the full result."""
+        known = {row[0] for row in self._rows("DESCRIBE sales_fact")}
+        projection = (
+            ", ".join(columns) if columns is not None and set(columns) <= known else "*"
+        )
+        where, params = _where(**filters)
+        # The cursor stays open while the caller iterates and is closed when the generator
+        # finishes or is discarded. DuckDB hands results over in vectors of 2048 rows.
+        sql = f"SELECT {projection} FROM sales_fact WHERE {where}"
+        with self._execute(sql, params) as cursor:
+            vectors = max(1, batch_rows // 2048)
+            batch = cursor.fetch_df_chunk(vectors)
+            yield batch
+            while True:
+                batch = cursor.fetch_df_chunk(vectors)
+                if batch.empty:
+                    return
+                yield batch
+
+    def _filter_frame(self, *args, **filters) -> pd.DataFrame:
+        where, params = _where(*args, **filters)
+        return self._frame(f"SELECT * FROM sales_fact WHERE {where}", params)
+
+    def _dashboard_cells(self, **filters) -> pd.DataFrame:
+        where, params = _where(**filters)
+        measures = [f"COALESCE(SUM({column}), 0) AS {column}" for column in SUM_MEASURES]
+        for column in MEAN_MEASURES:
+            measures.append(f"SUM({column}) AS {column}_sum")
+            measures.append(f"COUNT({column}) AS {column}_count")
+        keys = ", ".join(DASHBOARD_CELLS)
+        return self._frame(
+            f"""
+            SELECT {keys}, {", ".join(measures)}
+            FROM sales_fact
+            WHERE {where}
+            GROUP BY {keys}
+            ORDER BY date
+            """,
+            params,
+        )
+
+    def _window_totals(self, windows: List[Window], **filters) -> List[Dict]:
+        """Tag rows with every window they fall in and aggregate all windows in one GROUP BY."""
+        filters = {key: value for key, value in filters.items() if key not in ("start", "end")}
+        where, params = _where(**filters)
+        values = ", ".join("(?, CAST(? AS TIMESTAMP), CAST(? AS TIMESTAMP))" for _ in windows)
+        bounds = [
+            value
+            for position, (lo, hi) in enumerate(windows)
+            for value in (
+                position,
+                lo.to_pydatetime() if lo is not None else None,
+                hi.to_pydatetime() if hi is not None else None,
+            )
+        ]
+        rows = self._rows(
+            f"""
+            WITH windows(id, lo, hi) AS (VALUES {values})
+            SELECT
+                w.id,
+                COALESCE(SUM(f.net_sales), 0),
+                COALESCE(SUM(f.units_sold), 0),
+                COALESCE(SUM(f.marketing_spend), 0),
+                AVG(f.discount_rate)
+            FROM windows AS w
+            LEFT JOIN (
+                SELECT date, net_sales, units_sold, marketing_spend, discount_rate
+                FROM sales_fact
+                WHERE {where}
+            ) AS f
+                ON (w.lo IS NULL OR f.date >= w.lo) AND (w.hi IS NULL OR f.date <= w.hi)
+            GROUP BY w.id
+            """,
+            bounds + params,
+        )
+        totals: List[Dict] = [{} for _ in windows]
+        for position, net_sales, units_sold, marketing_spend, avg_discount in rows:
+            totals[position] = {
+                "net_sales": net_sales,
+                "units_sold": units_sold,
+                "marketing_spend": marketing_spend,
+                "avg_discount": _nan_if_null(avg_discount),
+            }
+        return totals
+
+    def _segment_daily(self, metrics: List[str], **filters) -> pd.DataFrame:
+        _check_columns(*metrics)
+        where, params = _where(**filters)
+        keys = ", ".join(["date", *SEGMENT_DIMENSIONS])
+        sums = ", ".join(f"COALESCE(SUM({metric}), 0) AS {metric}" for metric in metrics)
+        return self._frame(
+            f"SELECT {keys}, {sums} FROM sales_fact WHERE {where} GROUP BY {keys}", params
+        )
+
+    def _daily(self, metrics: List[str], **filters) -> pd.DataFrame:
+        """Per-day sums of ``metrics``; calendar bucketing then runs on this small frame."""
+        _check_columns(*metrics)
+        where, params = _where(**filters)
+        sums = ", ".join(f"COALESCE(SUM({metric}), 0) AS {metric}" for metric in metrics)
+        return self._frame(
+            f"""
+            SELECT date, {sums}
+            FROM sales_fact
+            WHERE {where} AND date IS NOT NULL
+            GROUP BY date
+            ORDER BY date
+            """,
+            params,
+        )
+
+    def _execute(self, sql: str, params: Optional[list] = None) -> duckdb.DuckDBPyConnection:
+        # A cursor is an independent connection to the same database, safe to use per thread;
+        # callers close it (``with``) once its result has been fetched.
+        cursor = self._con.cursor()
+        try:
+            return cursor.execute(sql, params or [])
+        except BaseException:
+            cursor.close()
+            raise
+
+    def _frame(self, sql: str, params: Optional[list] = None) -> pd.DataFrame:
+        with self._execute(sql, params) as cursor:
+            return cursor.df()
+
+    def _row(self, sql: str, params: Optional[list] = None) -> Tuple:
+        with self._execute(sql, params) as cursor:
+            return cursor.fetchone()
+
+    def _rows(self, sql: str, params: Optional[list] = None) -> List[Tuple]:
+        with self._execute(sql, params) as cursor:
+            return cursor.fetchall()
+
+
+def _where(
+    start=None,
+    end=None,
+    region=None,
+    category=None,
+    channel=None,
+    promo_flag=None,
+    campaign=None,
+    **_,
+) -> Tuple[str, list]:
+    """Compile a filter payload into a SQL predicate with positional parameters."""
+    clauses: List[str] = ["TRUE"]
+    params: list = []
+    if start:
+        clauses.append("date >= ?")
+        params.append(pd.to_datetime(start).to_pydatetime())
+    if end:
+        clauses.append("date <= ?")
+        params.append(pd.to_datetime(end).to_pydatetime())
+    requested = {
+        "region": region,
+        "category": category,
+        "channel": channel,
+        "promo_flag": promo_flag,
+        "campaign": campaign,
+    }
+    for keyword, value in requested.items():
+        if value:
+            values = as_list(value)
+            placeholders = ", ".join("?" for _ in values)
+            clauses.append(f"{DIMENSIONS[keyword]} IN ({placeholders})")
+            params.extend(values)
+    return " AND ".join(clauses), params
+
+
+def _check_columns(*columns: str) -> None:
+    # Column names are interpolated into SQL, so only fact-table columns are accepted.
+    for column in columns:
+        if column not in REQUIRED_COLUMNS:
+            raise KeyError(column)
+
+
+def _nan_if_null(value) -> float:
+    return float("nan") if value is None else value
@@ -0,0 +1,110 @@
+"""Bounded thread pools that keep blocking analytics work off the event loop."""
+from __future__ import annotations
+
+import asyncio
+import functools
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterator
+
+
+_DONE = object()
+
+
+class ExecutorSaturated(RuntimeError):
+    """Raised when a pool's queue is full and a new job is turned away."""
+
+
+class BoundedExecutor:
+    """
+    Thread pool with a fixed number of workers and a cap on queued jobs.
+    Queue depth, running jobs and queue-wait percentiles are tracked so saturation is
+    visible before it shows up as latency; jobs beyond ``max_queue`` are rejected
+    instead of piling up behind slow work.
+    """
+
+    def __init__(self, name: str, workers: int, max_queue: int = 0) -> None:
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue  # 0 = unbounded
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.peak_queued = 0
+        self._waits: "deque[float]" = deque(maxlen=1024)
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"rabbitt-{name}")
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run ``fn`` on the pool and await its result."""
+        with self._lock:
+            if self.max_queue and self.queued >= self.max_queue:
+                self.rejected += 1
+                raise ExecutorSaturated(f"The {self.name} pool is saturated; retry shortly.")
+        return await self._submit(functools.partial(fn, *args, **kwargs))
+
+    async def iterate(self, iterator: Iterator) -> AsyncIterator:
+        """
+        Drive a blocking iterator on the pool, one item per job.
+        Continuation steps skip admission control so an accepted stream is never cut short.
+        """
+        while True:
+            item = await self._submit(functools.partial(next, iterator, _DONE))
+            if item is _DONE:
+                return
+            yield item
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._waits)
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queued": self.queued,
+                "running": self.running,
+                "peak_queued": self.peak_queued,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "queue_wait_ms_p50": _percentile(waits, 0.50),
+                "queue_wait_ms_p95": _percentile(waits, 0.95),
+            }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _submit(self, job: Callable) -> Any:
+        with self._lock:
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self._call, job, time.perf_counter())
+
+    def _call(self, job: Callable, submitted: float) -> Any:
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+            self._waits.append((time.perf_counter() - submitted) * 1000)
+        failed = False
+        try:
+            return job()
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            with self._lock:
+                self.running -= 1
+                if failed:
+                    self.failed += 1
+                else:
+                    self.completed += 1
+
+
+def _percentile(ordered: list, fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 3)
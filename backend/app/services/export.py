@@ -1,10 +1,31 @@
 """Data export service supporting multiple formats."""
 import io
 import json
-from typing import Dict
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator
 
+import duckdb
 import pandas as pd
 
+from .dtypes import widen_floats
+
+try:
+    import pyarrow as pa
+except ImportError:  # in requirements.txt; without it only Arrow IPC export is refused
+    pa = None
+
+
+# Formats produced batch by batch: fmt -> (content type, file extension).
+STREAMING_FORMATS: Dict[str, tuple] = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "json": ("application/json", "json"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrow"),
+}
+FILE_CHUNK_BYTES = 1024 * 1024
+
 
 class ExportService:
     @staticmethod
@@ -32,6 +53,96 @@ class ExportService:
             # Fallback to CSV if openpyxl not installed
             return ExportService.export_to_csv(frame)
 
+    @staticmethod
+    def stream_csv(batches: Iterable[pd.DataFrame]) -> Iterator[bytes]:
+        header = True
+        for batch in batches:
+            yield batch.to_csv(index=False, header=header).encode("utf-8")
+            header = False
+
+    @staticmethod
+    def stream_ndjson(batches: Iterable[pd.DataFrame]) -> Iterator[bytes]:
+        for batch in batches:
+            if not batch.empty:
+                yield batch.to_json(orient="records", lines=True, date_format="iso").encode("utf-8")
+
+    @staticmethod
+    def stream_json(batches: Iterable[pd.DataFrame]) -> Iterator[bytes]:
+        """A JSON array of records, emitted one batch of records at a time."""
+        yield b"["
+        separator = b""
+        for batch in batches:
+            if not batch.empty:
+                records = batch.to_json(orient="records", date_format="iso")
+                yield separator + records[1:-1].encode("utf-8")
+                separator = b","
+        yield b"]"
+
+    @staticmethod
+    def stream_parquet(batches: Iterable[pd.DataFrame]) -> Iterator[bytes]:
+        """
+        Load batches into a disk-backed DuckDB table, then copy it out as Parquet.
+        Parquet's footer is written last, so the file is streamed once it is complete.
+        """
+        with tempfile.TemporaryDirectory() as workdir:
+            target = Path(workdir) / "export.parquet"
+            con = duckdb.connect(str(Path(workdir) / "export.duckdb"))
+            created = False
+            for batch in batches:
+                con.register("batch_df", batch)
+                if created:
+                    con.execute("INSERT INTO export BY NAME SELECT * FROM batch_df")
+                else:
+                    con.execute("CREATE TABLE export AS SELECT * FROM batch_df")
+                    created = True
+                con.unregister("batch_df")
+            con.execute(f"COPY export TO '{target.as_posix()}' (FORMAT PARQUET)")
+            con.close()
+            with target.open("rb") as handle:
+                while chunk := handle.read(FILE_CHUNK_BYTES):
+                    yield chunk
+
+    @staticmethod
+    def stream_arrow(batches: Iterable[pd.DataFrame]) -> Iterator[bytes]:
+        """Arrow IPC stream: the schema message, then one record batch message per batch."""
+        sink = io.BytesIO()
+        writer = schema = None
+        for batch in batches:
+            # Later batches are cast to the first batch's schema so every message matches it.
+            table = pa.Table.from_pandas(batch, schema=schema, preserve_index=False)
+            if writer is None:
+                schema = table.schema
+                writer = pa.ipc.new_stream(sink, schema)
+            writer.write_table(table)
+            yield _drain(sink)
+        if writer is not None:
+            writer.close()
+            yield _drain(sink)
+
+    @staticmethod
+    def stream_export(batches: Iterable[pd.DataFrame], fmt: str = "csv") -> Dict[str, Any]:
+        """
+        Prepare a streamed export of row batches; memory stays bounded by the batch size.
+        Returns dict with 'chunks' (iterator of bytes), 'content_type' and 'extension'.
+        """
+        if fmt == "arrow" and pa is None:
+            raise ValueError("Arrow export requires the pyarrow package.")
+        if fmt not in STREAMING_FORMATS:
+            fmt = "csv"
+        writers = {
+            "csv": ExportService.stream_csv,
+            "ndjson": ExportService.stream_ndjson,
+            "json": ExportService.stream_json,
+            "parquet": ExportService.stream_parquet,
+            "arrow": ExportService.stream_arrow,
+        }
+        content_type, extension = STREAMING_FORMATS[fmt]
+        return {
+            "chunks": writers[fmt](map(widen_floats, batches)),
+            "content_type": content_type,
+            "extension": extension,
+        }
+
     @staticmethod
     def prepare_export(
         frame: pd.DataFrame,
@@ -43,6 +154,7 @@ class ExportService:
         Prepare data export in requested format.
         Returns dict with 'data' (bytes) and 'content_type' for HTTP response.
         """
+        frame = widen_floats(frame)
         # Apply filters if provided
         if filters:
             for key, value in filters.items():
@@ -76,3 +188,10 @@ class ExportService:
                 "extension": "csv",
             }
 
+
+
+def _drain(sink: io.BytesIO) -> bytes:
+    data = sink.getvalue()
+    sink.seek(0)
+    sink.truncate()
+    return data
@@ -0,0 +1,217 @@
+"""Index-backed row selection over the sales fact table."""
+from __future__ import annotations
+
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+
+# Filter keyword -> fact table column.
+DIMENSIONS: Dict[str, str] = {
+    "region": "region",
+    "category": "category",
+    "channel": "channel",
+    "promo_flag": "promo_flag",
+    "campaign": "campaign_name",
+}
+
+Rows = Union[slice, np.ndarray]
+
+
+def as_list(value) -> List:
+    return value if isinstance(value, list) else [value]
+
+
+class DimensionIndex:
+    """Dictionary-encoded column with one precomputed row bitmap per value."""
+
+    def __init__(
+        self, codes: np.ndarray, values: List, bitmaps: Optional[List[np.ndarray]] = None
+    ) -> None:
+        self.codes = codes
+        self.values = values
+        self.lookup = {value: position for position, value in enumerate(values)}
+        if bitmaps is None:
+            bitmaps = [codes == position for position in range(len(values))]
+        self.bitmaps = bitmaps
+
+    @classmethod
+    def from_values(cls, values: pd.Series) -> "DimensionIndex":
+        codes, uniques = pd.factorize(values, use_na_sentinel=True)
+        return cls(codes.astype(np.int32, copy=False), list(uniques))
+
+    def extend(self, values: pd.Series) -> "DimensionIndex":
+        """Return an index over the current rows followed by ``values``."""
+        tail_codes, tail_uniques = pd.factorize(values, use_na_sentinel=True)
+        merged = list(self.values)
+        lookup = dict(self.lookup)
+        remap = np.empty(len(tail_uniques) + 1, dtype=np.int32)
+        remap[-1] = -1  # factorize's NA sentinel indexes the last slot
+        for position, value in enumerate(tail_uniques):
+            if value not in lookup:
+                lookup[value] = len(merged)
+                merged.append(value)
+            remap[position] = lookup[value]
+        tail = remap[tail_codes]
+        head = len(self.codes)
+        # Only the tail is compared against each value; existing bitmaps are copied as-is.
+        bitmaps = [
+            np.concatenate([bitmap, tail == position])
+            for position, bitmap in enumerate(self.bitmaps)
+        ]
+        bitmaps += [
+            np.concatenate([np.zeros(head, dtype=bool), tail == position])
+            for position in range(len(self.values), len(merged))
+        ]
+        return DimensionIndex(np.concatenate([self.codes, tail]), merged, bitmaps)
+
+    def mask(self, wanted: Iterable, rows: slice = slice(None)) -> np.ndarray:
+        positions = [self.lookup[value] for value in wanted if value in self.lookup]
+        if not positions:
+            return np.zeros(len(self.codes[rows]), dtype=bool)
+        if len(positions) == 1:
+            return self.bitmaps[positions[0]][rows]
+        return np.logical_or.reduce([self.bitmaps[position][rows] for position in positions])
+
+
+class FrameView:
+    """
+    Read-only projection of selected rows of a frame.
+    Columns are gathered on first access, so aggregations only pay for what they read.
+    """
+
+    def __init__(self, frame: pd.DataFrame, rows: Rows) -> None:
+        self._frame = frame
+        self._rows = rows
+        self._columns: Dict[str, pd.Series] = {}
+
+    def __len__(self) -> int:
+        if isinstance(self._rows, slice):
+            return len(range(*self._rows.indices(len(self._frame))))
+        return len(self._rows)
+
+    @property
+    def empty(self) -> bool:
+        return len(self) == 0
+
+    @property
+    def columns(self) -> pd.Index:
+        return self._frame.columns
+
+    def column(self, name: str) -> pd.Series:
+        if name not in self._columns:
+            source = self._frame[name]
+            if isinstance(self._rows, slice):
+                self._columns[name] = source.iloc[self._rows]
+            else:
+                self._columns[name] = source.take(self._rows)
+        return self._columns[name]
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.column(key)
+        return self.to_frame(list(key))
+
+    def batches(self, size: int, columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+        """Selected rows as consecutive frames of at most ``size`` rows."""
+        source = self._frame if columns is None else self._frame[columns]
+        if isinstance(self._rows, slice):
+            start, stop, _ = self._rows.indices(len(self._frame))
+            for offset in range(start, max(stop, start + 1), size):
+                yield source.iloc[offset : min(offset + size, stop)]
+        else:
+            for offset in range(0, max(len(self._rows), 1), size):
+                yield source.take(self._rows[offset : offset + size])
+
+    def to_frame(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        if columns is None:
+            if isinstance(self._rows, slice):
+                return self._frame.iloc[self._rows]
+            return self._frame.take(self._rows)
+        return pd.DataFrame({name: self.column(name) for name in columns})
+
+
+class FrameIndex:
+    """
+    Precomputed dimension bitmaps that turn filter payloads into row selections.
+    When the frame is sorted by ``date`` the date column acts as the primary index:
+    ``start``/``end`` are resolved by binary search into one contiguous slice, and
+    dimension bitmaps are only combined over that slice.
+    """
+
+    def __init__(
+        self, frame: pd.DataFrame, dimensions: Optional[Dict[str, DimensionIndex]] = None
+    ) -> None:
+        self.frame = frame
+        self.dates = frame["date"].to_numpy()
+        self.date_sorted = bool(frame["date"].is_monotonic_increasing)
+        if dimensions is None:
+            dimensions = {
+                keyword: DimensionIndex.from_values(frame[column])
+                for keyword, column in DIMENSIONS.items()
+                if column in frame.columns
+            }
+        self.dimensions = dimensions
+
+    def extend(self, frame: pd.DataFrame) -> "FrameIndex":
+        """
+        Index ``frame`` whose leading rows are exactly the rows indexed here.
+        Only the appended tail is encoded and matched against each value; the existing codes
+        and bitmaps are carried over rather than recomputed.
+        """
+        tail = frame.iloc[len(self.frame):]
+        dimensions = {
+            keyword: dimension.extend(tail[DIMENSIONS[keyword]])
+            for keyword, dimension in self.dimensions.items()
+        }
+        return FrameIndex(frame, dimensions)
+
+    def date_range(self, start=None, end=None) -> slice:
+        """Contiguous row slice covering ``start``..``end`` (inclusive) on a date-sorted frame."""
+        lo = (
+            int(np.searchsorted(self.dates, pd.to_datetime(start).to_datetime64(), side="left"))
+            if start
+            else 0
+        )
+        hi = (
+            int(np.searchsorted(self.dates, pd.to_datetime(end).to_datetime64(), side="right"))
+            if end
+            else len(self.dates)
+        )
+        return slice(lo, max(lo, hi))
+
+    def select(
+        self,
+        start=None,
+        end=None,
+        region=None,
+        category=None,
+        channel=None,
+        promo_flag=None,
+        campaign=None,
+        **_,
+    ) -> FrameView:
+        requested = {
+            "region": region,
+            "category": category,
+            "channel": channel,
+            "promo_flag": promo_flag,
+            "campaign": campaign,
+        }
+        masks = []
+        if self.date_sorted:
+            window = self.date_range(start, end)
+        else:
+            window = slice(0, len(self.dates))
+            if start:
+                masks.append(self.dates >= pd.to_datetime(start).to_datetime64())
+            if end:
+                masks.append(self.dates <= pd.to_datetime(end).to_datetime64())
+        for keyword, value in requested.items():
+            if value and keyword in self.dimensions:
+                masks.append(self.dimensions[keyword].mask(as_list(value), window))
+        if not masks:
+            return FrameView(self.frame, window)
+        combined = masks[0] if len(masks) == 1 else np.logical_and.reduce(masks)
+        return FrameView(self.frame, window.start + np.flatnonzero(combined))
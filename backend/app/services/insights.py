@@ -4,11 +4,92 @@ from __future__ import annotations
 import math
 import statistics
 from dataclasses import dataclass
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 
+from .anomalies import SCAN_METRICS, SEGMENT_DIMENSIONS, AnomalyMonitor, scan_segments
+from .cache import ResultCache, cached_batch, cached_call, cached_result
+from .cube import AggregateCube
+from .data_loader import Dataset
+from .dtypes import memory_report
+from .filtering import FrameIndex, FrameView
+from .planner import QueryPlan, QuestionParser, fold_question
+from .serialization import iso_dates, rounded, shaped
+
+
+# Cube measures summed per KPI window.
+WINDOW_MEASURES = [
+    "net_sales",
+    "units_sold",
+    "marketing_spend",
+    "discount_rate_sum",
+    "discount_rate_count",
+]
+SUPPLY_COLUMNS = ["supply_lead_time_days_sum", "fulfillment_rate_sum", "backorder_rate_sum"]
+
+
+# Widgets served by the batched /api/dashboard endpoint.
+DASHBOARD_WIDGETS = [
+    "kpis",
+    "series",
+    "region_breakdown",
+    "category_breakdown",
+    "anomalies",
+    "recommendations",
+    "inventory_summary",
+    "inventory_series",
+    "supply",
+    "marketing",
+]
+# Pre-aggregated cells the dashboard widgets are derived from.
+DASHBOARD_CELLS = ["date", "region", "category", "campaign_name"]
+
+# Wording of plan measures, group-bys and grains in chat narratives.
+LABELS = {"net_sales": "sales", "units_sold": "units", "marketing_spend": "marketing spend"}
+PLURALS = {
+    "region": "regions",
+    "country": "countries",
+    "channel": "channels",
+    "category": "categories",
+}
+GRAIN_LABELS = {"D": "Daily", "W": "Weekly", "M": "Monthly", "Q": "Quarterly"}
+# API grains as pandas offset aliases: months are labelled by their first day, quarters
+# by their last (pandas deprecated the bare "Q" alias for "QE").
+FREQ_ALIASES = {"M": "MS", "Q": "QE"}
+
+
+# Inclusive (start, end) date window; ``None`` leaves that side open.
+Window = Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp]]
+
+
+def _window(start, end) -> Window:
+    return (pd.Timestamp(start) if start else None, pd.Timestamp(end) if end else None)
+
+
+def _previous_window(start, end) -> Optional[Window]:
+    """The equally long window ending where ``start..end`` begins, for growth figures."""
+    if not start or not end:
+        return None
+    start_dt, end_dt = pd.Timestamp(start), pd.Timestamp(end)
+    return (start_dt - (end_dt - start_dt), start_dt)
+
+
+def _merge_windows(windows: List[Window]) -> List[Window]:
+    """Union of ``windows`` as disjoint windows, so overlapping rows are gathered once."""
+    merged: List[List[pd.Timestamp]] = []
+    bounds = sorted((lo or pd.Timestamp.min, hi or pd.Timestamp.max) for lo, hi in windows)
+    for lo, hi in bounds:
+        if merged and lo <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], hi)
+        else:
+            merged.append([lo, hi])
+    return [
+        (None if lo == pd.Timestamp.min else lo, None if hi == pd.Timestamp.max else hi)
+        for lo, hi in merged
+    ]
+
 
 @dataclass
 class KPIBlock:
@@ -19,105 +100,145 @@ class KPIBlock:
     growth_vs_prev_period: float
 
 
-class InsightEngine:
-    def __init__(self, frame: pd.DataFrame) -> None:
-        self.frame = frame.copy()
+class BaseInsightEngine:
+    """
+    Shared surface of the insight engines.
+    Subclasses provide the aggregation primitives (``kpis``, ``series``, ``breakdown``, ...);
+    composite insights and response shaping live here so every backend answers alike.
+    """
 
-    def update_frame(self, frame: pd.DataFrame) -> None:
-        self.frame = frame.copy()
+    cache: Optional[ResultCache] = None
+    monitor: Optional[AnomalyMonitor] = None
+    _parser: Optional[QuestionParser] = None
 
-    # KPI aggregates
-    def kpis(
-        self,
-        start=None,
-        end=None,
-        region=None,
-        category=None,
-        channel=None,
-        promo_flag=None,
-        campaign=None,
-    ) -> KPIBlock:
-        filtered = self._filter_frame(
-            start, end, region, category, channel=channel, promo_flag=promo_flag, campaign=campaign
-        )
-        prev_period = self._previous_period_frame(
-            start, end, region, category, channel, promo_flag, campaign
-        )
-        total_sales = float(filtered["net_sales"].sum())
-        total_units = int(filtered["units_sold"].sum())
-        avg_discount = float(filtered["discount_rate"].mean() or 0)
-        marketing_efficiency = (
-            float(filtered["net_sales"].sum() / filtered["marketing_spend"].sum())
-            if filtered["marketing_spend"].sum() > 0
-            else 0.0
-        )
-        growth = self._growth_percentage(filtered, prev_period)
-        return KPIBlock(
-            total_sales=round(total_sales, 2),
-            total_units=total_units,
-            avg_discount=round(avg_discount, 4),
-            marketing_efficiency=round(marketing_efficiency, 4),
-            growth_vs_prev_period=round(growth, 4),
+    def track_anomalies(self, since=None) -> None:
+        """Advance the anomaly monitor over days from ``since`` (all history when None)."""
+        if self.monitor is not None:
+            metrics = self.monitor.metrics
+            self.monitor.update(lambda **filters: self._daily(metrics, **filters), since)
+
+    def _monitored(self, metric: str, window: int, filters: Dict) -> bool:
+        """Whether stored monitor results answer an anomaly request."""
+        return (
+            self.monitor is not None
+            and not any(filters.values())
+            and self.monitor.covers(metric, window)
         )
 
-    # Time series
-    def series(self, metric: str = "net_sales", freq: str = "M", **filters) -> List[Dict]:
-        filtered = self._filter_frame(**filters)
-        freq_alias = "MS" if freq == "M" else freq
-        grouper = filtered.set_index("date").groupby(pd.Grouper(freq=freq_alias))[metric].sum()
-        return [{"period": str(idx.date()), "value": round(val, 2)} for idx, val in grouper.items()]
+    @cached_result
+    def recommendations(self, limit: int = 5, **filters) -> List[str]:
+        return self.analysis(**filters).recommendations(limit)
 
-    # Category or region breakdown
-    def breakdown(self, by: str = "region", metric: str = "net_sales", **filters) -> List[Dict]:
-        filtered = self._filter_frame(**filters)
-        breakdown_df = (
-            filtered.groupby(by)[metric].sum().sort_values(ascending=False).reset_index()
+    def analysis(self, **filters) -> "AnalysisContext":
+        """Per-request context sharing filtered cells and group-bys between insights."""
+        return AnalysisContext(self, filters)
+
+    def period_kpis(self, periods: List[Tuple], **filters) -> List[KPIBlock]:
+        """
+        KPI blocks for any number of ``(start, end)`` periods, each with growth against
+        the equally long window before it. Each period is cached under the key of the
+        matching ``kpis(start, end, ...)`` call, so comparisons, the dashboard and chat
+        reuse one another's windows; the periods not cached are aggregated in one scan
+        over their union, computing windows shared between them once.
+        """
+        periods = list(periods)
+        return cached_batch(
+            self,
+            "kpis",
+            [{"start": start, "end": end, **filters} for start, end in periods],
+            lambda missing: self._period_kpis([periods[i] for i in missing], **filters),
         )
-        total = breakdown_df[metric].sum() or 1
-        breakdown_df["share"] = breakdown_df[metric] / total
-        return [
-            {
-                by: row[by],
-                "value": round(row[metric], 2),
-                "share": round(row["share"], 4),
-            }
-            for _, row in breakdown_df.iterrows()
-        ]
 
-    # Anomaly detection (simple z-score against rolling mean)
-    def anomalies(self, metric: str = "net_sales", window: int = 7, **filters) -> List[Dict]:
-        filtered = self._filter_frame(**filters)
-        ts = filtered.set_index("date").groupby(pd.Grouper(freq="D"))[metric].sum().fillna(0)
-        rolling = ts.rolling(window=window, min_periods=window).mean()
-        std = ts.rolling(window=window, min_periods=window).std()
-        z_scores = (ts - rolling) / std
-        anomalies = z_scores[abs(z_scores) >= 2].dropna()
+    def _period_kpis(self, periods: List[Tuple], **filters) -> List[KPIBlock]:
+        windows: Dict[Window, int] = {}
+        pairs = []
+        for start, end in periods:
+            current = windows.setdefault(_window(start, end), len(windows))
+            previous = _previous_window(start, end)
+            if previous is not None:
+                previous = windows.setdefault(previous, len(windows))
+            pairs.append((current, previous))
+        totals = self._window_totals(list(windows), **filters)
         return [
-            {
-                "date": idx.date().isoformat(),
-                "metric": metric,
-                "value": round(ts.loc[idx], 2),
-                "z_score": round(z_scores.loc[idx], 2),
-            }
-            for idx in anomalies.index
+            self._kpi_block(
+                total_sales=totals[current]["net_sales"],
+                total_units=totals[current]["units_sold"],
+                avg_discount=totals[current]["avg_discount"],
+                marketing_spend=totals[current]["marketing_spend"],
+                previous_sales=totals[previous]["net_sales"] if previous is not None else 0.0,
+            )
+            for current, previous in pairs
         ]
 
-    def recommendations(self, limit: int = 5, **filters) -> List[str]:
+    @cached_result
+    def anomaly_scan(
+        self,
+        metrics: Optional[List[str]] = None,
+        window: int = 7,
+        threshold: float = 2.0,
+        limit: int = 20,
+        shape: str = "records",
+        **filters,
+    ):
+        """Top anomalies across every region x category x channel segment and metric."""
+        metrics = list(metrics or SCAN_METRICS)
+        return scan_segments(
+            self._segment_daily(metrics, **filters), metrics, window, threshold, limit, shape=shape
+        )
+
+    @cached_result
+    def dashboard(
+        self, widgets: Optional[List[str]] = None, freq: str = "M", **filters
+    ) -> Dict[str, object]:
+        """
+        Compute several dashboard widgets from one filtered pass.
+        Every widget, including the composed recommendations, is derived from the
+        request's shared :class:`AnalysisContext`.
+        """
+        widgets = widgets or DASHBOARD_WIDGETS
+        unknown = [widget for widget in widgets if widget not in DASHBOARD_WIDGETS]
+        if unknown:
+            raise ValueError(f"Unknown dashboard widgets: {', '.join(unknown)}")
+        context = self.analysis(**filters)
+        builders = {
+            "kpis": lambda: context.kpis().__dict__,
+            "series": lambda: context.series(freq),
+            "region_breakdown": lambda: context.breakdown("region"),
+            "category_breakdown": lambda: context.breakdown("category"),
+            "anomalies": context.anomalies,
+            "recommendations": context.recommendations,
+            "inventory_summary": context.inventory_summary,
+            "inventory_series": context.inventory_series,
+            "supply": context.supply_chain_summary,
+            "marketing": context.marketing_performance,
+        }
+        return {name: builders[name]() for name in widgets}
+
+    @staticmethod
+    def _mean(view, column: str) -> float:
+        """Row-weighted mean of ``column`` for raw rows as well as cube cells."""
+        if f"{column}_count" in view.columns:
+            count = view[f"{column}_count"].sum()
+            return view[f"{column}_sum"].sum() / count if count else float("nan")
+        return view[column].mean()
+
+    @staticmethod
+    def _recommendation_statements(
+        region_mix: List[Dict], anomalies: List[Dict], category_mix: List[Dict], limit: int
+    ) -> List[str]:
         statements: List[str] = []
-        top_regions = self.breakdown("region", **filters)[:3]
+        top_regions = region_mix[:3]
         if top_regions:
             top = top_regions[0]
             statements.append(
                 f"Double down on {top['region']} where it contributes {top['share']*100:.1f}% of sales."
             )
-        anomalies = self.anomalies(**filters)
         if anomalies:
             latest = anomalies[-1]
             direction = "spike" if latest["z_score"] > 0 else "drop"
             statements.append(
                 f"Investigate {direction} on {latest['date']} for {latest['metric']} (z={latest['z_score']})."
             )
-        category_mix = self.breakdown("category", **filters)
         if category_mix:
             laggards = category_mix[-1]
             statements.append(
@@ -129,96 +250,66 @@ class InsightEngine:
             )
         return statements[:limit]
 
-    def inventory_summary(self, **filters) -> Dict:
-        filtered = self._filter_frame(**filters)
-        total_inventory = int(filtered["inventory_level"].sum())
-        forecast = int(filtered["forecast_demand"].sum())
-        variance = total_inventory - forecast
-        daily_demand = (
-            filtered.groupby("date")["forecast_demand"].sum().mean() if not filtered.empty else 0
-        )
-        coverage_days = round(total_inventory / daily_demand, 2) if daily_demand else 0
-        stockout_risk = max(forecast - total_inventory, 0) / forecast if forecast else 0
-        return {
-            "total_inventory": total_inventory,
-            "forecast_demand": forecast,
-            "variance": variance,
-            "coverage_days": coverage_days,
-            "stockout_risk": round(stockout_risk, 3),
-        }
-
-    def inventory_series(self, **filters) -> List[Dict]:
-        filtered = self._filter_frame(**filters)
-        grouped = (
-            filtered.groupby("date")[["inventory_level", "forecast_demand"]]
-            .sum()
-            .reset_index()
-            .sort_values("date")
-        )
-        return [
-            {
-                "date": row["date"].date().isoformat(),
-                "inventory": round(row["inventory_level"], 2),
-                "forecast": round(row["forecast_demand"], 2),
-            }
-            for _, row in grouped.iterrows()
-        ]
-
-    def supply_chain_summary(self, **filters) -> Dict:
-        filtered = self._filter_frame(**filters)
-        return {
-            "avg_lead_time": round(float(filtered["supply_lead_time_days"].mean() or 0), 2),
-            "fulfillment_rate": round(float(filtered["fulfillment_rate"].mean() or 0), 3),
-            "backorder_rate": round(float(filtered["backorder_rate"].mean() or 0), 3),
-        }
-
-    def marketing_performance(self, limit: int = 10, **filters) -> List[Dict]:
-        filtered = self._filter_frame(**filters)
-        grouped = (
-            filtered.groupby("campaign_name")[["net_sales", "marketing_spend"]]
-            .sum()
-            .reset_index()
+    def plan(self, question: str) -> QueryPlan:
+        """The query plan of ``question``; a repeated question reuses its parsed plan."""
+        parser = self._parser
+        if parser is None:  # compiled once per dataset from its dimension values
+            parser = self._parser = QuestionParser(self.filter_options())
+        return cached_call(
+            self, "plan", {"question": fold_question(question)}, lambda: parser.parse(question)
         )
-        grouped["roi"] = (grouped["net_sales"] - grouped["marketing_spend"]) / grouped[
-            "marketing_spend"
-        ].replace(0, np.nan)
-        grouped["roi"] = grouped["roi"].fillna(0)
-        grouped.sort_values("roi", ascending=False, inplace=True)
-        return [
-            {
-                "campaign_name": row["campaign_name"],
-                "net_sales": round(row["net_sales"], 2),
-                "marketing_spend": round(row["marketing_spend"], 2),
-                "roi": round(row["roi"], 3),
-            }
-            for _, row in grouped.head(limit).iterrows()
-        ]
 
     def narrative_answer(self, question: str, **filters) -> Dict:
         """
-        Rudimentary NL interpretation: looks for keywords to decide which aggregation to run.
-        Acts as a placeholder for LangChain SQL generation, enabling local demos without keys.
+        Answer ``question`` by running its query plan, with filters named in the question
+        (a region, "Q2", "last month") in place of the request's. Results are cached per
+        plan, so paraphrases that parse to the same plan share one answer.
         """
-        q_lower = question.lower()
-        if "stock" in q_lower or "inventory" in q_lower:
-            summary = self.inventory_summary(**filters)
-            series = self.inventory_series(**filters)
+        plan = self.plan(question)
+        answer = dict(
+            self.answer_plan(
+                plan.intent,
+                plan.metric,
+                plan.group_by,
+                plan.grain,
+                plan.limit,
+                **plan.scope(filters),
+            )
+        )
+        answer["plan"] = plan.as_dict()
+        return answer
+
+    @cached_result
+    def answer_plan(
+        self,
+        intent: str = "kpi",
+        metric: str = "net_sales",
+        group_by: Optional[str] = None,
+        grain: Optional[str] = None,
+        limit: Optional[int] = None,
+        **filters,
+    ) -> Dict:
+        """Run one query plan and phrase its result; every intent honours ``filters``."""
+        context = self.analysis(**filters)
+        if intent == "inventory":
+            summary = context.inventory_summary()
+            series = context.inventory_series()
             narrative = (
                 f"Total stock is {summary['total_inventory']:,} units vs "
                 f"{summary['forecast_demand']:,} forecast, providing "
                 f"{summary['coverage_days']} days of cover."
             )
             return {"type": "inventory", "narrative": narrative, "data": {"summary": summary, "series": series}}
-        if "supply" in q_lower or "lead time" in q_lower or "fulfillment" in q_lower:
-            summary = self.supply_chain_summary(**filters)
+        if intent == "supply":
+            summary = context.supply_chain_summary()
             narrative = (
                 f"Average lead time sits at {summary['avg_lead_time']} days with "
                 f"{summary['fulfillment_rate']*100:.1f}% fulfillment and "
                 f"{summary['backorder_rate']*100:.1f}% backorders."
             )
             return {"type": "supply", "narrative": narrative, "data": summary}
-        if "campaign" in q_lower or "marketing" in q_lower:
-            perf = self.marketing_performance(**filters)
+        if intent == "marketing":
+            perf = context.marketing_performance(limit or 10)
             if perf:
                 best = perf[0]
                 narrative = (
@@ -228,26 +319,32 @@ class InsightEngine:
             else:
                 narrative = "No marketing campaigns found for the selected filters."
             return {"type": "marketing", "narrative": narrative, "data": perf}
-        if "top" in q_lower and ("region" in q_lower or "country" in q_lower):
-            breakdown = self.breakdown("region", **filters)[:5]
-            summary = ", ".join(
-                f"{row['region']} ({row['share']*100:.1f}%)" for row in breakdown
-            )
-            return {
-                "type": "breakdown",
-                "narrative": f"Top regions by sales: {summary}.",
-                "data": breakdown,
-            }
-        if "category" in q_lower:
-            data = self.breakdown("category", **filters)
-            summary = f"{data[0]['category']} leads with {data[0]['share']*100:.1f}% share."
-            return {"type": "breakdown", "narrative": summary, "data": data}
-        if "trend" in q_lower or "over time" in q_lower or "quarter" in q_lower:
-            data = self.series(freq="Q", **filters)
-            summary = f"Quarterly sales ranged from {data[0]['value']:.0f} to {data[-1]['value']:.0f}."
-            return {"type": "series", "narrative": summary, "data": data}
-        if "why" in q_lower or "drop" in q_lower or "decline" in q_lower:
-            anomalies = self.anomalies()
+        if intent == "breakdown":
+            data = context.breakdown(group_by or "region", metric)[:limit]
+            if data:
+                summary = ", ".join(
+                    f"{row[group_by or 'region']} ({row['share']*100:.1f}%)" for row in data
+                )
+                narrative = f"Top {PLURALS[group_by or 'region']} by {LABELS[metric]}: {summary}."
+            else:
+                narrative = f"No {LABELS[metric]} found for the selected filters."
+            return {"type": "breakdown", "narrative": narrative, "data": data}
+        if intent == "series":
+            grain = grain or "Q"
+            if metric == "net_sales":
+                data = context.series(freq=grain)
+            else:
+                data = self.series(metric=metric, freq=grain, **filters)
+            if data:
+                narrative = (
+                    f"{GRAIN_LABELS[grain]} {LABELS[metric]} ranged from "
+                    f"{data[0]['value']:.0f} to {data[-1]['value']:.0f}."
+                )
+            else:
+                narrative = f"No {LABELS[metric]} found for the selected filters."
+            return {"type": "series", "narrative": narrative, "data": data}
+        if intent == "anomaly":
+            anomalies = context.anomalies(metric)
             if anomalies:
                 latest = anomalies[-1]
                 narrative = (
@@ -258,7 +355,7 @@ class InsightEngine:
                 narrative = "No significant anomalies detected in the selected window."
             return {"type": "anomaly", "narrative": narrative, "data": anomalies}
         # default KPI summary
-        kpi = self.kpis(**filters)
+        kpi = context.kpis()
         narrative = (
             f"Sales reached ${kpi.total_sales:,.0f} with {kpi.total_units:,} units. "
             f"Marketing efficiency sits at {kpi.marketing_efficiency:.2f} and discounts averaged "
@@ -270,7 +367,361 @@ class InsightEngine:
             "data": kpi.__dict__,
         }
 
-    def _filter_frame(
+    @staticmethod
+    def _kpi_block(
+        total_sales: float,
+        total_units: int,
+        avg_discount: float,
+        marketing_spend: float,
+        previous_sales: float,
+    ) -> KPIBlock:
+        total_sales = float(total_sales)
+        marketing_efficiency = (
+            float(total_sales / marketing_spend) if marketing_spend > 0 else 0.0
+        )
+        growth = (
+            (total_sales - previous_sales) / previous_sales if previous_sales != 0 else 0.0
+        )
+        return KPIBlock(
+            total_sales=round(total_sales, 2),
+            total_units=int(total_units),
+            avg_discount=round(float(avg_discount or 0), 4),
+            marketing_efficiency=round(marketing_efficiency, 4),
+            growth_vs_prev_period=round(growth, 4),
+        )
+
+    # Aggregates below are built as column lists straight from the grouped frame and only
+    # zipped into row dicts for the ``records`` shape (see ``serialization.shaped``).
+    @staticmethod
+    def _series_points(frame: pd.DataFrame, metric: str, freq: str, shape: str = "records"):
+        freq_alias = FREQ_ALIASES.get(freq, freq)
+        grouper = frame.set_index("date").groupby(pd.Grouper(freq=freq_alias))[metric].sum()
+        return shaped({"period": iso_dates(grouper.index), "value": rounded(grouper, 2)}, shape)
+
+    @staticmethod
+    def _breakdown_rows(frame: pd.DataFrame, by: str, metric: str, shape: str = "records"):
+        breakdown_df = (
+            frame.groupby(by, observed=True)[metric]
+            .sum()
+            .sort_values(ascending=False)
+            .reset_index()
+        )
+        total = breakdown_df[metric].sum() or 1
+        breakdown_df["share"] = breakdown_df[metric] / total
+        return shaped(
+            {
+                by: breakdown_df[by].tolist(),
+                "value": rounded(breakdown_df[metric], 2),
+                "share": rounded(breakdown_df["share"], 4),
+            },
+            shape,
+        )
+
+    @staticmethod
+    def _anomaly_points(frame: pd.DataFrame, metric: str, window: int, shape: str = "records"):
+        ts = frame.set_index("date").groupby(pd.Grouper(freq="D"))[metric].sum().fillna(0)
+        rolling = ts.rolling(window=window, min_periods=window).mean()
+        std = ts.rolling(window=window, min_periods=window).std()
+        z_scores = (ts - rolling) / std
+        anomalies = z_scores[abs(z_scores) >= 2].dropna()
+        return shaped(
+            {
+                "date": iso_dates(anomalies.index),
+                "metric": [metric] * len(anomalies),
+                "value": rounded(ts.loc[anomalies.index], 2),
+                "z_score": rounded(anomalies, 2),
+            },
+            shape,
+        )
+
+    @staticmethod
+    def _inventory_block(total_inventory: int, forecast: int, daily_demand: float) -> Dict:
+        total_inventory = int(total_inventory)
+        forecast = int(forecast)
+        variance = total_inventory - forecast
+        coverage_days = round(total_inventory / daily_demand, 2) if daily_demand else 0
+        stockout_risk = max(forecast - total_inventory, 0) / forecast if forecast else 0
+        return {
+            "total_inventory": total_inventory,
+            "forecast_demand": forecast,
+            "variance": variance,
+            "coverage_days": coverage_days,
+            "stockout_risk": round(stockout_risk, 3),
+        }
+
+    @staticmethod
+    def _inventory_points(frame: pd.DataFrame, shape: str = "records"):
+        grouped = (
+            frame.groupby("date")[["inventory_level", "forecast_demand"]]
+            .sum()
+            .reset_index()
+            .sort_values("date")
+        )
+        return shaped(
+            {
+                "date": iso_dates(grouped["date"]),
+                "inventory": rounded(grouped["inventory_level"], 2),
+                "forecast": rounded(grouped["forecast_demand"], 2),
+            },
+            shape,
+        )
+
+    @staticmethod
+    def _supply_block(
+        avg_lead_time: float, fulfillment_rate: float, backorder_rate: float
+    ) -> Dict:
+        return {
+            "avg_lead_time": round(float(avg_lead_time or 0), 2),
+            "fulfillment_rate": round(float(fulfillment_rate or 0), 3),
+            "backorder_rate": round(float(backorder_rate or 0), 3),
+        }
+
+    @staticmethod
+    def _campaign_rows(frame: pd.DataFrame, limit: int, shape: str = "records"):
+        grouped = (
+            frame.groupby("campaign_name", observed=True)[["net_sales", "marketing_spend"]]
+            .sum()
+            .reset_index()
+        )
+        grouped["roi"] = (grouped["net_sales"] - grouped["marketing_spend"]) / grouped[
+            "marketing_spend"
+        ].replace(0, np.nan)
+        grouped["roi"] = grouped["roi"].fillna(0)
+        grouped.sort_values("roi", ascending=False, inplace=True)
+        top = grouped.head(limit)
+        return shaped(
+            {
+                "campaign_name": top["campaign_name"].tolist(),
+                "net_sales": rounded(top["net_sales"], 2),
+                "marketing_spend": rounded(top["marketing_spend"], 2),
+                "roi": rounded(top["roi"], 3),
+            },
+            shape,
+        )
+
+
+class AnalysisContext:
+    """
+    Memoized intermediate results for one filtered request.
+    The filter is resolved once into pre-aggregated cells (date x region x category x
+    campaign); daily totals, group-bys and the insight blocks built from them are computed
+    on first use and shared by every insight composed within the request. Results that
+    mirror an engine method also go through the engine's result cache under that
+    method's key, so they are reused across requests as well.
+    """
+
+    DAILY_COLUMNS = ["net_sales", "inventory_level", "forecast_demand"]
+
+    def __init__(self, engine: BaseInsightEngine, filters: Dict) -> None:
+        self.engine = engine
+        self.filters = filters
+        self._memo: Dict[Tuple, object] = {}
+
+    def memo(self, method: str, build, **arguments):
+        key = (method, tuple(sorted(arguments.items())))
+        if key not in self._memo:
+            if hasattr(self.engine, method):
+                self._memo[key] = cached_call(
+                    self.engine, method, {**arguments, **self.filters}, build
+                )
+            else:
+                self._memo[key] = build()
+        return self._memo[key]
+
+    @property
+    def cells(self) -> pd.DataFrame:
+        return self.memo("_cells", lambda: self.engine._dashboard_cells(**self.filters))
+
+    @property
+    def daily(self) -> pd.DataFrame:
+        return self.memo(
+            "_daily_totals",
+            lambda: self.cells.groupby("date", as_index=False)[self.DAILY_COLUMNS].sum(),
+        )
+
+    def kpis(self) -> KPIBlock:
+        # Current and previous windows come from one scan over their union.
+        return self.engine.kpis(**self.filters)
+
+    def series(self, freq: str = "M") -> List[Dict]:
+        return self.memo(
+            "series",
+            lambda: self.engine._series_points(self.daily, "net_sales", freq),
+            metric="net_sales",
+            freq=freq,
+        )
+
+    def breakdown(self, by: str = "region", metric: str = "net_sales") -> List[Dict]:
+        if by not in DASHBOARD_CELLS:
+            return self.engine.breakdown(by=by, metric=metric, **self.filters)
+        return self.memo(
+            "breakdown",
+            lambda: self.engine._breakdown_rows(self.cells, by, metric),
+            by=by,
+            metric=metric,
+        )
+
+    def anomalies(self, metric: str = "net_sales", window: int = 7) -> List[Dict]:
+        if self.engine._monitored(metric, window, self.filters):
+            return self.engine.monitor.anomalies(metric)
+        if metric not in self.DAILY_COLUMNS:
+            return self.engine.anomalies(metric=metric, window=window, **self.filters)
+        return self.memo(
+            "anomalies",
+            lambda: self.engine._anomaly_points(self.daily, metric, window),
+            metric=metric,
+            window=window,
+        )
+
+    def recommendations(self, limit: int = 5) -> List[str]:
+        return self.engine._recommendation_statements(
+            self.breakdown("region"), self.anomalies(), self.breakdown("category"), limit
+        )
+
+    def inventory_summary(self) -> Dict:
+        return self.memo(
+            "inventory_summary",
+            lambda: self.engine._inventory_block(
+                total_inventory=self.cells["inventory_level"].sum(),
+                forecast=self.cells["forecast_demand"].sum(),
+                daily_demand=self.daily["forecast_demand"].mean() if not self.daily.empty else 0,
+            ),
+        )
+
+    def inventory_series(self) -> List[Dict]:
+        return self.memo("inventory_series", lambda: self.engine._inventory_points(self.daily))
+
+    def supply_chain_summary(self) -> Dict:
+        return self.memo(
+            "supply_chain_summary",
+            lambda: self.engine._supply_block(
+                avg_lead_time=self.engine._mean(self.cells, "supply_lead_time_days"),
+                fulfillment_rate=self.engine._mean(self.cells, "fulfillment_rate"),
+                backorder_rate=self.engine._mean(self.cells, "backorder_rate"),
+            ),
+        )
+
+    def marketing_performance(self, limit: int = 10) -> List[Dict]:
+        return self.memo(
+            "marketing_performance",
+            lambda: self.engine._campaign_rows(self.cells, limit),
+            limit=limit,
+        )
+
+
+class InsightEngine(BaseInsightEngine):
+    """Pandas engine answering from the in-memory fact table and its aggregate cube."""
+
+    def __init__(
+        self,
+        frame: pd.DataFrame,
+        index: Optional[FrameIndex] = None,
+        cube: Optional[AggregateCube] = None,
+    ) -> None:
+        self.update_frame(frame, index, cube)
+
+    def update_frame(
+        self,
+        frame: pd.DataFrame,
+        index: Optional[FrameIndex] = None,
+        cube: Optional[AggregateCube] = None,
+    ) -> None:
+        self.frame = frame
+        self.index = index if index is not None else FrameIndex(frame)
+        self.cube = cube if cube is not None else AggregateCube.build(frame)
+        self._parser = None  # dimension values may have changed
+
+    # KPI aggregates
+    def kpis(
+        self,
+        start=None,
+        end=None,
+        region=None,
+        category=None,
+        channel=None,
+        promo_flag=None,
+        campaign=None,
+    ) -> KPIBlock:
+        return self.period_kpis(
+            [(start, end)],
+            region=region,
+            category=category,
+            channel=channel,
+            promo_flag=promo_flag,
+            campaign=campaign,
+        )[0]
+
+    # Time series
+    @cached_result
+    def series(
+        self, metric: str = "net_sales", freq: str = "M", shape: str = "records", **filters
+    ):
+        filtered = self._scope(["date", metric], **filters).to_frame(["date", metric])
+        return self._series_points(filtered, metric, freq, shape)
+
+    # Category or region breakdown
+    @cached_result
+    def breakdown(
+        self, by: str = "region", metric: str = "net_sales", shape: str = "records", **filters
+    ):
+        filtered = self._scope([by, metric], **filters).to_frame([by, metric])
+        return self._breakdown_rows(filtered, by, metric, shape)
+
+    # Anomaly detection (simple z-score against rolling mean)
+    @cached_result
+    def anomalies(
+        self, metric: str = "net_sales", window: int = 7, shape: str = "records", **filters
+    ):
+        if self._monitored(metric, window, filters):
+            return self.monitor.anomalies(metric, shape)
+        filtered = self._scope(["date", metric], **filters).to_frame(["date", metric])
+        return self._anomaly_points(filtered, metric, window, shape)
+
+    @cached_result
+    def inventory_summary(self, **filters) -> Dict:
+        filtered = self._scope(["date", "inventory_level", "forecast_demand"], **filters)
+        daily_demand = (
+            filtered.to_frame(["date", "forecast_demand"])
+            .groupby("date")["forecast_demand"]
+            .sum()
+            .mean()
+            if not filtered.empty
+            else 0
+        )
+        return self._inventory_block(
+            total_inventory=filtered["inventory_level"].sum(),
+            forecast=filtered["forecast_demand"].sum(),
+            daily_demand=daily_demand,
+        )
+
+    @cached_result
+    def inventory_series(self, shape: str = "records", **filters):
+        columns = ["date", "inventory_level", "forecast_demand"]
+        filtered = self._scope(columns, **filters).to_frame(columns)
+        return self._inventory_points(filtered, shape)
+
+    @cached_result
+    def supply_chain_summary(self, **filters) -> Dict:
+        filtered = self._scope(SUPPLY_COLUMNS, **filters)
+        return self._supply_block(
+            avg_lead_time=self._mean(filtered, "supply_lead_time_days"),
+            fulfillment_rate=self._mean(filtered, "fulfillment_rate"),
+            backorder_rate=self._mean(filtered, "backorder_rate"),
+        )
+
+    @cached_result
+    def marketing_performance(self, limit: int = 10, shape: str = "records", **filters):
+        columns = ["campaign_name", "net_sales", "marketing_spend"]
+        filtered = self._scope(columns, **filters).to_frame(columns)
+        return self._campaign_rows(filtered, limit, shape)
+
+    def filter_options(self) -> Dict[str, list]:
+        return Dataset(frame=self.frame).to_filters()
+
+    def profile(self) -> Dict:
+        return Dataset(frame=self.frame).profile()
+
+    def _select(
         self,
         start=None,
         end=None,
@@ -280,55 +731,76 @@ class InsightEngine:
         promo_flag=None,
         campaign=None,
         **_,
-    ) -> pd.DataFrame:
-        frame = self.frame.copy()
-        if start:
-            frame = frame[frame["date"] >= pd.to_datetime(start)]
-        if end:
-            frame = frame[frame["date"] <= pd.to_datetime(end)]
-        if region:
-            frame = frame[frame["region"].isin(region if isinstance(region, list) else [region])]
-        if category:
-            frame = frame[
-                frame["category"].isin(category if isinstance(category, list) else [category])
-            ]
-        if channel:
-            frame = frame[
-                frame["channel"].isin(channel if isinstance(channel, list) else [channel])
-            ]
-        if promo_flag:
-            frame = frame[
-                frame["promo_flag"].isin(
-                    promo_flag if isinstance(promo_flag, list) else [promo_flag]
-                )
-            ]
-        if campaign:
-            frame = frame[
-                frame["campaign_name"].isin(
-                    campaign if isinstance(campaign, list) else [campaign]
-                )
-            ]
-        return frame
-
-    def _previous_period_frame(
-        self, start, end, region, category, channel, promo_flag, campaign
-    ) -> pd.DataFrame:
-        if not start or not end:
-            return pd.DataFrame(columns=self.frame.columns)
-        start_dt = pd.to_datetime(start)
-        end_dt = pd.to_datetime(end)
-        duration = end_dt - start_dt
-        prev_start = start_dt - duration
-        prev_end = start_dt
-        return self._filter_frame(
-            prev_start, prev_end, region, category, channel, promo_flag, campaign
+    ) -> FrameView:
+        return self.index.select(
+            start=start,
+            end=end,
+            region=region,
+            category=category,
+            channel=channel,
+            promo_flag=promo_flag,
+            campaign=campaign,
         )
 
-    @staticmethod
-    def _growth_percentage(current: pd.DataFrame, previous: pd.DataFrame) -> float:
-        prev_sales = previous["net_sales"].sum()
-        current_sales = current["net_sales"].sum()
-        if prev_sales == 0:
-            return 0.0
-        return (current_sales - prev_sales) / prev_sales
+    def _scope(self, columns: List[str], *args, **filters) -> FrameView:
+        """Select from the aggregate cube when it carries every column the query reads."""
+        if self.cube.covers(columns):
+            return self.cube.index.select(*args, **filters)
+        return self._select(*args, **filters)
+
+    def memory_report(self) -> Dict:
+        """Per-column memory of the fact table and of the aggregate cube built from it."""
+        return {"facts": memory_report(self.frame), "cube": memory_report(self.cube.frame)}
+
+    def export_batches(
+        self, columns: Optional[List[str]] = None, batch_rows: int = 50_000, **filters
+    ) -> Iterator[pd.DataFrame]:
+        """Filtered rows in frames of ``batch_rows``; unknown columns export every column."""
+        if columns is not None and not set(columns) <= set(self.frame.columns):
+            columns = None
+        return self._select(**filters).batches(batch_rows, columns)
 
+    def _filter_frame(self, *args, **filters) -> pd.DataFrame:
+        return self._select(*args, **filters).to_frame()
+
+    def _dashboard_cells(self, **filters) -> pd.DataFrame:
+        return self.cube.index.select(**filters).to_frame()
+
+    def _daily(self, metrics: List[str], **filters) -> pd.DataFrame:
+        columns = ["date", *metrics]
+        frame = self._scope(columns, **filters).to_frame(columns)
+        return frame.groupby("date", as_index=False)[metrics].sum()
+
+    def _segment_daily(self, metrics: List[str], **filters) -> pd.DataFrame:
+        # Cube cells are finer than segment x day; the scan sums duplicates as it pivots.
+        columns = ["date", *SEGMENT_DIMENSIONS, *metrics]
+        return self._scope(columns, **filters).to_frame(columns)
+
+    def _window_totals(self, windows: List[Window], **filters) -> List[Dict]:
+        """
+        Gather cube cells once for the union of ``windows``, sum them per day, and read
+        each window's totals off the sorted daily sums.
+        """
+        filters = {key: value for key, value in filters.items() if key not in ("start", "end")}
+        columns = ["date", *WINDOW_MEASURES]
+        parts = [
+            self.cube.index.select(start=lo, end=hi, **filters).to_frame(columns)
+            for lo, hi in _merge_windows(windows)
+        ]
+        cells = pd.concat(parts, ignore_index=True)
+        daily = cells.groupby("date")[WINDOW_MEASURES].sum()
+        dates, sums = daily.index.to_numpy(), daily.to_numpy(dtype=float)
+        totals = []
+        for lo, hi in windows:
+            if lo is None and hi is None:
+                window = cells[WINDOW_MEASURES].to_numpy(dtype=float).sum(axis=0)
+            else:
+                first = np.searchsorted(dates, lo.to_datetime64(), "left") if lo else 0
+                last = np.searchsorted(dates, hi.to_datetime64(), "right") if hi else len(dates)
+                window = sums[first:last].sum(axis=0)
+            row = dict(zip(WINDOW_MEASURES, window))
+            count = row.pop("discount_rate_count")
+            discount = row.pop("discount_rate_sum")
+            row["avg_discount"] = discount / count if count else float("nan")
+            totals.append(row)
+        return totals
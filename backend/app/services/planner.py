@@ -0,0 +1,220 @@
+"""Rule-based translation of chat questions into typed query plans."""
+from __future__ import annotations
+
+import re
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Pattern, Tuple
+
+import pandas as pd
+
+# Plan intents, in the order they are tried.
+INTENTS: List[Tuple[str, str]] = [
+    ("inventory", r"stock\w*|inventory|coverage"),
+    ("supply", r"supply|lead times?|fulfil+ment|backorders?"),
+    ("marketing", r"campaigns?|marketing|roi"),
+    ("breakdown", r"regions?|countr(?:y|ies)|channels?|categor(?:y|ies)"),
+    (
+        "series",
+        r"trends?|trending|over time|daily|weekly|monthly|quarterly"
+        r"|by (?:day|week|month|quarter)|quarters?",
+    ),
+    ("anomaly", r"why|drops?|dropped|declin\w*|dips?|spikes?|anomal\w*|unusual|outliers?"),
+]
+GROUP_BY: List[Tuple[str, str]] = [
+    ("region", r"regions?"),
+    ("country", r"countr(?:y|ies)"),
+    ("channel", r"channels?"),
+    ("category", r"categor(?:y|ies)"),
+]
+GRAINS: List[Tuple[str, str]] = [
+    ("D", r"daily|by day|per day|each day"),
+    ("W", r"weekly|by week|per week|each week"),
+    ("M", r"monthly|by month|per month|each month"),
+    ("Q", r"quarterly|quarters?"),
+]
+METRICS: List[Tuple[str, str]] = [
+    ("units_sold", r"units?|volume"),
+    ("marketing_spend", r"spend|spending"),
+    ("net_sales", r"sales|revenue"),
+]
+# Dimension keywords the parser fills from values named in the question, and the
+# ``filter_options`` list holding each dimension's values.
+VALUE_SOURCES: Dict[str, str] = {
+    "region": "regions",
+    "category": "categories",
+    "channel": "channels",
+    "promo_flag": "promo_flags",
+    "campaign": "campaigns",
+}
+NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
+}
+MONTHS = [
+    "january", "february", "march", "april", "may", "june",
+    "july", "august", "september", "october", "november", "december",
+]
+TOP_LIMIT = 5
+
+_QUARTER = re.compile(r"\bq([1-4])(?:\s+(?:of\s+)?(\d{4}))?\b")
+_MONTH = re.compile(rf"\b({'|'.join(MONTHS)})(?:\s+(?:of\s+)?(\d{{4}}))?\b")
+_YEAR = re.compile(r"\b(20\d{2})\b")
+_TRAILING = re.compile(
+    r"\b(?:last|past|previous)\s+(?:(\d+|" + "|".join(NUMBER_WORDS) + r")\s+)?"
+    r"(day|week|month|quarter|year)s?\b"
+)
+_TOP = re.compile(r"\btop(?:\s+(\d+|" + "|".join(NUMBER_WORDS) + r"))?\b")
+_TRAILING_OFFSETS = {
+    "day": lambda n: pd.DateOffset(days=n),
+    "week": lambda n: pd.DateOffset(weeks=n),
+    "month": lambda n: pd.DateOffset(months=n),
+    "quarter": lambda n: pd.DateOffset(months=3 * n),
+    "year": lambda n: pd.DateOffset(years=n),
+}
+
+
+def fold_question(question: str) -> str:
+    """Lower case with punctuation and repeated spaces removed (hyphens and ``'`` kept)."""
+    return re.sub(r"\s+", " ", re.sub(r"[^\w\s'-]", " ", question.lower())).strip()
+
+
+@dataclass(frozen=True)
+class QueryPlan:
+    """
+    What a question asks for: the insight to run (``intent``), the measure, an optional
+    group-by, time grain and row limit, and the filters named in the question as sorted
+    ``(keyword, values)`` pairs. Equal plans are equal questions, whatever their wording.
+    """
+
+    intent: str = "kpi"
+    metric: str = "net_sales"
+    group_by: Optional[str] = None
+    grain: Optional[str] = None
+    limit: Optional[int] = None
+    filters: Tuple[Tuple[str, object], ...] = ()
+
+    def named_filters(self) -> Dict:
+        return {
+            keyword: list(value) if isinstance(value, tuple) else value
+            for keyword, value in self.filters
+        }
+
+    def scope(self, filters: Dict) -> Dict:
+        """Request filters with those named in the question taking precedence."""
+        return {**filters, **self.named_filters()}
+
+    def as_dict(self) -> Dict:
+        return {**asdict(self), "filters": self.named_filters()}
+
+
+class QuestionParser:
+    """
+    Compiled intent, slot and dimension-value patterns for one dataset version.
+
+    Slots are read before the intent: dimension values ("Europe", "Online"), calendar
+    periods ("Q2", "March 2024", "2024", "last 3 months", counted back from the latest
+    date in the data), ``top N`` limits, grains and measures. Each matched slot is blanked
+    out of the text, so a campaign named "Marketing Blitz" filters on that campaign rather
+    than selecting the marketing intent.
+    """
+
+    def __init__(self, options: Dict[str, list]) -> None:
+        date_range = options.get("date_range")
+        self.latest = pd.Timestamp(date_range[1]) if date_range else None
+        self.values: Dict[str, Tuple[str, str]] = {}
+        for keyword, source in VALUE_SOURCES.items():
+            for value in options.get(source, []):
+                self.values.setdefault(str(value).lower(), (keyword, value))
+        names = sorted(self.values, key=len, reverse=True)  # longest names match first
+        self.value_pattern: Optional[Pattern] = (
+            re.compile(r"(?<![\w-])(" + "|".join(map(re.escape, names)) + r")(?![\w-])")
+            if names
+            else None
+        )
+        self.intents = _compile(INTENTS)
+        self.group_by = _compile(GROUP_BY)
+        self.grains = _compile(GRAINS)
+        self.metrics = _compile(METRICS)
+
+    def parse(self, question: str) -> QueryPlan:
+        text = f" {fold_question(question)} "
+        filters: Dict[str, object] = {}
+
+        if self.value_pattern is not None:
+            for match in self.value_pattern.finditer(text):
+                keyword, value = self.values[match.group(1)]
+                filters.setdefault(keyword, [])
+                if value not in filters[keyword]:
+                    filters[keyword].append(value)
+            text = self.value_pattern.sub(" ", text)
+        text = self._read_period(text, filters)
+
+        limit = None
+        top = _TOP.search(text)
+        if top:
+            limit = _number(top.group(1)) if top.group(1) else TOP_LIMIT
+            text = _TOP.sub(" ", text)
+
+        intent = _first(self.intents, text) or "kpi"
+        return QueryPlan(
+            intent=intent,
+            metric=_first(self.metrics, text) or "net_sales",
+            group_by=_first(self.group_by, text) if intent == "breakdown" else None,
+            grain=(_first(self.grains, text) or "Q") if intent == "series" else None,
+            limit=limit if intent in ("breakdown", "marketing") else None,
+            filters=tuple(
+                sorted(
+                    (keyword, tuple(sorted(value)) if isinstance(value, list) else value)
+                    for keyword, value in filters.items()
+                )
+            ),
+        )
+
+    def _read_period(self, text: str, filters: Dict[str, object]) -> str:
+        """Fill ``start``/``end`` from the first calendar period named and blank it out."""
+        year = self.latest.year if self.latest is not None else pd.Timestamp.now().year
+        match = _QUARTER.search(text)
+        if match:
+            month = 3 * int(match.group(1)) - 2
+            start = pd.Timestamp(year=int(match.group(2) or year), month=month, day=1)
+            return _blank(text, match, filters, start, start + pd.offsets.QuarterEnd())
+        match = next((match for match in _MONTH.finditer(text) if _names_month(text, match)), None)
+        if match:
+            month = MONTHS.index(match.group(1)) + 1
+            start = pd.Timestamp(year=int(match.group(2) or year), month=month, day=1)
+            return _blank(text, match, filters, start, start + pd.offsets.MonthEnd())
+        match = _TRAILING.search(text)
+        if match and self.latest is not None:
+            count = _number(match.group(1)) if match.group(1) else 1
+            start = self.latest - _TRAILING_OFFSETS[match.group(2)](count) + pd.Timedelta(days=1)
+            return _blank(text, match, filters, start, self.latest)
+        match = _YEAR.search(text)
+        if match:
+            start = pd.Timestamp(year=int(match.group(1)), month=1, day=1)
+            return _blank(text, match, filters, start, start + pd.offsets.YearEnd())
+        return text
+
+
+def _compile(rules: List[Tuple[str, str]]) -> List[Tuple[str, Pattern]]:
+    return [(name, re.compile(rf"\b(?:{pattern})\b")) for name, pattern in rules]
+
+
+def _first(rules: List[Tuple[str, Pattern]], text: str) -> Optional[str]:
+    return next((name for name, pattern in rules if pattern.search(text)), None)
+
+
+def _names_month(text: str, match) -> bool:
+    # "may" is only read as the month next to a year or after "in"/"during"/"of".
+    if match.group(1) != "may" or match.group(2):
+        return True
+    return text[: match.start()].rstrip().endswith((" in", " during", " of"))
+
+
+def _number(token: str) -> int:
+    return int(token) if token.isdigit() else NUMBER_WORDS[token]
+
+
+def _blank(text: str, match, filters: Dict, start: pd.Timestamp, end: pd.Timestamp) -> str:
+    filters["start"] = start.date().isoformat()
+    filters["end"] = end.date().isoformat()
+    return text[: match.start()] + " " + text[match.end():]
@@ -0,0 +1,78 @@
+"""Vectorized conversion of aggregated frames into JSON-ready payloads."""
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # fall back to the standard library encoder
+    orjson = None
+
+
+SHAPES = ("records", "columns")
+
+
+def records(**columns: Sequence) -> List[Dict]:
+    """Row dicts from equal-length column lists, zipped without per-row pandas access."""
+    keys = list(columns)
+    return [dict(zip(keys, row)) for row in zip(*columns.values())]
+
+
+def shaped(columns: Dict[str, list], shape: str = "records"):
+    """
+    An aggregate built column-wise, in the requested response shape: the column lists as
+    they are for ``"columns"``, zipped into row dicts for ``"records"``.
+    """
+    return columns if shape == "columns" else records(**columns)
+
+
+def head(data, limit: int):
+    """The first ``limit`` rows of a result in either shape."""
+    if isinstance(data, dict):
+        return {key: values[:limit] for key, values in data.items()}
+    return data[:limit]
+
+
+def iso_dates(values) -> List[str]:
+    return pd.DatetimeIndex(values).strftime("%Y-%m-%d").tolist()
+
+
+def rounded(values, decimals: int) -> list:
+    """Round a whole column at once and hand back plain Python numbers."""
+    return np.round(np.asarray(values), decimals).tolist()
+
+
+def dumps(content: Any) -> bytes:
+    """Compact JSON bytes, through orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, default=_plain, separators=(",", ":")).encode("utf-8")
+
+
+def sse_event(event: str, data: Any) -> bytes:
+    """One server-sent event; compact JSON never spans lines, so one ``data:`` line suffices."""
+    return b"event: " + event.encode("utf-8") + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response encoded with orjson when available. Routes returning it bypass
+    FastAPI's ``jsonable_encoder`` walk and response-model re-validation, so payloads
+    built by the engines are serialized exactly once.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
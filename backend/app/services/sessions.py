@@ -0,0 +1,126 @@
+"""Per-session conversation memory with a bounded in-memory footprint."""
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Tuple
+
+from ..config import MAX_CHAT_HISTORY
+
+
+@dataclass
+class ConversationMemory:
+    max_items: int = MAX_CHAT_HISTORY
+    items: Deque[Dict[str, str]] = field(default_factory=lambda: deque(maxlen=MAX_CHAT_HISTORY))
+
+    def add(self, role: str, content: str) -> None:
+        self.items.append({"role": role, "content": content})
+
+    def as_ctx(self) -> List[Dict[str, str]]:
+        return list(self.items)
+
+
+def new_session_id() -> str:
+    return uuid.uuid4().hex
+
+
+class SessionStore:
+    """
+    Conversation memory keyed by session ID. Recently active sessions are kept in memory in
+    LRU order; the least recently used are dropped once there are more than
+    ``max_sessions`` of them or their messages exceed ``max_bytes``. With a ``path``, each
+    turn is also written to SQLite, so a session evicted from memory (or from before a
+    restart) is read back on its next request instead of starting over.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int,
+        max_bytes: int,
+        path: Optional[Path] = None,
+    ) -> None:
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.path = path
+        self.evictions = 0
+        self._bytes = 0
+        # session id -> (memory, bytes held by its messages)
+        self._sessions: "OrderedDict[str, Tuple[ConversationMemory, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS sessions "
+                "(id TEXT PRIMARY KEY, history TEXT NOT NULL, touched REAL NOT NULL)"
+            )
+
+    def history(self, session_id: str) -> List[Dict[str, str]]:
+        with self._lock:
+            history = self._memory(session_id).as_ctx()
+            self._evict()
+            return history
+
+    def add(self, session_id: str, role: str, content: str) -> List[Dict[str, str]]:
+        """Append a message to the session and return its history."""
+        with self._lock:
+            memory = self._memory(session_id)
+            memory.add(role, content)
+            size = _size(memory)
+            self._bytes += size - self._sessions[session_id][1]
+            self._sessions[session_id] = (memory, size)
+            history = memory.as_ctx()
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO sessions (id, history, touched) VALUES (?, ?, ?)",
+                    (session_id, json.dumps(history), time.time()),
+                )
+            self._evict()
+            return history
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "bytes": self._bytes,
+                "evictions": self.evictions,
+                "persistent": self._db is not None,
+            }
+
+    def _memory(self, session_id: str) -> ConversationMemory:
+        entry = self._sessions.get(session_id)
+        if entry is not None:
+            self._sessions.move_to_end(session_id)
+            return entry[0]
+        memory = ConversationMemory()
+        if self._db is not None:
+            row = self._db.execute(
+                "SELECT history FROM sessions WHERE id = ?", (session_id,)
+            ).fetchone()
+            if row is not None:
+                memory.items.extend(json.loads(row[0]))
+        size = _size(memory)
+        self._sessions[session_id] = (memory, size)
+        self._bytes += size
+        return memory
+
+    def _evict(self) -> None:
+        # The most recent session is kept even when it alone exceeds the byte bound.
+        while len(self._sessions) > 1 and (
+            len(self._sessions) > self.max_sessions or self._bytes > self.max_bytes
+        ):
+            _, (_, size) = self._sessions.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+
+def _size(memory: ConversationMemory) -> int:
+    return sum(len(item["content"].encode("utf-8")) for item in memory.items)
@@ -0,0 +1,255 @@
+"""Memory-mapped columnar snapshots of the fact table, shared by every worker process."""
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .cube import AggregateCube
+from .filtering import DimensionIndex, FrameIndex
+
+POINTER_NAME = "CURRENT"
+SCHEMA_NAME = "schema.json"
+INDEX_NAME = "index.json"
+KEEP_SNAPSHOTS = 2
+
+
+@dataclass
+class Snapshot:
+    """A mapped dataset version: the fact rows plus the index and cube built over them."""
+
+    frame: pd.DataFrame
+    index: FrameIndex
+    cube: AggregateCube
+
+
+class SharedFrameStore:
+    """
+    The canonical dataset as one directory of ``.npy`` files per published version, which
+    every worker maps read-only instead of holding its own copy. The row index and the
+    aggregate cube are stored alongside the rows, so opening a version costs a few
+    ``mmap`` calls rather than a Parquet scan and an index and cube rebuild.
+
+    Numeric and datetime columns are stored as one 2-D array per dtype, nullable integers
+    as value/mask arrays, and text columns as categorical codes plus a category list, so
+    each column maps straight into a pandas array without conversion (Arrow IPC files map
+    too, but converting them to pandas copies nullable and dictionary columns). ``CURRENT``
+    names the snapshot of the latest version and is replaced atomically; the previous
+    snapshot is kept so a worker that read the old pointer can still map it.
+
+    Snapshots are keyed by the identity of the warehouse contents they were built from
+    (see :meth:`DataRepository.snapshot_key`), not by version number: a reseeded warehouse
+    restarts its versions, and a legacy single-file table has none, so a matching number
+    does not prove matching rows. A pointer whose key differs is ignored and replaced.
+    """
+
+    def __init__(self, root: Path, layout: str = "") -> None:
+        self.root = root
+        self.layout = layout  # snapshots written with another column layout are not reused
+        self.pointer_path = root / POINTER_NAME
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def key(self) -> Optional[str]:
+        """Contents key of the current snapshot, or ``None`` before the first publish."""
+        pointer = self._pointer()
+        return pointer.get("key") if pointer else None
+
+    def load(self, key: str) -> Optional[Snapshot]:
+        """Map the snapshot of contents ``key``; ``None`` if the current snapshot is another."""
+        pointer = self._pointer()
+        if not self._matches(pointer, key):
+            return None
+        try:
+            return _map_snapshot(self.root / pointer["snapshot"])
+        except FileNotFoundError:  # pruned between reading the pointer and mapping it
+            return None
+
+    def publish(
+        self, frame: pd.DataFrame, index: FrameIndex, cube: AggregateCube, key: str
+    ) -> Snapshot:
+        """Write the dataset as the snapshot of contents ``key`` and return it mapped from disk."""
+        existing = self.load(key)
+        if existing is not None:  # another worker published these contents first
+            return existing
+        name = f"snapshot-{uuid.uuid4().hex}"
+        staging = self.root / f"{name}.tmp"
+        _write_frame(frame, staging / "frame")
+        _write_index(index, staging / "frame-index")
+        _write_frame(cube.frame, staging / "cube")
+        _write_index(cube.index, staging / "cube-index")
+        os.replace(staging, self.root / name)
+        self._point(key, name)
+        self._prune()
+        return _map_snapshot(self.root / name)
+
+    def retag(self, key: str, new_key: str) -> None:
+        """Carry the snapshot over to new contents holding the same rows (compaction)."""
+        pointer = self._pointer()
+        if self._matches(pointer, key):
+            self._point(new_key, pointer["snapshot"])
+
+    def _matches(self, pointer: Optional[Dict], key: str) -> bool:
+        # Pointers written before snapshots were keyed by contents carry no key.
+        return bool(pointer) and (pointer.get("key"), pointer.get("layout", "")) == (
+            key,
+            self.layout,
+        )
+
+    def _pointer(self) -> Optional[Dict]:
+        try:
+            return json.loads(self.pointer_path.read_text())
+        except FileNotFoundError:
+            return None
+
+    def _point(self, key: str, snapshot: str) -> None:
+        staging = self.pointer_path.with_suffix(".tmp")
+        pointer = {"key": key, "snapshot": snapshot, "layout": self.layout}
+        staging.write_text(json.dumps(pointer))
+        os.replace(staging, self.pointer_path)
+
+    def _prune(self) -> None:
+        # Workers that mapped a removed snapshot keep their mapping until they remap.
+        snapshots = sorted(
+            (path for path in self.root.glob("snapshot-*") if path.is_dir()),
+            key=lambda path: path.stat().st_mtime_ns,
+            reverse=True,
+        )
+        for path in snapshots[KEEP_SNAPSHOTS:]:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def _map_snapshot(source: Path) -> Snapshot:
+    frame = _map_frame(source / "frame")
+    cube_frame = _map_frame(source / "cube")
+    return Snapshot(
+        frame=frame,
+        index=_map_index(frame, source / "frame-index"),
+        cube=AggregateCube(cube_frame, _map_index(cube_frame, source / "cube-index")),
+    )
+
+
+def _write_index(index: FrameIndex, target: Path) -> None:
+    """Dimension codes and one row of the bitmap matrix per dimension value."""
+    target.mkdir(parents=True)
+    values = {}
+    for keyword, dimension in index.dimensions.items():
+        values[keyword] = dimension.values
+        codes = _open(target / f"{keyword}-codes.npy", dimension.codes.dtype, dimension.codes.shape)
+        codes[:] = dimension.codes
+        codes.flush()
+        shape = (len(dimension.values), len(dimension.codes))
+        bitmaps = _open(target / f"{keyword}-bitmaps.npy", np.bool_, shape)
+        for position, bitmap in enumerate(dimension.bitmaps):
+            bitmaps[position] = bitmap
+        bitmaps.flush()
+    (target / INDEX_NAME).write_text(json.dumps({"values": values}))
+
+
+def _map_index(frame: pd.DataFrame, source: Path) -> FrameIndex:
+    values = json.loads((source / INDEX_NAME).read_text())["values"]
+    dimensions = {}
+    for keyword, dimension_values in values.items():
+        bitmaps = np.load(source / f"{keyword}-bitmaps.npy", mmap_mode="r")
+        dimensions[keyword] = DimensionIndex(
+            np.load(source / f"{keyword}-codes.npy", mmap_mode="r"),
+            dimension_values,
+            list(bitmaps),
+        )
+    return FrameIndex(frame, dimensions)
+
+
+def _write_frame(frame: pd.DataFrame, target: Path) -> None:
+    target.mkdir(parents=True)
+    columns = list(frame.columns)
+    groups: Dict[str, List[str]] = {}
+    blocks: List[Dict] = []
+    for column in columns:
+        dtype = frame[column].dtype
+        if isinstance(dtype, np.dtype) and dtype.kind in "biufcmM":
+            groups.setdefault(dtype.str, []).append(column)
+        elif isinstance(dtype, pd.api.extensions.ExtensionDtype) and dtype.kind in "biuf":
+            groups.setdefault(dtype.name, []).append(column)
+        else:
+            blocks.append(_write_categorical(frame[column], target, len(blocks)))
+    for dtype, names in groups.items():
+        blocks.append(_write_group(frame, names, dtype, target, len(blocks)))
+    schema = {"rows": len(frame), "columns": columns, "blocks": blocks}
+    (target / SCHEMA_NAME).write_text(json.dumps(schema))
+
+
+def _write_group(
+    frame: pd.DataFrame, names: List[str], dtype: str, target: Path, position: int
+) -> Dict:
+    """One row per column, written column by column so no stacked copy is built in memory."""
+    masked = isinstance(frame[names[0]].dtype, pd.api.extensions.ExtensionDtype)
+    block = {"kind": "masked" if masked else "numpy", "dtype": dtype, "columns": names}
+    block["file"] = f"block-{position}.npy"
+    numpy_dtype = frame[names[0]].dtype.numpy_dtype if masked else np.dtype(dtype)
+    values = _open(target / block["file"], numpy_dtype, (len(names), len(frame)))
+    if masked:
+        block["mask"] = f"block-{position}-mask.npy"
+        mask = _open(target / block["mask"], np.bool_, (len(names), len(frame)))
+    for row, name in enumerate(names):
+        if masked:
+            values[row] = frame[name].to_numpy(dtype=numpy_dtype, na_value=0)
+            mask[row] = frame[name].isna().to_numpy()
+        else:
+            values[row] = frame[name].to_numpy()
+    values.flush()
+    if masked:
+        mask.flush()
+    return block
+
+
+def _write_categorical(series: pd.Series, target: Path, position: int) -> Dict:
+    categorical = pd.Categorical(series)
+    block = {
+        "kind": "categorical",
+        "columns": [series.name],
+        "categories": [str(value) for value in categorical.categories],
+        "file": f"block-{position}.npy",
+    }
+    codes = _open(target / block["file"], categorical.codes.dtype, categorical.codes.shape)
+    codes[:] = categorical.codes
+    codes.flush()
+    return block
+
+
+def _open(path: Path, dtype, shape) -> np.memmap:
+    return np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=shape)
+
+
+def _map_frame(source: Path) -> pd.DataFrame:
+    """
+    Assemble a DataFrame directly over the read-only mapped arrays: every column wraps a
+    row of its mapped block (a numpy view, a masked array over value and mask rows, or
+    categorical codes), and ``copy=False`` keeps pandas from copying them onto the heap.
+    """
+    schema = json.loads((source / SCHEMA_NAME).read_text())
+    columns: Dict[str, object] = {}
+    for block in schema["blocks"]:
+        values = np.load(source / block["file"], mmap_mode="r")
+        if block["kind"] == "numpy":
+            columns.update(zip(block["columns"], values))
+        elif block["kind"] == "masked":
+            mask = np.load(source / block["mask"], mmap_mode="r")
+            array_type = pd.api.types.pandas_dtype(block["dtype"]).construct_array_type()
+            for row, name in enumerate(block["columns"]):
+                columns[name] = array_type(values[row], mask[row])
+        else:
+            categories = pd.Index(block["categories"], dtype=object)
+            (name,) = block["columns"]
+            columns[name] = pd.Categorical.from_codes(values, categories=categories, validate=False)
+    return pd.DataFrame(
+        {name: columns[name] for name in schema["columns"]},
+        index=pd.RangeIndex(schema["rows"]),
+        copy=False,
+    )
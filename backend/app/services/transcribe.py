@@ -1,40 +1,153 @@
 """Speech-to-text helper leveraging OpenAI's transcription API."""
 from __future__ import annotations
 
-import io
+import asyncio
 import os
-from typing import Dict
+from typing import BinaryIO, Dict, Optional
+
+import httpx
+
+from ..config import (
+    TRANSCRIBE_BACKEND,
+    TRANSCRIBE_MAX_CONCURRENCY,
+    TRANSCRIBE_TIMEOUT_SECONDS,
+)
 
 try:  # pragma: no cover
-    from openai import OpenAI
+    from openai import AsyncOpenAI
 except Exception:  # pragma: no cover
-    OpenAI = None  # type: ignore
+    AsyncOpenAI = None  # type: ignore
+
+TRANSCRIBE_MODEL = "gpt-4o-mini-transcribe"
+
+
+class OpenAITranscriber:
+    """
+    OpenAI transcription over one pooled ``httpx.AsyncClient``, so concurrent requests
+    reuse keep-alive connections instead of opening one each.
+    """
+
+    name = "openai"
+
+    def __init__(self, max_connections: int, timeout: float) -> None:
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections, max_keepalive_connections=max_connections
+            ),
+            timeout=httpx.Timeout(timeout, connect=10.0),
+        )
+        # Retries would run past the caller's deadline; a failed call is reported instead.
+        self._client = AsyncOpenAI(http_client=self._http, max_retries=0)
+
+    async def transcribe(self, audio: BinaryIO, filename: str, language: str) -> str:
+        response = await self._client.audio.transcriptions.create(
+            model=TRANSCRIBE_MODEL,
+            file=(filename, audio),
+            language=language,
+        )
+        return response.text
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+
+class FakeTranscriber:
+    """
+    Local stand-in for load tests: waits ``delay`` seconds, as a remote call would, and
+    returns a fixed sentence naming the size of the audio it read.
+    """
+
+    name = "fake"
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+
+    async def transcribe(self, audio: BinaryIO, filename: str, language: str) -> str:
+        size = len(audio.read())
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return f"Transcribed {size} bytes of {filename}."
+
+    async def aclose(self) -> None:
+        pass
 
 
 class TranscriptionService:
-    def __init__(self) -> None:
-        api_key = os.environ.get("OPENAI_API_KEY")
-        self._client = OpenAI() if api_key and OpenAI else None
+    """
+    Transcription through a pluggable async backend. At most ``max_concurrency`` calls
+    run at once per process; the rest wait their turn, and waiting counts towards the
+    ``timeout_seconds`` each request is given, so no request is held open indefinitely.
+    """
+
+    def __init__(
+        self,
+        backend=None,
+        max_concurrency: int = TRANSCRIBE_MAX_CONCURRENCY,
+        timeout_seconds: float = TRANSCRIBE_TIMEOUT_SECONDS,
+    ) -> None:
+        if backend is None:
+            if TRANSCRIBE_BACKEND == "fake":
+                backend = FakeTranscriber()
+            elif os.environ.get("OPENAI_API_KEY") and AsyncOpenAI:
+                backend = OpenAITranscriber(max_concurrency, timeout_seconds)
+        self.backend = backend
+        self.max_concurrency = max_concurrency
+        self.timeout_seconds = timeout_seconds
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self._slots = asyncio.Semaphore(max_concurrency)
 
     @property
     def available(self) -> bool:
-        return self._client is not None
+        return self.backend is not None
 
-    def transcribe(self, file_bytes: bytes, filename: str = "audio.webm") -> Dict:
+    async def transcribe(
+        self, audio: BinaryIO, filename: Optional[str] = None, language: str = "en"
+    ) -> Dict:
         if not self.available:
             return {
                 "success": False,
                 "text": None,
                 "message": "Speech-to-text requires OPENAI_API_KEY; falling back to manual entry.",
             }
-        buffer = io.BytesIO(file_bytes)
-        buffer.name = filename or "audio.webm"
-        buffer.seek(0)
-        response = self._client.audio.transcriptions.create(
-            model="gpt-4o-mini-transcribe",
-            file=buffer,
-            language="en",
-        )
-        text = response.text.strip()
-        return {"success": True, "text": text, "message": "Transcription complete."}
+        try:
+            text = await asyncio.wait_for(
+                self._call(audio, filename or "audio.webm", language), self.timeout_seconds
+            )
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            return {
+                "success": False,
+                "text": None,
+                "message": f"Transcription timed out after {self.timeout_seconds:g}s.",
+            }
+        except Exception:
+            self.failed += 1
+            raise
+        self.completed += 1
+        return {"success": True, "text": text.strip(), "message": "Transcription complete."}
+
+    async def _call(self, audio: BinaryIO, filename: str, language: str) -> str:
+        async with self._slots:
+            self.in_flight += 1
+            try:
+                return await self.backend.transcribe(audio, filename, language)
+            finally:
+                self.in_flight -= 1
+
+    def stats(self) -> Dict:
+        return {
+            "available": self.available,
+            "backend": self.backend.name if self.backend is not None else None,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+        }
 
+    async def aclose(self) -> None:
+        if self.backend is not None:
+            await self.backend.aclose()
@@ -0,0 +1,162 @@
+"""Multipart file uploads streamed straight to their destination on disk."""
+from __future__ import annotations
+
+import os
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, Callable, List, Optional
+
+from multipart.exceptions import MultipartParseError
+from multipart.multipart import MultipartParser, parse_options_header
+from starlette.concurrency import run_in_threadpool
+
+
+class UploadError(ValueError):
+    """The body is not a multipart form carrying the expected file."""
+
+
+@dataclass
+class ReceivedFile:
+    filename: str
+    path: Path
+    size: int
+
+
+@dataclass
+class _Part:
+    headers: dict = field(default_factory=dict)
+    header_name: bytes = b""
+    header_value: bytes = b""
+    wanted: bool = False
+
+
+class FileReceiver:
+    """
+    Feeds a ``multipart/form-data`` body through python-multipart and writes the bytes of
+    the file in form field ``field_name`` to the path ``target`` returns for its filename.
+    Nothing else is kept: other parts are discarded as they arrive. File data is buffered
+    up to ``buffer_bytes`` and written on Starlette's thread pool, so disk writes never
+    block the event loop. The file is written under a temporary name and renamed into
+    place once complete; a failed or abandoned upload leaves nothing behind.
+    """
+
+    def __init__(
+        self,
+        content_type: str,
+        field_name: str,
+        target: Callable[[str], Path],
+        buffer_bytes: int = 1024 * 1024,
+    ) -> None:
+        _, params = parse_options_header(content_type or "")
+        boundary = params.get(b"boundary")
+        if not boundary:
+            raise UploadError("Expected a multipart/form-data body.")
+        self.field_name = field_name
+        self.target = target
+        self.buffer_bytes = buffer_bytes
+        self.received: Optional[ReceivedFile] = None
+        self._part = _Part()
+        self._opening: Optional[str] = None  # filename whose target must be opened
+        self._buffer: List[bytes] = []
+        self._buffered = 0
+        self._finished = False
+        self._handle: Optional[BinaryIO] = None
+        self._staging: Optional[Path] = None
+        self._parser = MultipartParser(
+            boundary,
+            {
+                "on_part_begin": self._on_part_begin,
+                "on_part_data": self._on_part_data,
+                "on_part_end": self._on_part_end,
+                "on_header_field": self._on_header_field,
+                "on_header_value": self._on_header_value,
+                "on_header_end": self._on_header_end,
+                "on_headers_finished": self._on_headers_finished,
+            },
+        )
+
+    async def receive(self, chunks: AsyncIterator[bytes]) -> ReceivedFile:
+        """Consume the body; returns the file written, or raises :class:`UploadError`."""
+        try:
+            async for chunk in chunks:
+                self._parse(chunk)
+                await self._drain()
+            self._parse(None)
+            await self._drain()
+            if self.received is None or not self._finished:
+                raise UploadError(f"A '{self.field_name}' file upload is required.")
+            await run_in_threadpool(self._complete)
+            return self.received
+        except BaseException:
+            await run_in_threadpool(self._discard)
+            raise
+
+    def _parse(self, chunk: Optional[bytes]) -> None:
+        try:
+            if chunk is None:
+                self._parser.finalize()
+            else:
+                self._parser.write(chunk)
+        except MultipartParseError as exc:
+            raise UploadError(f"Malformed multipart body: {exc}") from exc
+
+    async def _drain(self) -> None:
+        # The parser callbacks are synchronous; file I/O they queue up happens here.
+        if self._opening is not None:
+            path = self.target(self._opening)
+            self._staging = path.with_name(f".{path.name}.{uuid.uuid4().hex}.part")
+            self._handle = await run_in_threadpool(open, self._staging, "wb")
+            self.received = ReceivedFile(filename=self._opening, path=path, size=0)
+            self._opening = None
+        if self._buffer and (self._buffered >= self.buffer_bytes or self._finished):
+            data = b"".join(self._buffer)
+            self._buffer, self._buffered = [], 0
+            await run_in_threadpool(self._handle.write, data)
+            self.received.size += len(data)
+
+    def _complete(self) -> None:
+        self._handle.close()
+        self._handle = None
+        os.replace(self._staging, self.received.path)
+        self._staging = None
+
+    def _discard(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        if self._staging is not None:
+            self._staging.unlink(missing_ok=True)
+            self._staging = None
+
+    def _on_part_begin(self) -> None:
+        self._part = _Part()
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._part.header_name += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._part.header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._part.headers[self._part.header_name.lower()] = self._part.header_value
+        self._part.header_name = self._part.header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._part.headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        if name != self.field_name or b"filename" not in options:
+            return
+        if self.received is not None or self._opening is not None:
+            raise UploadError(f"Only one '{self.field_name}' file is accepted.")
+        self._part.wanted = True
+        self._opening = options[b"filename"].decode("utf-8", "replace")
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._part.wanted:
+            self._buffer.append(data[start:end])
+            self._buffered += end - start
+
+    def _on_part_end(self) -> None:
+        if self._part.wanted:
+            self._finished = True
@@ -2,36 +2,220 @@
 from __future__ import annotations
 
 import base64
-from io import BytesIO
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+from ..config import VOICE_ENGINE
 
 try:  # pragma: no cover - optional dependency
     from gtts import gTTS
 except Exception:  # pragma: no cover
     gTTS = None
 
+AUDIO_SUFFIX = ".mp3"
+READ_CHUNK_BYTES = 64 * 1024
+# One silent MPEG-1 Layer III frame (128 kbit/s, 44.1 kHz, mono): 1152 samples, ~26 ms.
+SILENT_FRAME = bytes([0xFF, 0xFB, 0x90, 0xC0]) + bytes(413)
+
+
+class GTTSEngine:
+    """Google Text-to-Speech; yields MP3 bytes as each response chunk arrives."""
+
+    name = "gTTS"
+
+    def stream(self, text: str, lang: str) -> Iterator[bytes]:
+        return gTTS(text=text, lang=lang).stream()
+
+
+class FakeSpeechEngine:
+    """
+    Offline stand-in with the same ``stream`` surface: ``frames_per_word`` silent MP3
+    frames per word of the text, pausing ``delay`` seconds per word to imitate synthesis.
+    """
+
+    name = "fake"
+
+    def __init__(self, delay: float = 0.0, frames_per_word: int = 10) -> None:
+        self.delay = delay
+        self.frames_per_word = frames_per_word
+
+    def stream(self, text: str, lang: str) -> Iterator[bytes]:
+        for _ in text.split():
+            if self.delay:
+                time.sleep(self.delay)
+            yield SILENT_FRAME * self.frames_per_word
+
+
+def audio_key(text: str, lang: str, engine: str) -> str:
+    """Content address of synthesized audio: digest of the engine, language and text."""
+    payload = json.dumps([engine, lang, text], ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class AudioCache:
+    """
+    Synthesized audio on disk, one file per content key, bounded to ``max_bytes``.
+    Files are written under a temporary name and renamed into place, so readers (other
+    workers sharing the directory included) never see a partial file. A hit refreshes
+    the file's mtime and the least recently used files are removed once over the bound.
+    """
+
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._bytes: Optional[int] = None  # measured on first write
+        self._lock = threading.Lock()
+
+    def path(self, key: str) -> Path:
+        return self.root / f"{key}{AUDIO_SUFFIX}"
+
+    def chunks(self, key: str) -> Optional[Iterator[bytes]]:
+        """The cached audio of ``key`` in chunks, or ``None`` on a miss."""
+        path = self.path(key)
+        try:
+            handle = open(path, "rb")
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        try:
+            os.utime(path)
+        except OSError:  # pruned by another worker; the open handle still reads it
+            pass
+        return _read(handle)
+
+    def store(self, key: str, chunks: Iterator[bytes]) -> Iterator[bytes]:
+        """
+        Pass ``chunks`` through while writing them to the cache. The file is kept only if
+        the stream is consumed to the end.
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        staging = self.root / f".{key}.{uuid.uuid4().hex}.tmp"
+        size = 0
+        try:
+            with open(staging, "wb") as handle:
+                for chunk in chunks:
+                    handle.write(chunk)
+                    size += len(chunk)
+                    yield chunk
+            os.replace(staging, self.path(key))
+        finally:
+            if staging.exists():  # abandoned or failed mid-stream
+                staging.unlink()
+        self._added(size)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def _added(self, size: int) -> None:
+        with self._lock:
+            if self._bytes is None:
+                self._bytes = sum(entry.stat().st_size for entry in self._files())
+            else:
+                self._bytes += size
+            if self._bytes > self.max_bytes:
+                self._prune()
+
+    def _prune(self) -> None:
+        # Re-measured from the directory, which other workers write to as well.
+        files = sorted(
+            ((entry.stat(), entry) for entry in self._files()),
+            key=lambda item: item[0].st_mtime_ns,
+        )
+        self._bytes = sum(stat.st_size for stat, _ in files)
+        for stat, entry in files:
+            if self._bytes <= self.max_bytes:
+                break
+            try:
+                entry.unlink()
+            except FileNotFoundError:
+                pass
+            self._bytes -= stat.st_size
+            self.evictions += 1
+
+    def _files(self) -> Iterator[Path]:
+        return (path for path in self.root.glob(f"*{AUDIO_SUFFIX}") if path.is_file())
+
 
 class VoiceService:
-    def __init__(self) -> None:
-        self._available = gTTS is not None
+    """
+    Text-to-speech through a pluggable engine (gTTS, or the offline fake), with
+    synthesized audio kept in a content-addressed disk cache when one is given.
+    """
+
+    def __init__(self, engine=None, cache: Optional[AudioCache] = None) -> None:
+        if engine is None:
+            if VOICE_ENGINE == "fake":
+                engine = FakeSpeechEngine()
+            elif gTTS is not None:
+                engine = GTTSEngine()
+        self.engine = engine
+        self.cache = cache
 
     @property
     def available(self) -> bool:
-        return self._available
+        return self.engine is not None
+
+    def key(self, text: str, lang: str = "en") -> str:
+        return audio_key(text, lang, self.engine.name)
+
+    def stream(self, text: str, lang: str = "en") -> Iterator[bytes]:
+        """MP3 bytes of ``text`` as they are produced, or read back from the cache."""
+        if self.cache is None:
+            return self.engine.stream(text, lang)
+        key = self.key(text, lang)
+        cached = self.cache.chunks(key)
+        if cached is not None:
+            return cached
+        return self.cache.store(key, self.engine.stream(text, lang))
 
-    def synthesize(self, text: str) -> dict:
+    def synthesize(self, text: str, lang: str = "en") -> dict:
         if not self.available:
             return {
                 "available": False,
                 "audio_base64": None,
                 "message": "gTTS not installed; use browser voice synthesis.",
             }
-        buffer = BytesIO()
-        tts = gTTS(text=text, lang="en")
-        tts.write_to_fp(buffer)
-        audio_b64 = base64.b64encode(buffer.getvalue()).decode("utf-8")
+        audio = b"".join(self.stream(text, lang))
+        audio_b64 = base64.b64encode(audio).decode("utf-8")
         return {
             "available": True,
             "audio_base64": audio_b64,
-            "message": "Synthesized via gTTS (MP3 base64).",
+            "message": f"Synthesized via {self.engine.name} (MP3 base64).",
         }
 
+    def stats(self) -> Dict:
+        return {
+            "available": self.available,
+            "engine": self.engine.name if self.engine is not None else None,
+            "cache": self.cache.stats() if self.cache is not None else None,
+        }
+
+
+def _read(handle) -> Iterator[bytes]:
+    with handle:
+        while True:
+            chunk = handle.read(READ_CHUNK_BYTES)
+            if not chunk:
+                return
+            yield chunk
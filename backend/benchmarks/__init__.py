@@ -0,0 +1 @@
+"""Engine and endpoint benchmarks at production data scale (``python -m benchmarks.run``)."""
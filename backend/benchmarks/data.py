@@ -0,0 +1,80 @@
+"""Benchmark fact tables: generated once per size as a warehouse the API opens as-is."""
+from __future__ import annotations
+
+import importlib.util
+import json
+import os
+import sys
+from dataclasses import asdict
+from datetime import date
+from pathlib import Path
+from types import ModuleType
+
+import duckdb
+
+from app.config import BASE_DIR, DATA_DIR
+from app.services.data_loader import MANIFEST_NAME, PARTITION_ROOT, DataRepository, Manifest
+
+BENCHMARK_DATA_DIR = DATA_DIR / "benchmarks"
+GENERATOR_PATH = BASE_DIR / "scripts" / "generate_sales_data.py"
+START_DATE = date(2024, 1, 1)
+DAYS = 730
+SEED = 13
+
+
+def load_generator() -> ModuleType:
+    """``scripts/generate_sales_data.py``, which is a script rather than a package module."""
+    spec = importlib.util.spec_from_file_location("generate_sales_data", GENERATOR_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module  # dataclasses look their module up while decorating
+    spec.loader.exec_module(module)
+    return module
+
+
+def warehouse_dir(rows: int, root: Path = BENCHMARK_DATA_DIR) -> Path:
+    return root / f"rows-{rows}" / "warehouse"
+
+
+def open_repository(rows: int, root: Path = BENCHMARK_DATA_DIR) -> DataRepository:
+    return DataRepository(warehouse_dir(rows, root), upload_dir=root / "uploads")
+
+
+def prepare(rows: int, root: Path = BENCHMARK_DATA_DIR, snapshot: bool = True) -> Path:
+    """
+    Generate a ``rows``-row fact table over two years into its own warehouse, unless one
+    exists from an earlier run. The manifest is written last, so an interrupted run is
+    regenerated. With ``snapshot``, the repository is opened once so the shared snapshot
+    (rows, index and cube) exists and measured processes map it the way a restarted
+    worker does.
+    """
+    warehouse = warehouse_dir(rows, root)
+    if not (warehouse / MANIFEST_NAME).exists():
+        generator = load_generator()
+        target = warehouse / PARTITION_ROOT
+        target.mkdir(parents=True, exist_ok=True)
+        entries = []
+        chunks = generator.generate_frames(START_DATE, DAYS, rows, seed=SEED)
+        for position, frame in enumerate(chunks):
+            path = target / f"part-{position:05d}.parquet"
+            _write_parquet(frame, path)
+            entries.append(
+                {
+                    "path": path.relative_to(warehouse).as_posix(),
+                    "rows": len(frame),
+                    "bytes": path.stat().st_size,
+                }
+            )
+        manifest = Manifest(version=1, files=entries)
+        staging = warehouse / f"{MANIFEST_NAME}.tmp"
+        staging.write_text(json.dumps(asdict(manifest), indent=2))
+        os.replace(staging, warehouse / MANIFEST_NAME)
+    if snapshot:
+        open_repository(rows, root).bootstrap()
+    return warehouse
+
+
+def _write_parquet(frame, path: Path) -> None:
+    con = duckdb.connect()
+    con.register("part_df", frame)
+    con.execute(f"COPY part_df TO '{path.as_posix()}' (FORMAT PARQUET)")
+    con.close()
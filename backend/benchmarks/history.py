@@ -0,0 +1,97 @@
+"""JSON history of benchmark runs and the regression check against it."""
+from __future__ import annotations
+
+import json
+import os
+import statistics
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Tracked metrics and the absolute change below which a difference is treated as noise,
+# so sub-millisecond timings cannot fail a run on a relative threshold alone.
+NOISE_FLOORS: Dict[str, float] = {
+    "p50_ms": 2.0,
+    "p95_ms": 5.0,
+    "alloc_peak_bytes": 1024 * 1024,
+    "open_seconds": 0.25,
+    "peak_rss_bytes": 32 * 1024 * 1024,
+}
+RUN_METRICS = ["open_seconds", "peak_rss_bytes"]
+TARGET_METRICS = ["p50_ms", "p95_ms", "alloc_peak_bytes"]
+
+
+def load(path: Path) -> List[Dict]:
+    if not path.exists():
+        return []
+    return json.loads(path.read_text())["runs"]
+
+
+def append(path: Path, run: Dict) -> None:
+    """Add ``run`` to the history file, replaced atomically."""
+    runs = load(path) + [run]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    staging = path.with_suffix(".json.tmp")
+    staging.write_text(json.dumps({"runs": runs}, indent=2))
+    os.replace(staging, path)
+
+
+def baseline(runs: List[Dict], run: Dict, depth: int = 3) -> Optional[Dict]:
+    """
+    Per-metric medians of the latest ``depth`` recorded runs of the same table size on a
+    comparable environment, so one slow or lucky run does not move the baseline.
+    """
+    matching = [
+        previous
+        for previous in runs
+        if previous["rows"] == run["rows"] and previous["environment"] == run["environment"]
+    ][-depth:]
+    if not matching:
+        return None
+    merged: Dict = {metric: _median(matching, metric) for metric in RUN_METRICS}
+    merged["targets"] = {}
+    for target in {name for previous in matching for name in previous["targets"]}:
+        entries = [
+            previous["targets"][target]
+            for previous in matching
+            if target in previous["targets"]
+        ]
+        merged["targets"][target] = {
+            metric: _median(entries, metric) for metric in TARGET_METRICS
+        }
+    return merged
+
+
+def regressions(run: Dict, previous: Dict, threshold: float) -> List[Dict]:
+    """
+    Metrics of ``run`` more than ``threshold`` (a fraction) worse than in ``previous`` (a
+    :func:`baseline`) and past their noise floor. Targets missing from either side are
+    not compared.
+    """
+    pairs = [(None, metric, run, previous) for metric in RUN_METRICS]
+    for target, metrics in run["targets"].items():
+        if target in previous["targets"]:
+            pairs.extend(
+                (target, metric, metrics, previous["targets"][target])
+                for metric in TARGET_METRICS
+            )
+    found = []
+    for target, metric, current, old in pairs:
+        value, before = current.get(metric), old.get(metric)
+        if value is None or before is None:
+            continue
+        if value > before * (1 + threshold) and value - before > NOISE_FLOORS[metric]:
+            found.append(
+                {
+                    "target": target,
+                    "metric": metric,
+                    "baseline": before,
+                    "value": value,
+                    "change": round(value / before - 1, 4) if before else None,
+                }
+            )
+    return found
+
+
+def _median(entries: List[Dict], metric: str) -> Optional[float]:
+    values = [entry[metric] for entry in entries if entry.get(metric) is not None]
+    return statistics.median(values) if values else None
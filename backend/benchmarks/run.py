@@ -0,0 +1,334 @@
+"""
+Time every insight engine method and data route at production table sizes.
+
+    cd backend
+    python -m benchmarks.run --rows 1M,10M,50M
+
+Each size is generated once into ``data/benchmarks/`` and measured in a fresh process,
+so peak RSS is that of one worker serving that table. Engine methods and routes are
+called in-process (routes through Starlette's ``TestClient``) under every filter mix,
+with the result cache detached so each call computes its answer. p50/p95 latency, the
+peak of Python allocations per call and the process peak RSS are appended to a JSON
+history; the run fails when a tracked metric is worse than the median of the latest
+``--baseline-runs`` comparable runs by more than ``--threshold``.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from . import history
+from .data import BENCHMARK_DATA_DIR, open_repository, prepare
+
+DEFAULT_ROWS = "1M,10M,50M"
+DEFAULT_HISTORY = Path(__file__).resolve().parent / "history.json"
+QUESTION = "Top 3 regions by revenue"
+UNITS = {"k": 1_000, "m": 1_000_000}
+
+Filters = Dict[str, object]
+
+
+def parse_rows(value: str) -> int:
+    """``"50M"`` -> 50_000_000; ``"200k"`` and plain integers are accepted too."""
+    value = value.strip().lower().replace("_", "")
+    if value[-1:] in UNITS:
+        return int(float(value[:-1]) * UNITS[value[-1]])
+    return int(value)
+
+
+def filter_mixes(options: Dict[str, list]) -> Dict[str, Filters]:
+    """
+    The filter payloads dashboards send: the date presets of the filter bar, one region,
+    several categories, and all three at once. Dates count back from the latest row.
+    """
+    latest = date.fromisoformat(options["date_range"][1])
+    region = options["regions"][:1]
+    categories = options["categories"][:2]
+
+    def last(days: int) -> Filters:
+        return {"start": latest - timedelta(days=days - 1), "end": latest}
+
+    return {
+        "all": {},
+        "last_30_days": last(30),
+        "ytd": {"start": date(latest.year, 1, 1), "end": latest},
+        "single_region": {"region": region},
+        "multi_category": {"category": categories},
+        "mixed": {**last(90), "region": region, "category": categories},
+    }
+
+
+def _window(filters: Filters) -> Tuple[Optional[date], Optional[date]]:
+    return filters.get("start"), filters.get("end")
+
+
+def _dimensions(filters: Filters) -> Filters:
+    return {key: value for key, value in filters.items() if key not in ("start", "end")}
+
+
+def _year_before(filters: Filters) -> Tuple[Optional[date], Optional[date]]:
+    start, end = _window(filters)
+    return (
+        start - timedelta(days=364) if start else None,
+        end - timedelta(days=364) if end else None,
+    )
+
+
+ENGINE_TARGETS: Dict[str, Callable] = {
+    "kpis": lambda engine, filters: engine.kpis(**filters),
+    "period_kpis": lambda engine, filters: engine.period_kpis(
+        [_window(filters), _year_before(filters)], **_dimensions(filters)
+    ),
+    "series": lambda engine, filters: engine.series(freq="M", **filters),
+    "breakdown_region": lambda engine, filters: engine.breakdown(by="region", **filters),
+    "breakdown_country": lambda engine, filters: engine.breakdown(by="country", **filters),
+    "anomalies": lambda engine, filters: engine.anomalies(**filters),
+    "anomaly_scan": lambda engine, filters: engine.anomaly_scan(**filters),
+    "recommendations": lambda engine, filters: engine.recommendations(**filters),
+    "inventory_summary": lambda engine, filters: engine.inventory_summary(**filters),
+    "inventory_series": lambda engine, filters: engine.inventory_series(**filters),
+    "supply_chain_summary": lambda engine, filters: engine.supply_chain_summary(**filters),
+    "marketing_performance": lambda engine, filters: engine.marketing_performance(**filters),
+    "dashboard": lambda engine, filters: engine.dashboard(**filters),
+    "narrative_answer": lambda engine, filters: engine.narrative_answer(QUESTION, **filters),
+}
+
+
+def _json(filters: Filters) -> Dict:
+    return {
+        key: value.isoformat() if isinstance(value, date) else value
+        for key, value in filters.items()
+    }
+
+
+def _comparison(filters: Filters) -> Dict:
+    (base_start, base_end), (start, end) = _year_before(filters), _window(filters)
+    return {
+        **_json(_dimensions(filters)),
+        "base_start": base_start and base_start.isoformat(),
+        "base_end": base_end and base_end.isoformat(),
+        "compare_start": start and start.isoformat(),
+        "compare_end": end and end.isoformat(),
+    }
+
+
+def _periods(filters: Filters) -> Dict:
+    start, end = _window(filters)
+    period = {"start": start and start.isoformat(), "end": end and end.isoformat()}
+    return {**_json(_dimensions(filters)), "periods": [period]}
+
+
+# Route, and the request body built from a filter mix (``None``: a GET without one).
+ROUTE_TARGETS: Dict[str, Tuple[str, Optional[Callable]]] = {
+    "GET /api/filters": ("/api/filters", None),
+    "GET /api/profile": ("/api/profile", None),
+    "POST /api/metrics/kpi": ("/api/metrics/kpi", _json),
+    "POST /api/metrics/series": ("/api/metrics/series", _json),
+    "POST /api/metrics/breakdown": ("/api/metrics/breakdown", _json),
+    "POST /api/metrics/periods": ("/api/metrics/periods", _periods),
+    "POST /api/comparison": ("/api/comparison", _comparison),
+    "POST /api/dashboard": ("/api/dashboard", _json),
+    "POST /api/insights/anomalies": ("/api/insights/anomalies", _json),
+    "POST /api/insights/anomalies/segments": ("/api/insights/anomalies/segments", _json),
+    "POST /api/insights/recommendations": ("/api/insights/recommendations", _json),
+    "POST /api/inventory/summary": ("/api/inventory/summary", _json),
+    "POST /api/inventory/series": ("/api/inventory/series", _json),
+    "POST /api/supply/summary": ("/api/supply/summary", _json),
+    "POST /api/marketing/performance": ("/api/marketing/performance", _json),
+    "POST /api/chat": ("/api/chat", lambda filters: {**_json(filters), "question": QUESTION}),
+}
+
+
+def _route_call(client, path: str, body: Optional[Callable], filters: Filters) -> Callable:
+    def call():
+        if body is None:
+            response = client.get(path)
+        else:
+            response = client.post(path, json=body(filters))
+        if response.status_code != 200:
+            raise RuntimeError(f"{path} answered {response.status_code}: {response.text[:200]}")
+
+    return call
+
+
+def time_call(call: Callable, repeat: int) -> Dict:
+    """p50/p95 wall time of ``repeat`` calls after one warm-up, then the allocation peak."""
+    call()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - started) * 1000)
+    tracemalloc.start()
+    try:
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "p50_ms": round(float(np.percentile(samples, 50)), 3),
+        "p95_ms": round(float(np.percentile(samples, 95)), 3),
+        "alloc_peak_bytes": int(peak),
+    }
+
+
+def peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # kilobytes on Linux
+
+
+def measure(rows: int, repeat: int, root: Path) -> Dict:
+    """Open the ``rows`` table as a worker does and time every target under every mix."""
+    # Imported here: the engine backend and chat model are read from the environment the
+    # parent prepared, and the parent process never loads the API.
+    from fastapi.testclient import TestClient
+
+    from app import main
+
+    main.repository = open_repository(rows, root)
+    targets: Dict[str, Dict] = {}
+    with TestClient(main.app) as client:
+        client.get("/api/profile")  # waits for the dataset to open
+        open_seconds = main._readiness["load_seconds"]
+        engine = main.engine
+        engine.cache = None  # measure computation, not cache lookups
+        mixes = filter_mixes(engine.filter_options())
+        for name, target in ENGINE_TARGETS.items():
+            for mix, filters in mixes.items():
+                targets[f"engine.{name}[{mix}]"] = time_call(
+                    lambda: target(engine, filters), repeat
+                )
+        for name, (path, body) in ROUTE_TARGETS.items():
+            for mix, filters in mixes.items() if body is not None else [("all", {})]:
+                targets[f"{name}[{mix}]"] = time_call(
+                    _route_call(client, path, body, filters), repeat
+                )
+    return {
+        "rows": rows,
+        "open_seconds": open_seconds,
+        "peak_rss_bytes": peak_rss_bytes(),
+        "targets": targets,
+    }
+
+
+def _in_fresh_process(function: Callable, *args):
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+        return pool.submit(function, *args).result()
+
+
+def environment(engine: str) -> Dict:
+    """What makes timings comparable: runs are only checked against a matching one."""
+    return {
+        "engine": engine,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def report(run: Dict, found: List[Dict]) -> None:
+    print(
+        f"\n{run['rows']:,} rows: opened in {run['open_seconds']}s, "
+        f"peak RSS {run['peak_rss_bytes'] / 2**20:.0f} MiB"
+    )
+    width = max(len(name) for name in run["targets"])
+    print(f"{'target':<{width}}  {'p50 ms':>10}  {'p95 ms':>10}  {'alloc MiB':>10}")
+    for name, metrics in run["targets"].items():
+        print(
+            f"{name:<{width}}  {metrics['p50_ms']:>10.2f}  {metrics['p95_ms']:>10.2f}"
+            f"  {metrics['alloc_peak_bytes'] / 2**20:>10.1f}"
+        )
+    for regression in found:
+        change = f"+{regression['change'] * 100:.0f}%" if regression["change"] else "new"
+        print(
+            f"REGRESSION {regression['target'] or 'process'} {regression['metric']}: "
+            f"{regression['baseline']} -> {regression['value']} ({change})"
+        )
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--rows", default=DEFAULT_ROWS, help="Table sizes, e.g. 1M,10M,50M.")
+    parser.add_argument("--repeat", type=int, default=10, help="Timed calls per target and mix.")
+    parser.add_argument("--engine", choices=["pandas", "duckdb"], default="pandas")
+    parser.add_argument("--history", type=Path, default=DEFAULT_HISTORY)
+    parser.add_argument("--data-dir", type=Path, default=BENCHMARK_DATA_DIR)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Fail when a metric is worse than the baseline by more than this fraction.",
+    )
+    parser.add_argument(
+        "--baseline-runs",
+        type=int,
+        default=3,
+        help="Compare against the median of this many latest comparable runs.",
+    )
+    parser.add_argument("--label", default=None, help="Free-form note stored with the run.")
+    parser.add_argument(
+        "--accept",
+        action="store_true",
+        help="Record the run even if it regressed, making it the new baseline.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    # Read by the measured processes when they import the app: a fixed backend, and the
+    # offline chat model so no answer waits on the network.
+    os.environ["RABBITT_INSIGHT_ENGINE"] = args.engine
+    os.environ["RABBITT_CHAT_MODEL"] = "fake"
+    runs = history.load(args.history)
+    failed = False
+    for rows in map(parse_rows, args.rows.split(",")):
+        _in_fresh_process(prepare, rows, args.data_dir, args.engine == "pandas")
+        run = {
+            "label": args.label,
+            "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "environment": environment(args.engine),
+            "repeat": args.repeat,
+            **_in_fresh_process(measure, rows, args.repeat, args.data_dir),
+        }
+        previous = history.baseline(runs, run, args.baseline_runs)
+        found = history.regressions(run, previous, args.threshold) if previous else []
+        report(run, found)
+        if found:
+            failed = True
+        if not found or args.accept:
+            history.append(args.history, run)
+            runs.append(run)
+    return 1 if failed and not args.accept else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
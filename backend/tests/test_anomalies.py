@@ -0,0 +1,71 @@
+import pandas as pd
+
+from app.services.anomalies import AnomalyMonitor
+from app.services.data_loader import DataRepository
+from app.services.duckdb_engine import DuckDBInsightEngine
+from app.services.insights import InsightEngine
+
+
+def test_segment_scan_matches_per_segment_requests():
+    engine = InsightEngine(DataRepository().bootstrap().frame)
+    scan = engine.anomaly_scan(metrics=["net_sales", "units_sold"], limit=25)
+    assert len(scan) == 25
+    assert [abs(row["z_score"]) for row in scan] == sorted(
+        (abs(row["z_score"]) for row in scan), reverse=True
+    )
+    for row in scan[:10]:
+        single = engine.anomalies(
+            metric=row["metric"],
+            region=[row["region"]],
+            category=[row["category"]],
+            channel=[row["channel"]],
+        )
+        match = [point for point in single if point["date"] == row["date"]]
+        assert match and match[0]["z_score"] == row["z_score"]
+        assert match[0]["value"] == row["value"]
+
+
+def test_segment_scan_agrees_across_engines():
+    repo = DataRepository()
+    pandas_engine = InsightEngine(repo.bootstrap().frame)
+    duckdb_engine = DuckDBInsightEngine(repo.fact_files())
+    filters = {"region": ["Europe"], "start": "2024-02-01"}
+    assert pandas_engine.anomaly_scan(limit=50, **filters) == duckdb_engine.anomaly_scan(
+        limit=50, **filters
+    )
+    assert pandas_engine.anomaly_scan(start="2030-01-01") == []
+
+
+def test_monitor_advances_over_uploaded_dates(tmp_path):
+    repo = DataRepository(warehouse_dir=tmp_path / "warehouse", upload_dir=tmp_path / "uploads")
+    frame = repo.bootstrap().frame
+    engine = InsightEngine(frame)
+    engine.monitor = AnomalyMonitor(metrics=["net_sales", "units_sold"])
+    engine.track_anomalies()
+
+    def fresh(metric):
+        return InsightEngine(repo.dataset.frame).anomalies(metric=metric)
+
+    assert engine.anomalies() == fresh("net_sales")
+
+    spike = frame.tail(12).copy()
+    spike["date"] = spike["date"] + pd.Timedelta(days=10)
+    spike["net_sales"] *= 40
+    late = frame.iloc[:30].copy()
+    late["date"] = late["date"] + pd.Timedelta(days=100)
+    for name, upload in (("spike.csv", spike), ("late.csv", late)):
+        repo.append_upload(upload.to_csv(index=False).encode(), name)
+        dataset = repo.dataset
+        engine.update_frame(dataset.frame, dataset.index, dataset.cube)
+        engine.track_anomalies(since=upload["date"].min())
+        assert engine.anomalies() == fresh("net_sales")
+        assert engine.anomalies(metric="units_sold") == fresh("units_sold")
+        assert engine.anomalies(shape="columns") == InsightEngine(repo.dataset.frame).anomalies(
+            shape="columns"
+        )
+
+    assert engine.anomalies()[-1]["date"] == spike["date"].max().date().isoformat()
+    # Filtered requests are still computed from the data.
+    assert engine.anomalies(region=["Europe"]) == InsightEngine(repo.dataset.frame).anomalies(
+        region=["Europe"]
+    )
@@ -0,0 +1,67 @@
+from datetime import date
+
+from app.services.data_loader import REQUIRED_COLUMNS
+from app.services.dtypes import compact_frame, concat_frames
+from app.services.insights import InsightEngine
+from benchmarks import history
+from benchmarks.data import load_generator
+from benchmarks.run import parse_rows
+
+
+def test_generated_tables_have_the_fact_schema():
+    generator = load_generator()
+    chunks = list(generator.generate_frames(date(2024, 1, 1), 10, 995, seed=3, chunk_days=4))
+    frame = compact_frame(concat_frames(chunks))
+    assert len(chunks) == 3 and len(frame) == 995
+    assert list(frame.columns) == list(REQUIRED_COLUMNS)
+    assert frame["date"].is_monotonic_increasing
+    regions = frame["region"].cat.categories
+    assert list(regions) == sorted(regions)
+    # SKU codes count days across chunks, as one row-per-day run numbers them.
+    assert frame["sku"].astype(str).str[-4:].astype(int).max() == 9
+    kpis = InsightEngine(frame).kpis()
+    assert kpis.total_units == frame["units_sold"].sum() > 0
+
+
+def _run(rows, p50, environment="ci", open_seconds=1.0):
+    return {
+        "rows": rows,
+        "environment": environment,
+        "open_seconds": open_seconds,
+        "peak_rss_bytes": 1 << 30,
+        "targets": {"engine.kpis[all]": {"p50_ms": p50, "p95_ms": p50, "alloc_peak_bytes": 0}},
+    }
+
+
+def test_regressions_are_measured_against_comparable_runs():
+    runs = [_run(1000, 10.0), _run(1000, 30.0), _run(1000, 12.0), _run(2000, 1.0)]
+    runs.append(_run(1000, 1.0, environment="laptop"))
+    previous = history.baseline(runs, _run(1000, 0))
+    assert previous["targets"]["engine.kpis[all]"]["p50_ms"] == 12.0  # median of three
+
+    assert history.regressions(_run(1000, 14.0), previous, threshold=0.2) == []
+    found = history.regressions(_run(1000, 18.0, open_seconds=1.1), previous, threshold=0.2)
+    assert [(item["target"], item["metric"]) for item in found] == [
+        ("engine.kpis[all]", "p50_ms"),
+        ("engine.kpis[all]", "p95_ms"),
+    ]
+    # Relative changes within the noise floor do not count.
+    assert history.regressions(_run(1000, 0.9), _run(1000, 0.3), threshold=0.2) == []
+    assert history.baseline(runs, _run(5000, 0)) is None
+
+
+def test_history_file_round_trip(tmp_path):
+    path = tmp_path / "history.json"
+    assert history.load(path) == []
+    history.append(path, _run(1000, 10.0))
+    history.append(path, _run(1000, 11.0))
+    assert [run["targets"]["engine.kpis[all]"]["p50_ms"] for run in history.load(path)] == [
+        10.0,
+        11.0,
+    ]
+    assert [parse_rows(value) for value in ("1M", "10m", "200k", "50_000")] == [
+        1_000_000,
+        10_000_000,
+        200_000,
+        50_000,
+    ]
@@ -0,0 +1,48 @@
+from datetime import date
+
+from app.services.cache import ResultCache
+from app.services.data_loader import DataRepository
+from app.services.insights import InsightEngine
+
+
+def build_cached_engine(max_bytes: int = 1 << 20) -> InsightEngine:
+    engine = InsightEngine(DataRepository().bootstrap().frame)
+    engine.cache = ResultCache(max_bytes)
+    return engine
+
+
+def test_equivalent_payloads_share_one_entry():
+    engine = build_cached_engine()
+    first = engine.kpis(start=date(2024, 3, 1), end="2024-03-31", region=["LATAM", "APAC"])
+    second = engine.kpis(start="2024-03-01", end=date(2024, 3, 31), region=["APAC", "LATAM"])
+    assert first is second
+    assert engine.cache.stats()["hits"] == 1
+
+
+def test_composite_insights_reuse_cached_breakdowns():
+    engine = build_cached_engine()
+    engine.breakdown("region", region=["Europe"])
+    engine.recommendations(region=["Europe"])
+    assert engine.cache.hits == 1
+
+
+def test_version_bump_drops_entries_and_oversized_results_are_skipped():
+    engine = build_cached_engine(max_bytes=4096)
+    engine.series(freq="D")  # larger than the whole budget: never stored
+    engine.kpis()
+    assert engine.cache.stats()["entries"] == 1
+    engine.cache.set_version(engine.cache.version + 1)
+    assert engine.cache.stats()["entries"] == 0
+    engine.kpis()
+    assert engine.cache.misses == 3
+
+
+def test_period_comparisons_and_single_period_kpis_share_entries():
+    engine = build_cached_engine()
+    march = engine.kpis(start="2024-03-01", end="2024-03-31", region=["Europe"])
+    base, compare = engine.period_kpis(
+        [("2024-03-01", "2024-03-31"), ("2024-04-01", "2024-04-30")], region=["Europe"]
+    )
+    assert base is march and engine.cache.hits == 1
+    assert engine.kpis(start="2024-04-01", end="2024-04-30", region=["Europe"]) is compare
+    assert engine.cache.stats()["entries"] == 2
@@ -0,0 +1,106 @@
+import threading
+import time
+
+from app.services.cache import AnswerCache
+from app.services.chat import ChatService, FakeStreamingModel
+from app.services.data_loader import DataRepository
+from app.services.insights import InsightEngine
+from app.services.sessions import SessionStore
+
+
+class CountingModel:
+    def __init__(self, delay: float = 0.0) -> None:
+        self.calls = 0
+        self.delay = delay
+
+    def predict(self, prompt: str) -> str:
+        self.calls += 1
+        time.sleep(self.delay)
+        return f" answer {self.calls} "
+
+
+def build_chat(delay: float = 0.0) -> ChatService:
+    chat = ChatService(InsightEngine(DataRepository().bootstrap().frame))
+    chat.llm = CountingModel(delay)
+    return chat
+
+
+def test_repeated_questions_reuse_the_cached_narrative():
+    chat = build_chat()
+    first = chat.ask("Which regions are leading?", region=["Europe"])
+    again = chat.ask("  which regions are LEADING ", region=["Europe"])
+    other = chat.ask("Which regions are leading?", region=["APAC"])  # different insight
+    assert first["narrative"] == again["narrative"] == "answer 1"
+    assert other["narrative"] == "answer 2"
+    assert chat.stats()["answers"]["hits"] == 1
+
+
+def test_identical_in_flight_questions_share_one_model_call():
+    chat = build_chat(delay=0.2)
+    answers = []
+    threads = [
+        threading.Thread(target=lambda: answers.append(chat.ask("How are sales trending?")))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert chat.llm.calls == 1
+    assert {answer["narrative"] for answer in answers} == {"answer 1"}
+    stats = chat.stats()["answers"]
+    assert stats["coalesced"] == 3 and stats["seconds_saved"] > 0.5
+
+
+def test_answers_expire_and_respect_size_bounds():
+    now = [0.0]
+    cache = AnswerCache(max_entries=2, max_bytes=1024, ttl_seconds=60, clock=lambda: now[0])
+    for key in ("a", "b", "c"):
+        cache.get_or_compute(key, lambda: key * 10)
+    assert cache.stats()["entries"] == 2 and cache.evictions == 1
+    now[0] = 61
+    assert cache.get_or_compute("c", lambda: "fresh") == "fresh"
+    assert cache.expirations == 1
+
+
+def test_stream_sends_insight_then_tokens_then_history():
+    chat = build_chat()
+    chat.llm = FakeStreamingModel()
+    events = list(chat.stream("Which regions are leading?", region=["Europe"]))
+    names = [name for name, _ in events]
+    assert names[0] == "insight" and names[-1] == "history"
+    assert set(names[1:-1]) == {"token"} and len(names) > 4
+    assert "narrative" not in events[0][1] and events[0][1]["type"]
+    narrative = "".join(data["text"] for name, data in events if name == "token")
+    assert events[-1][1]["narrative"] == narrative.strip()
+    assert events[-1][1]["history"][-1] == {"role": "assistant", "content": narrative.strip()}
+
+    replay = [name for name, _ in chat.stream("Which regions are leading?", region=["Europe"])]
+    assert replay == ["insight", "token", "history"]  # served whole from the answer cache
+
+
+def test_history_is_kept_per_session():
+    chat = build_chat()
+    first = chat.ask("Which regions are leading?", session_id="a")
+    chat.ask("How are sales trending?", session_id="b")
+    again = chat.ask("And in Europe?", session_id="a", region=["Europe"])
+    assert first["session_id"] == "a" and len(again["history"]) == 4
+    assert [item["content"] for item in again["history"][::2]] == [
+        "Which regions are leading?",
+        "And in Europe?",
+    ]
+    assert chat.ask("Hello")["session_id"] not in ("a", "b")  # no ID: a fresh session
+
+
+def test_idle_sessions_are_evicted_and_read_back_from_disk(tmp_path):
+    store = SessionStore(max_sessions=2, max_bytes=1024, path=tmp_path / "sessions.sqlite3")
+    for session_id in ("a", "b", "c"):
+        store.add(session_id, "user", f"question from {session_id}")
+    assert store.stats()["sessions"] == 2 and store.evictions == 1
+    assert store.history("a") == [{"role": "user", "content": "question from a"}]
+
+    store.add("d", "user", "x" * 2000)  # over the byte bound on its own
+    assert store.stats()["sessions"] == 1
+
+    reopened = SessionStore(max_sessions=2, max_bytes=1024, path=tmp_path / "sessions.sqlite3")
+    assert reopened.history("b") == [{"role": "user", "content": "question from b"}]
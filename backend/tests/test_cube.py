@@ -0,0 +1,22 @@
+import pandas as pd
+
+from app.services.cube import AggregateCube, aggregate
+from app.services.data_loader import DataRepository
+from app.services.insights import InsightEngine
+
+
+def test_cube_extend_matches_full_rebuild():
+    frame = DataRepository().bootstrap().frame
+    history, recent = frame.iloc[:-300], frame.iloc[-300:]
+    late = frame.iloc[:24].copy()  # back-filled rows for dates the cube already holds
+    cube = AggregateCube.build(history).extend(recent).extend(late)
+
+    expected = aggregate(pd.concat([frame, late], ignore_index=True))
+    pd.testing.assert_frame_equal(cube.frame, expected, check_exact=False)
+
+
+def test_engine_falls_back_to_raw_rows_for_fine_grained_breakdowns():
+    engine = InsightEngine(DataRepository().bootstrap().frame)
+    by_country = engine.breakdown(by="country", region=["Europe"])
+    assert {row["country"] for row in by_country} <= {"Germany", "France", "UK", "Spain"}
+    assert len(engine.cube.frame) <= len(engine.frame)
@@ -0,0 +1,41 @@
+import pytest
+
+from app.services.data_loader import DataRepository
+from app.services.insights import InsightEngine
+
+
+def test_dashboard_matches_individual_endpoints():
+    engine = InsightEngine(DataRepository().bootstrap().frame)
+    filters = {"start": "2024-06-01", "end": "2024-08-31", "category": ["Footwear"]}
+    widgets = engine.dashboard(**filters)
+    assert widgets["kpis"] == engine.kpis(**filters).__dict__
+    assert widgets["series"] == engine.series(**filters)
+    assert widgets["region_breakdown"] == engine.breakdown("region", **filters)
+    assert widgets["recommendations"] == engine.recommendations(**filters)
+    assert widgets["inventory_summary"] == engine.inventory_summary(**filters)
+    assert widgets["marketing"] == engine.marketing_performance(**filters)
+
+
+def test_dashboard_rejects_unknown_widgets():
+    engine = InsightEngine(DataRepository().bootstrap().frame)
+    assert list(engine.dashboard(widgets=["supply", "kpis"])) == ["supply", "kpis"]
+    with pytest.raises(ValueError):
+        engine.dashboard(widgets=["weather"])
+
+
+def test_composed_insights_filter_once_per_request():
+    engine = InsightEngine(DataRepository().bootstrap().frame)
+    calls = []
+    resolve = engine._dashboard_cells
+    engine._dashboard_cells = lambda **filters: calls.append(filters) or resolve(**filters)
+
+    filters = {"region": ["Europe"], "start": "2024-03-01"}
+    engine.recommendations(**filters)
+    engine.narrative_answer("How is inventory looking?", **filters)
+    assert len(calls) == 2
+
+    context = engine.analysis(**filters)
+    assert context.breakdown("region") == engine.breakdown("region", **filters)
+    assert context.inventory_series() == engine.inventory_series(**filters)
+    assert context.kpis() == engine.kpis(**filters)
+    assert len(calls) == 3
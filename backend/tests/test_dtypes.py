@@ -0,0 +1,39 @@
+import pandas as pd
+
+from app.services.data_loader import DataRepository
+from app.services.dtypes import compact_frame, memory_report
+
+
+def test_loaded_table_uses_compact_types_and_reports_memory():
+    frame = DataRepository().bootstrap().frame
+    assert isinstance(frame["region"].dtype, pd.CategoricalDtype)
+    assert frame["units_sold"].dtype == "int32"
+    assert frame["supply_lead_time_days"].dtype == "int16"
+    assert frame["discount_rate"].dtype == "float32"
+    assert frame["net_sales"].dtype == "float64"
+
+    report = memory_report(frame)
+    assert report["total_bytes"] == sum(column["bytes"] for column in report["columns"])
+    assert all(column["shared"] for column in report["columns"])  # served from the snapshot
+
+
+def test_uploads_keep_compact_types_when_appended(tmp_path):
+    repo = DataRepository(warehouse_dir=tmp_path / "warehouse", upload_dir=tmp_path / "uploads")
+    frame = repo.bootstrap().frame
+    upload = frame.tail(3).astype({"region": object}).copy()
+    upload["date"] = pd.Timestamp("2025-04-01")
+    upload["region"] = "Antarctica"  # a category the loaded table does not have
+    repo.append_upload(upload.to_csv(index=False).encode(), "april.csv")
+
+    combined = repo.dataset.frame
+    others = frame.columns.drop("region")
+    assert combined[others].dtypes.equals(frame[others].dtypes)
+    assert combined["region"].cat.categories.tolist() == sorted(
+        frame["region"].cat.categories.tolist() + ["Antarctica"]
+    )
+
+
+def test_values_out_of_the_narrow_range_keep_64_bits():
+    frame = compact_frame(pd.DataFrame({"units_sold": [1, 3_000_000_000], "week": [1, None]}))
+    assert frame["units_sold"].dtype == "int64"
+    assert frame["week"].dtype == "Int8"
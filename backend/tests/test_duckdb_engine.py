@@ -0,0 +1,67 @@
+import pandas as pd
+import pytest
+
+from app.services.data_loader import DataRepository
+from app.services.duckdb_engine import DuckDBInsightEngine
+from app.services.insights import InsightEngine
+
+
+def build_engines():
+    repo = DataRepository()
+    return InsightEngine(repo.bootstrap().frame), DuckDBInsightEngine(repo.fact_files())
+
+
+def test_duckdb_engine_matches_pandas_engine():
+    pandas_engine, duckdb_engine = build_engines()
+    filters = {"start": "2024-03-01", "end": "2024-05-31", "region": ["Europe", "APAC"]}
+    assert duckdb_engine.kpis(**filters) == pandas_engine.kpis(**filters)
+    assert duckdb_engine.series(**filters) == pandas_engine.series(**filters)
+    assert duckdb_engine.anomalies(**filters) == pandas_engine.anomalies(**filters)
+    assert duckdb_engine.supply_chain_summary(**filters) == pandas_engine.supply_chain_summary(
+        **filters
+    )
+    assert duckdb_engine.inventory_summary(**filters) == pandas_engine.inventory_summary(**filters)
+    assert duckdb_engine.marketing_performance(**filters) == pandas_engine.marketing_performance(
+        **filters
+    )
+
+
+def test_duckdb_breakdown_rejects_unknown_columns():
+    _, duckdb_engine = build_engines()
+    with pytest.raises(KeyError):
+        duckdb_engine.breakdown(by="region; DROP TABLE sales_fact")
+
+
+def test_period_kpis_match_single_period_calls_across_engines():
+    pandas_engine, duckdb_engine = build_engines()
+    weeks = pd.date_range("2024-10-07", periods=8, freq="W-MON")
+    shift = pd.Timedelta(weeks=26)
+    periods = [(week, week + pd.Timedelta(days=6)) for week in weeks]
+    periods += [(start - shift, end - shift) for start, end in periods]
+    periods.append((None, None))
+    filters = {"region": ["Europe"], "channel": ["Online"]}
+    blocks = pandas_engine.period_kpis(periods, **filters)
+    assert blocks == duckdb_engine.period_kpis(periods, **filters)
+    for (start, end), block in zip(periods, blocks):
+        frame = pandas_engine.frame
+        rows = frame[(frame["region"] == "Europe") & (frame["channel"] == "Online")]
+        if start is not None:
+            rows = rows[(rows["date"] >= start) & (rows["date"] <= end)]
+        assert block.total_sales == pytest.approx(rows["net_sales"].sum())
+        assert block == pandas_engine.kpis(start=start, end=end, **filters)
+
+
+def test_columns_shape_carries_the_same_rows_as_records():
+    for engine in build_engines():
+        filters = {"start": "2024-03-01", "end": "2024-05-31"}
+        for method, kwargs in [
+            (engine.series, {}),
+            (engine.breakdown, {"by": "channel"}),
+            (engine.anomalies, {}),
+            (engine.inventory_series, {}),
+            (engine.marketing_performance, {}),
+        ]:
+            rows = method(**kwargs, **filters)
+            columns = method(**kwargs, shape="columns", **filters)
+            assert rows and isinstance(columns, dict)
+            assert [dict(zip(columns, values)) for values in zip(*columns.values())] == rows
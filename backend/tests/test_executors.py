@@ -0,0 +1,53 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.executors import BoundedExecutor, ExecutorSaturated
+
+
+def test_pool_caps_concurrency_and_reports_queue_depth():
+    pool = BoundedExecutor("test", workers=2)
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def job(value):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+        return value * 2
+
+    async def main():
+        return await asyncio.gather(*(pool.run(job, value) for value in range(8)))
+
+    assert asyncio.run(main()) == [value * 2 for value in range(8)]
+    stats = pool.stats()
+    assert peak[0] == 2
+    assert stats["completed"] == 8 and stats["queued"] == 0 and stats["running"] == 0
+    assert stats["peak_queued"] >= 6
+    pool.shutdown()
+
+
+def test_full_queue_rejects_new_jobs_but_streams_run_to_completion():
+    pool = BoundedExecutor("test", workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def main():
+        blocked = asyncio.ensure_future(pool.run(release.wait))
+        await asyncio.sleep(0.01)
+        queued = asyncio.ensure_future(pool.run(lambda: "queued"))
+        await asyncio.sleep(0.01)
+        with pytest.raises(ExecutorSaturated):
+            await pool.run(lambda: "rejected")
+        release.set()
+        await blocked
+        streamed = [item async for item in pool.iterate(iter(range(3)))]
+        return await queued, streamed
+
+    assert asyncio.run(main()) == ("queued", [0, 1, 2])
+    assert pool.stats()["rejected"] == 1
+    pool.shutdown()
@@ -0,0 +1,57 @@
+import io
+import json
+
+import duckdb
+import pandas as pd
+import pytest
+
+from app.services.data_loader import DataRepository
+from app.services.duckdb_engine import DuckDBInsightEngine
+from app.services.export import ExportService
+from app.services.insights import InsightEngine
+
+
+def _stream(batches, fmt):
+    return b"".join(ExportService.stream_export(batches, fmt=fmt)["chunks"])
+
+
+def test_streamed_csv_matches_in_memory_export():
+    engine = InsightEngine(DataRepository().bootstrap().frame)
+    filters = {"region": ["Europe"], "start": "2024-03-01"}
+    expected = ExportService.export_to_csv(engine._filter_frame(**filters))
+    assert _stream(engine.export_batches(batch_rows=100, **filters), "csv") == expected
+
+
+def test_ndjson_json_and_parquet_round_trip(tmp_path):
+    engine = InsightEngine(DataRepository().bootstrap().frame)
+    filters = {"category": ["Apparel"]}
+    expected = engine._filter_frame(**filters)
+    assert 0 < len(expected) == (engine.frame["category"] == "Apparel").sum()
+
+    lines = _stream(engine.export_batches(batch_rows=64, **filters), "ndjson").splitlines()
+    assert len(lines) == len(expected)
+    records = json.loads(_stream(engine.export_batches(batch_rows=64, **filters), "json"))
+    assert [row["net_sales"] for row in records] == expected["net_sales"].tolist()
+
+    target = tmp_path / "export.parquet"
+    target.write_bytes(_stream(engine.export_batches(batch_rows=64, **filters), "parquet"))
+    loaded = duckdb.connect().execute(f"SELECT * FROM '{target.as_posix()}'").df()
+    assert len(loaded) == len(expected)
+    assert loaded["net_sales"].sum() == expected["net_sales"].sum()
+
+
+def test_duckdb_engine_streams_projected_batches():
+    repo = DataRepository()
+    engine = DuckDBInsightEngine(repo.fact_files())
+    batches = list(engine.export_batches(["date", "net_sales"], batch_rows=2048))
+    combined = pd.concat(batches, ignore_index=True)
+    assert list(combined.columns) == ["date", "net_sales"]
+    assert len(combined) == len(repo.bootstrap().frame)
+    assert pd.read_csv(io.BytesIO(_stream(iter(batches), "csv"))).shape == combined.shape
+
+
+def test_arrow_stream_round_trip():
+    pa = pytest.importorskip("pyarrow")
+    engine = InsightEngine(DataRepository().bootstrap().frame)
+    payload = _stream(engine.export_batches(batch_rows=500), "arrow")
+    assert pa.ipc.open_stream(payload).read_all().num_rows == len(engine.frame)
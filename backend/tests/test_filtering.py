@@ -0,0 +1,59 @@
+import pandas as pd
+
+from app.services.data_loader import DataRepository
+from app.services.filtering import FrameIndex
+
+
+def test_index_selection_matches_boolean_filtering():
+    frame = DataRepository().bootstrap().frame
+    index = FrameIndex(frame)
+    view = index.select(
+        start="2024-03-01",
+        end="2024-05-31",
+        region=["Europe", "APAC"],
+        channel="Online",
+    )
+    expected = frame[
+        (frame["date"] >= "2024-03-01")
+        & (frame["date"] <= "2024-05-31")
+        & frame["region"].isin(["Europe", "APAC"])
+        & (frame["channel"] == "Online")
+    ]
+    assert len(view) == len(expected)
+    assert view["net_sales"].sum() == expected["net_sales"].sum()
+    assert view.to_frame().index.equals(expected.index)
+
+
+def test_unknown_dimension_value_selects_nothing():
+    index = FrameIndex(DataRepository().bootstrap().frame)
+    assert index.select(region=["Atlantis"]).empty
+
+
+def test_date_window_resolves_to_contiguous_slice():
+    index = FrameIndex(DataRepository().bootstrap().frame)
+    window = index.date_range("2024-12-01", "2024-12-30")
+    dates = index.frame["date"].iloc[window]
+    assert index.date_sorted
+    assert dates.min() >= pd.Timestamp("2024-12-01")
+    assert len(dates) == (index.frame["date"] >= "2024-12-01").sum()
+
+
+def test_upload_of_newer_dates_extends_index(tmp_path):
+    repo = DataRepository(warehouse_dir=tmp_path / "warehouse", upload_dir=tmp_path / "uploads")
+    previous = repo.bootstrap()
+    assert previous.index.date_sorted
+
+    upload = previous.frame.tail(12).copy()
+    upload["date"] = upload["date"] + pd.Timedelta(days=1)
+    upload["region"] = "Antarctica"
+    assert repo.append_upload(upload.to_csv(index=False).encode(), "late.csv") == 12
+    dataset = repo.dataset
+
+    assert dataset.index.date_sorted
+    assert len(dataset.index.dimensions["region"].codes) == len(dataset.frame)
+    view = dataset.index.select(start="2024-12-31", region=["Antarctica"])
+    assert len(view) == 12
+    rebuilt = FrameIndex(dataset.frame).dimensions["region"]
+    extended = dataset.index.dimensions["region"]
+    for value, bitmap in zip(extended.values, extended.bitmaps):
+        assert (bitmap == rebuilt.bitmaps[rebuilt.lookup[value]]).all()
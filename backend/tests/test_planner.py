@@ -0,0 +1,43 @@
+from app.services.cache import ResultCache
+from app.services.data_loader import DataRepository
+from app.services.insights import InsightEngine
+from app.services.planner import QueryPlan, QuestionParser
+
+
+def build_engine() -> InsightEngine:
+    engine = InsightEngine(DataRepository().bootstrap().frame)
+    engine.cache = ResultCache(1 << 20)
+    return engine
+
+
+def test_slots_are_read_from_the_question():
+    parser = QuestionParser(build_engine().filter_options())
+    plan = parser.parse("Top 3 regions by units in Europe in Q2")
+    assert plan == QueryPlan(
+        intent="breakdown",
+        metric="units_sold",
+        group_by="region",
+        limit=3,
+        filters=(("end", "2024-06-30"), ("region", ("Europe",)), ("start", "2024-04-01")),
+    )
+    assert parser.parse("Show the monthly trend for Online").grain == "M"
+    assert parser.parse("Sales may slip, how are we doing?").filters == ()
+    # A named campaign is a filter, not the marketing intent.
+    assert parser.parse("How did Back-to-School sell?").intent == "kpi"
+
+
+def test_paraphrases_share_one_cached_answer():
+    engine = build_engine()
+    first = engine.narrative_answer("Top three regions by revenue for Europe in Q2?")
+    misses = engine.cache.misses
+    again = engine.narrative_answer("In Q2, what were the top 3 regions by sales in Europe")
+    assert again == first and first["type"] == "breakdown"
+    assert engine.cache.misses == misses + 1  # only the new wording is parsed
+    assert [row["region"] for row in first["data"]] == ["Europe"]
+
+
+def test_anomaly_answers_honour_filters():
+    engine = build_engine()
+    answer = engine.narrative_answer("Why did sales drop?", region=["Europe"])
+    assert answer["data"] == engine.anomalies(region=["Europe"])
+    assert answer["data"] != engine.anomalies()
@@ -0,0 +1,23 @@
+import json
+
+import pandas as pd
+
+from app.services.serialization import FastJSONResponse, head, records, shaped
+
+
+def test_records_and_columns_shapes():
+    columns = {"period": ["2024-01-01", "2024-02-01"], "value": [1.5, 2.25]}
+    assert shaped(columns) == [
+        {"period": "2024-01-01", "value": 1.5},
+        {"period": "2024-02-01", "value": 2.25},
+    ]
+    assert shaped(columns, "columns") is columns
+    assert shaped({"period": [], "value": []}, "columns") == {"period": [], "value": []}
+    assert head(columns, 1) == {"period": ["2024-01-01"], "value": [1.5]}
+    assert head(records(**columns), 1) == [{"period": "2024-01-01", "value": 1.5}]
+
+
+def test_fast_response_encodes_numpy_scalars():
+    frame = pd.DataFrame({"units": [3, 4], "sales": [1.25, float("nan")]})
+    body = FastJSONResponse({"units": frame["units"].sum(), "rows": len(frame)}).body
+    assert json.loads(body) == {"units": 7, "rows": 2}
@@ -0,0 +1,43 @@
+import asyncio
+import io
+
+from app.services.transcribe import FakeTranscriber, TranscriptionService
+
+
+class PeakTranscriber(FakeTranscriber):
+    def __init__(self, delay: float) -> None:
+        super().__init__(delay)
+        self.running = 0
+        self.peak = 0
+
+    async def transcribe(self, audio, filename, language):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            return await super().transcribe(audio, filename, language)
+        finally:
+            self.running -= 1
+
+
+def test_concurrent_calls_are_capped_per_process():
+    backend = PeakTranscriber(delay=0.02)
+    service = TranscriptionService(backend, max_concurrency=2, timeout_seconds=5)
+
+    async def main():
+        return await asyncio.gather(
+            *(service.transcribe(io.BytesIO(b"x" * size), "clip.webm") for size in range(1, 7))
+        )
+
+    results = asyncio.run(main())
+    assert [result["text"] for result in results][:2] == [
+        "Transcribed 1 bytes of clip.webm.",
+        "Transcribed 2 bytes of clip.webm.",
+    ]
+    assert backend.peak == 2 and service.stats()["completed"] == 6
+
+
+def test_slow_calls_time_out():
+    service = TranscriptionService(FakeTranscriber(delay=1.0), timeout_seconds=0.05)
+    result = asyncio.run(service.transcribe(io.BytesIO(b"audio"), "clip.webm"))
+    assert not result["success"] and "timed out" in result["message"]
+    assert service.stats()["timeouts"] == 1 and service.stats()["in_flight"] == 0
@@ -0,0 +1,86 @@
+import asyncio
+
+import pandas as pd
+import pytest
+
+from app.services.data_loader import DataRepository
+from app.services.uploads import FileReceiver, UploadError
+
+BOUNDARY = "rabbittboundary"
+
+
+def _body(*parts):
+    chunks = []
+    for name, filename, data in parts:
+        disposition = f'form-data; name="{name}"'
+        if filename is not None:
+            disposition += f'; filename="{filename}"'
+        chunks.append(f"--{BOUNDARY}\r\nContent-Disposition: {disposition}\r\n\r\n".encode())
+        chunks.append(data + b"\r\n")
+    chunks.append(f"--{BOUNDARY}--\r\n".encode())
+    return b"".join(chunks)
+
+
+async def _stream(body, size, limit=None):
+    for start in range(0, len(body), size):
+        if limit is not None and start >= limit:
+            raise OverflowError("too large")
+        await asyncio.sleep(0)  # let concurrent uploads interleave
+        yield body[start : start + size]
+
+
+def _receiver(target):
+    return FileReceiver(
+        f"multipart/form-data; boundary={BOUNDARY}", "file", target, buffer_bytes=16
+    )
+
+
+def _receive(tmp_path, body, size=7, limit=None):
+    receiver = _receiver(lambda filename: tmp_path / filename)
+    return asyncio.run(receiver.receive(_stream(body, size, limit)))
+
+
+def test_file_part_streams_to_its_target(tmp_path):
+    data = b"date,region\n" + b"2024-01-01,Europe\n" * 50
+    body = _body(("note", None, b"ignored"), ("file", "sales.csv", data))
+    received = _receive(tmp_path, body)
+    assert (received.filename, received.size) == ("sales.csv", len(data))
+    assert received.path.read_bytes() == data
+    assert [path.name for path in tmp_path.iterdir()] == ["sales.csv"]
+
+
+def test_failed_upload_leaves_nothing_behind(tmp_path):
+    body = _body(("file", "big.csv", b"x" * 500))
+    with pytest.raises(OverflowError):
+        _receive(tmp_path, body, limit=200)
+    with pytest.raises(UploadError):
+        _receive(tmp_path, _body(("other", "a.csv", b"x")))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_concurrent_uploads_of_one_filename_ingest_their_own_rows(tmp_path):
+    repo = DataRepository(warehouse_dir=tmp_path / "warehouse", upload_dir=tmp_path / "uploads")
+    frame = repo.bootstrap().frame
+    uploads = []
+    for rows, day in ((30, "2025-06-01"), (50, "2025-06-02")):
+        upload = frame.tail(rows).copy()
+        upload["date"] = pd.Timestamp(day)
+        uploads.append(upload.to_csv(index=False).encode())
+
+    async def main():
+        return await asyncio.gather(
+            *(
+                _receiver(repo.upload_path).receive(
+                    _stream(_body(("file", "sales.csv", data)), 4096)
+                )
+                for data in uploads
+            )
+        )
+
+    received = asyncio.run(main())
+    assert [item.filename for item in received] == ["sales.csv", "sales.csv"]
+    assert received[0].path != received[1].path
+    assert [item.path.read_bytes() for item in received] == uploads
+    assert [item.size for item in received] == [len(data) for data in uploads]
+    assert [repo.ingest_csv(item.path) for item in received] == [30, 50]
+    assert len(repo.dataset.frame) == len(frame) + 80
@@ -0,0 +1,38 @@
+from app.services.voice import SILENT_FRAME, AudioCache, FakeSpeechEngine, VoiceService
+
+
+class CountingEngine(FakeSpeechEngine):
+    def __init__(self) -> None:
+        super().__init__(frames_per_word=2)
+        self.calls = 0
+
+    def stream(self, text, lang):
+        self.calls += 1
+        return super().stream(text, lang)
+
+
+def test_repeated_text_is_served_from_the_disk_cache(tmp_path):
+    engine = CountingEngine()
+    voice = VoiceService(engine, AudioCache(tmp_path, max_bytes=1 << 20))
+    first = b"".join(voice.stream("Sales reached four million", "en"))
+    again = b"".join(voice.stream("Sales reached four million", "en"))
+    assert first == again == SILENT_FRAME * 8
+    assert engine.calls == 1 and voice.cache.hits == 1
+    assert voice.synthesize("Sales reached four million")["available"]
+    assert engine.calls == 1
+    b"".join(voice.stream("Sales reached four million", "de"))  # another language
+    assert engine.calls == 2
+
+
+def test_cache_is_size_bounded_and_keeps_only_complete_audio(tmp_path):
+    cache = AudioCache(tmp_path, max_bytes=len(SILENT_FRAME) * 9)  # two answers fit
+    voice = VoiceService(CountingEngine(), cache)
+    for text in ("one two", "three four", "five six"):
+        b"".join(voice.stream(text))
+    assert cache.evictions == 1 and len(list(tmp_path.glob("*.mp3"))) == 2
+
+    partial = voice.stream("seven eight nine")
+    next(partial)
+    partial.close()  # client went away mid-stream
+    assert len(list(tmp_path.iterdir())) == 2
+    assert cache.chunks(voice.key("seven eight nine")) is None
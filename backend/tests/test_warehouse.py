@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+
+from app.config import FACT_TABLE_PATH
+from app.services.data_loader import DataRepository, _write_parquet
+
+
+def _repository(tmp_path) -> DataRepository:
+    return DataRepository(warehouse_dir=tmp_path / "warehouse", upload_dir=tmp_path / "uploads")
+
+
+def test_uploads_append_partition_files_and_publish_manifest(tmp_path):
+    repo = _repository(tmp_path)
+    seeded = repo.bootstrap()
+    version, files = repo.version, repo.fact_files()
+    assert all("year=" in path.as_posix() for path in files)
+
+    upload = seeded.frame.tail(5).copy()
+    upload["date"] = pd.Timestamp("2025-03-15")
+    assert repo.append_upload(upload.to_csv(index=False).encode(), "march.csv") == 5
+
+    assert repo.version == version + 1
+    added = set(repo.fact_files()) - set(files)
+    assert len(added) == 1 and "year=2025/month=03" in next(iter(added)).as_posix()
+    assert set(files) <= set(repo.fact_files())  # existing files are never rewritten
+
+    reopened = _repository(tmp_path)
+    assert reopened.version == repo.version
+    assert len(reopened.bootstrap().frame) == len(seeded.frame) + 5
+
+
+def test_compaction_merges_small_files_per_partition(tmp_path):
+    repo = _repository(tmp_path)
+    frame = repo.bootstrap().frame
+    upload = frame.tail(3).copy()
+    upload["date"] = pd.Timestamp("2025-01-10")
+    for name in ("a.csv", "b.csv", "c.csv"):
+        repo.append_upload(upload.to_csv(index=False).encode(), name)
+    before = repo.fact_files()
+
+    assert repo.compact(min_files=3)
+    files = repo.fact_files()
+    assert len([path for path in files if "year=2025/month=01" in path.as_posix()]) == 1
+    assert all(path.exists() for path in before)  # retired files outlive one version
+
+    reloaded = repo.refresh().frame
+    assert len(reloaded) == len(frame) + 9
+    assert reloaded["date"].is_monotonic_increasing
+
+    repo.compact(min_files=3)
+    assert not any(path.exists() for path in set(before) - set(files))
+
+
+def test_csv_ingest_streams_in_bounded_batches(tmp_path):
+    repo = _repository(tmp_path)
+    frame = repo.bootstrap().frame
+    upload = frame.tail(25).copy()
+    upload["date"] = upload["date"] + pd.Timedelta(days=30)
+    path = repo.upload_path("../stream.csv")
+    upload.to_csv(path, index=False)
+    assert path.parent == repo.upload_dir
+
+    progress = repo.track_ingest(path.name, path.stat().st_size)
+    assert repo.ingest_csv(path, batch_rows=10, progress=progress) == 25
+    assert (progress.batches, progress.rows, progress.done) == (3, 25, True)
+    assert progress.bytes_read == progress.total_bytes
+
+    dataset = repo.dataset
+    assert len(dataset.frame) == len(frame) + 25
+    assert dataset.frame["date"].is_monotonic_increasing
+    assert len(repo.refresh().frame) == len(frame) + 25
+
+
+def test_workers_share_one_mapped_snapshot_and_follow_new_versions(tmp_path):
+    writer, reader = _repository(tmp_path), _repository(tmp_path)
+    frame = writer.bootstrap().frame
+    mapped = reader.bootstrap().frame
+    numeric = mapped.select_dtypes("number").columns
+    assert all(isinstance(mapped[column].to_numpy().base, np.memmap) for column in numeric)
+    assert list(mapped.columns) == list(frame.columns)
+    assert mapped["region"].tolist() == frame["region"].tolist()
+
+    upload = frame.tail(4).copy()
+    upload["date"] = pd.Timestamp("2025-02-01")
+    writer.append_upload(upload.to_csv(index=False).encode(), "feb.csv")
+    assert reader.stale() and not writer.stale()
+    # The upload is not re-snapshotted on the request path; the reader keeps its version.
+    assert not reader.can_follow() and not reader.follow()
+    assert reader.published_key() == writer.snapshot_key != reader.snapshot_key
+    assert len(reader.dataset.frame) == len(frame)
+
+    assert writer.compact()  # the background job writes the snapshot
+    assert isinstance(writer.dataset.frame["net_sales"].to_numpy().base, np.memmap)
+    assert reader.can_follow()
+    assert reader.follow() and not reader.stale()
+    followed = reader.dataset.frame
+    assert len(followed) == len(frame) + 4
+    assert isinstance(followed["net_sales"].to_numpy().base, np.memmap)
+
+    writer.append_upload(upload.to_csv(index=False).encode(), "feb-2.csv")
+    assert reader.follow(grace_seconds=0)  # no snapshot in time: read the warehouse
+    assert len(reader.dataset.frame) == len(frame) + 8
+
+
+def test_snapshots_are_keyed_by_warehouse_contents_not_version(tmp_path):
+    seed = _repository(tmp_path / "seed").bootstrap().frame
+    legacy = tmp_path / "warehouse" / FACT_TABLE_PATH.name
+    legacy.parent.mkdir(parents=True)
+    _write_parquet(seed.head(10), legacy)
+    assert len(_repository(tmp_path).bootstrap().frame) == 10
+    assert len(_repository(tmp_path).bootstrap().frame) == 10  # snapshot reused
+
+    # A replaced legacy table still reports version 0; its snapshot must not be reused.
+    _write_parquet(seed.head(20), legacy)
+    repo = _repository(tmp_path)
+    assert repo.version == 0
+    assert len(repo.bootstrap().frame) == 20
+
+
+def test_concurrent_publishes_keep_every_workers_files(tmp_path):
+    first, second = _repository(tmp_path), _repository(tmp_path)
+    frame = first.bootstrap().frame
+    second.bootstrap()
+    upload = frame.tail(2).copy()
+    upload["date"] = pd.Timestamp("2025-05-01")
+    first.append_upload(upload.to_csv(index=False).encode(), "first.csv")
+    # ``second`` has not followed the new version; its publish still builds on it.
+    second.append_upload(upload.to_csv(index=False).encode(), "second.csv")
+    assert second.version == first.version + 1
+    assert set(first.fact_files()) < set(second.fact_files())
+    assert second.stale()
+    assert len(second.dataset.frame) == len(frame) + 4
+    assert len(_repository(tmp_path).bootstrap().frame) == len(frame) + 4
+
+
+def test_restart_reopens_persisted_index_and_cube(tmp_path):
+    built = _repository(tmp_path).bootstrap()
+    reopened = _repository(tmp_path).bootstrap()
+    assert {"index", "cube"} <= set(reopened.__dict__)  # mapped, not rebuilt lazily
+    assert isinstance(reopened.index.dimensions["region"].bitmaps[0], np.memmap)
+    assert isinstance(reopened.cube.frame["net_sales"].to_numpy().base, np.memmap)
+    assert reopened.cube.frame.equals(built.cube.frame)
+    april = {"start": "2024-04-01", "end": "2024-04-30", "region": ["Europe"]}
+    assert len(reopened.index.select(**april)) == len(built.index.select(**april))
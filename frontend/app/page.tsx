@@ -21,19 +21,7 @@ import { KpiGrid } from '../components/KpiGrid';
 import { TrendChart } from '../components/TrendChart';
 import { BreakdownChart } from '../components/BreakdownChart';
 import { ChatPanel } from '../components/ChatPanel';
-import {
-  fetchAnomalies,
-  fetchBreakdown,
-  fetchFilters,
-  fetchInventorySeries,
-  fetchInventorySummary,
-  fetchKpis,
-  fetchMarketingPerformance,
-  fetchRecommendations,
-  fetchSeries,
-  fetchSupplySummary,
-  KPIBlock,
-} from '../lib/api';
+import { fetchDashboard, fetchFilters, KPIBlock } from '../lib/api';
 import { PersonaOption, PersonaSelector } from '../components/PersonaSelector';
 import { ThemeToggle } from '../components/ThemeToggle';
 import { InsightHighlights } from '../components/InsightHighlights';
@@ -167,29 +155,18 @@ export default function DashboardPage() {
     setLoading(true);
     try {
       const payload = serializeFilters(nextFilters);
-      const [
-        kpiData,
-        seriesData,
-        regionData,
-        categoryData,
-        recs,
-        anomalyData,
-        inventorySummaryData,
-        inventorySeriesData,
-        supplyData,
-        marketingData,
-      ] = await Promise.all([
-        fetchKpis(payload),
-        fetchSeries(payload),
-        fetchBreakdown(payload, 'region'),
-        fetchBreakdown(payload, 'category'),
-        fetchRecommendations(payload),
-        fetchAnomalies(payload),
-        fetchInventorySummary(payload),
-        fetchInventorySeries(payload),
-        fetchSupplySummary(payload),
-        fetchMarketingPerformance(payload),
-      ]);
+      const {
+        kpis: kpiData,
+        series: seriesData,
+        region_breakdown: regionData,
+        category_breakdown: categoryData,
+        recommendations: recs,
+        anomalies: anomalyData,
+        inventory_summary: inventorySummaryData,
+        inventory_series: inventorySeriesData,
+        supply: supplyData,
+        marketing: marketingData,
+      } = await fetchDashboard(payload);
       setKpis(kpiData);
       setSeries(seriesData);
       setRegionSplit(regionData);
@@ -14,7 +14,7 @@ import {
 } from '@chakra-ui/react';
 import { useRef, useState } from 'react';
 import { FiMic, FiSend, FiVolume2 } from 'react-icons/fi';
-import { askChat, synthesizeVoice, transcribeAudio } from '../lib/api';
+import { streamChat, transcribeAudio, voiceStreamUrl } from '../lib/api';
 
 type Message = {
   role: 'user' | 'assistant';
@@ -33,6 +33,8 @@ export function ChatPanel({ filters, quickPrompts = [] }: Props) {
   const [isRecording, setIsRecording] = useState(false);
   const mediaRecorderRef = useRef<MediaRecorder | null>(null);
   const audioChunksRef = useRef<Blob[]>([]);
+  // Assigned by the backend on the first answer; keeps this panel's history separate.
+  const sessionIdRef = useRef<string | undefined>(undefined);
   const toast = useToast();
   const cardBg = useColorModeValue('white', 'gray.800');
   const borderColor = useColorModeValue('gray.100', 'gray.700');
@@ -47,11 +49,29 @@ export function ChatPanel({ filters, quickPrompts = [] }: Props) {
     setLoading(true);
     const question = input.trim();
     setInput('');
-    setMessages((prev) => [...prev, { role: 'user', content: question }]);
+    setMessages((prev) => [
+      ...prev,
+      { role: 'user', content: question },
+      { role: 'assistant', content: '' },
+    ]);
+    // Tokens extend the trailing assistant message as they arrive.
+    const updateAnswer = (update: (content: string) => string) =>
+      setMessages((prev) => {
+        const last = prev[prev.length - 1];
+        return [...prev.slice(0, -1), { ...last, content: update(last.content) }];
+      });
     try {
-      const response = await askChat({ question, ...filters });
-      setMessages((prev) => [...prev, { role: 'assistant', content: response.narrative }]);
-      speakResponse(response.narrative);
+      await streamChat(
+        { question, session_id: sessionIdRef.current, ...filters },
+        {
+          onToken: (text) => updateAnswer((content) => content + text),
+          onHistory: (narrative, _history, sessionId) => {
+            sessionIdRef.current = sessionId;
+            updateAnswer(() => narrative);
+            speakResponse(narrative);
+          },
+        },
+      );
     } catch (err) {
       toast({
         title: 'Chat failed',
@@ -65,16 +85,15 @@ export function ChatPanel({ filters, quickPrompts = [] }: Props) {
 
   const speakResponse = async (text: string) => {
     try {
-      const voice = await synthesizeVoice(text);
-      if (voice.available && voice.audio_base64) {
-        const audio = new Audio(`data:audio/mp3;base64,${voice.audio_base64}`);
-        await audio.play();
-      } else if (typeof window !== 'undefined' && 'speechSynthesis' in window) {
+      await new Audio(voiceStreamUrl(text)).play();
+    } catch (err) {
+      // Server-side synthesis unavailable (503) or unplayable: use the browser voice.
+      if (typeof window !== 'undefined' && 'speechSynthesis' in window) {
         const utterance = new SpeechSynthesisUtterance(text);
         window.speechSynthesis.speak(utterance);
+      } else {
+        console.warn('Voice synthesis failed', err);
       }
-    } catch (err) {
-      console.warn('Voice synthesis failed', err);
     }
   };
 
@@ -69,6 +69,8 @@ export function ExportMenu({ filters }: Props) {
       <MenuList bg={menuBg}>
         <MenuItem onClick={() => handleExport('csv')}>Export as CSV</MenuItem>
         <MenuItem onClick={() => handleExport('json')}>Export as JSON</MenuItem>
+        <MenuItem onClick={() => handleExport('ndjson')}>Export as NDJSON</MenuItem>
+        <MenuItem onClick={() => handleExport('parquet')}>Export as Parquet</MenuItem>
         <MenuItem onClick={() => handleExport('excel')}>Export as Excel</MenuItem>
       </MenuList>
     </Menu>
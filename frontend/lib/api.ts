@@ -44,6 +44,34 @@ export async function fetchBreakdown(filters: Record<string, unknown>, groupBy =
   return (await res.json()).data as { [key: string]: string | number }[];
 }
 
+export type DashboardWidgets = {
+  kpis: KPIBlock;
+  series: { period: string; value: number }[];
+  region_breakdown: { [key: string]: string | number }[];
+  category_breakdown: { [key: string]: string | number }[];
+  recommendations: string[];
+  anomalies: { date: string; metric: string; value: number; z_score: number }[];
+  inventory_summary: any;
+  inventory_series: { date: string; inventory: number; forecast: number }[];
+  supply: any;
+  marketing: {
+    campaign_name: string;
+    net_sales: number;
+    marketing_spend: number;
+    roi: number;
+  }[];
+};
+
+export async function fetchDashboard(filters: Record<string, unknown>) {
+  const res = await fetch(`${API_BASE}/api/dashboard`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(filters),
+  });
+  if (!res.ok) throw new Error("Failed to load dashboard");
+  return (await res.json()).widgets as DashboardWidgets;
+}
+
 export async function askChat(payload: Record<string, unknown>) {
   const res = await fetch(`${API_BASE}/api/chat`, {
     method: "POST",
@@ -54,6 +82,50 @@ export async function askChat(payload: Record<string, unknown>) {
   return res.json();
 }
 
+export type ChatStreamHandlers = {
+  onInsight?: (insight: Record<string, unknown>) => void;
+  onToken: (text: string) => void;
+  onHistory?: (
+    narrative: string,
+    history: { role: string; content: string }[],
+    sessionId: string,
+  ) => void;
+};
+
+export async function streamChat(payload: Record<string, unknown>, handlers: ChatStreamHandlers) {
+  const res = await fetch(`${API_BASE}/api/chat/stream`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(payload),
+  });
+  if (!res.ok || !res.body) throw new Error("Chat request failed");
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let boundary = buffer.indexOf("\n\n");
+    while (boundary !== -1) {
+      const frame = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf("\n\n");
+      let event = "message";
+      let data = "";
+      for (const line of frame.split("\n")) {
+        if (line.startsWith("event: ")) event = line.slice(7);
+        else if (line.startsWith("data: ")) data += line.slice(6);
+      }
+      const parsed = data ? JSON.parse(data) : {};
+      if (event === "insight") handlers.onInsight?.(parsed);
+      else if (event === "token") handlers.onToken(parsed.text);
+      else if (event === "history") handlers.onHistory?.(parsed.narrative, parsed.history, parsed.session_id);
+      else if (event === "error") throw new Error(parsed.detail ?? "Chat request failed");
+    }
+  }
+}
+
 export async function synthesizeVoice(text: string) {
   const res = await fetch(`${API_BASE}/api/voice/speak`, {
     method: "POST",
@@ -64,6 +136,12 @@ export async function synthesizeVoice(text: string) {
   return res.json();
 }
 
+// MP3 streamed while it is synthesized; an <audio> element can start playing right away.
+export function voiceStreamUrl(text: string, lang = "en") {
+  const params = new URLSearchParams({ text, lang });
+  return `${API_BASE}/api/voice/speak/stream?${params}`;
+}
+
 export async function transcribeAudio(blob: Blob) {
   const formData = new FormData();
   formData.append("file", blob, "recording.webm");
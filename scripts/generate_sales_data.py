@@ -12,11 +12,12 @@ from __future__ import annotations
 
 import argparse
 import csv
+import math
 import random
 from dataclasses import dataclass
 from datetime import date, timedelta
 from pathlib import Path
-from typing import List, Sequence
+from typing import Iterator, List, Sequence
 
 
 REGIONS = {
@@ -149,6 +150,108 @@ def generate_records(start: date, days: int, *, seed: int) -> Sequence[Record]:
     return records
 
 
+def generate_frame(
+    start: date, days: int, rows_per_day: int, *, seed: int, first_day: int = 0
+):
+    """
+    The same distributions as :func:`generate_records`, drawn column-wise with numpy for
+    ``rows_per_day`` rows a day, so benchmark-scale tables (tens of millions of rows) are
+    generated in seconds. Text columns come back categorical; ``first_day`` is the day
+    number of ``start`` in a longer run, which SKU codes count from.
+    """
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    rows = days * rows_per_day
+    offset = np.repeat(np.arange(days, dtype=np.int32), rows_per_day)
+    dates = pd.Timestamp(start) + pd.to_timedelta(offset, unit="D")
+    month = dates.month.to_numpy()
+    season = np.array([_seasonality_multiplier(value) for value in range(1, 13)])[month - 1]
+
+    regions = list(REGIONS)
+    countries = [country for region in regions for country in REGIONS[region]]
+    country_counts = np.array([len(REGIONS[region]) for region in regions])
+    country_starts = np.concatenate([[0], np.cumsum(country_counts)[:-1]])
+    categories = list(CATEGORIES)
+    subcategories = [sub for category in categories for sub in CATEGORIES[category]]
+    campaigns = [name for category in categories for name in CAMPAIGNS[category]]
+
+    region = rng.integers(0, len(regions), rows)
+    country = country_starts[region] + (rng.random(rows) * country_counts[region]).astype(int)
+    category = rng.integers(0, len(categories), rows)
+    subcategory = category * 3 + rng.integers(0, 3, rows)
+    channel = rng.integers(0, len(CHANNELS), rows)
+    promo = rng.choice(len(PROMO_TYPES), rows, p=[0.60, 0.15, 0.10, 0.10, 0.05])
+
+    promo_boost = np.where(promo != 0, 1.2, 1.0)
+    weekday_boost = np.where(np.isin(dates.weekday, (4, 5)), 1.3, 1.0)
+    units = (rng.integers(20, 121, rows) * season * promo_boost * weekday_boost).astype(np.int64)
+    price = np.array([_category_price(name) for name in categories])[category]
+    discount_rate = np.where(promo == 0, 0.05, rng.uniform(0.1, 0.35, rows))
+    net_sales = units * price * (1 - discount_rate)
+    marketing = rng.uniform(200, 1500, rows) * season
+    forecast = np.maximum((units * rng.uniform(0.9, 1.25, rows)).astype(np.int64), units + 5)
+    inventory = np.maximum(forecast - units + rng.integers(20, 81, rows), 0)
+    backorder = np.maximum(units - inventory, 0) / np.maximum(inventory + 1, units)
+
+    sku_names = [
+        f"{categories[position // 3][:3].upper()}-{subcategory_code(sub)}-{first_day + day:04d}"
+        for position, sub in enumerate(subcategories)
+        for day in range(days)
+    ]
+
+    def labels(codes, names):
+        # Sorted categories group in the same order as the plain strings of the CSV.
+        values = pd.Categorical.from_codes(codes, categories=pd.Index(names, dtype=object))
+        return values.set_categories(sorted(names))
+
+    return pd.DataFrame(
+        {
+            "date": dates,
+            "week": dates.isocalendar().week.to_numpy().astype(np.int64),
+            "month": month.astype(np.int64),
+            "quarter": labels((month - 1) // 3, ["Q1", "Q2", "Q3", "Q4"]),
+            "region": labels(region, regions),
+            "country": labels(country, countries),
+            "channel": labels(channel, CHANNELS),
+            "category": labels(category, categories),
+            "subcategory": labels(subcategory, subcategories),
+            "sku": labels(subcategory * days + offset, sku_names),
+            "promo_flag": labels(promo, PROMO_TYPES),
+            "units_sold": units,
+            "net_sales": np.round(net_sales, 2),
+            "discount_rate": np.round(discount_rate, 2),
+            "marketing_spend": np.round(marketing, 2),
+            "inventory_level": inventory,
+            "forecast_demand": forecast,
+            "supply_lead_time_days": rng.integers(5, 21, rows),
+            "fulfillment_rate": np.round(rng.uniform(0.9, 0.99, rows), 2),
+            "backorder_rate": np.round(backorder, 2),
+            "campaign_name": labels(category * 3 + rng.integers(0, 3, rows), campaigns),
+            "marketing_roi": np.round((net_sales - marketing) / marketing, 2),
+        }
+    )
+
+
+def generate_frames(
+    start: date, days: int, total_rows: int, *, seed: int, chunk_days: int = 30
+) -> Iterator:
+    """:func:`generate_frame` for ``total_rows`` rows over ``days`` days, a month at a time."""
+    rows_per_day = max(1, math.ceil(total_rows / days))
+    remaining = total_rows
+    for first in range(0, days, chunk_days):
+        if remaining <= 0:
+            return
+        span = min(chunk_days, days - first)
+        frame = generate_frame(
+            start + timedelta(days=first), span, rows_per_day, seed=seed + first, first_day=first
+        )
+        frame = frame.iloc[:remaining]
+        remaining -= len(frame)
+        yield frame
+
+
 def _seasonality_multiplier(month: int) -> float:
     if month in (11, 12):  # holiday lift
         return 1.4
@@ -208,6 +311,13 @@ def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Generate synthetic sales data.")
     parser.add_argument("--out", default="data/sales_seed.csv", help="Output CSV path.")
     parser.add_argument("--rows", type=int, default=365, help="Number of days to simulate.")
+    parser.add_argument(
+        "--total-rows",
+        type=int,
+        default=None,
+        help="Generate this many rows spread over the simulated days (vectorized, for "
+        "benchmark-scale tables) instead of one row per region and category a day.",
+    )
     parser.add_argument("--seed", type=int, default=42, help="Random seed.")
     parser.add_argument(
         "--start-date",
@@ -220,6 +330,15 @@ def parse_args() -> argparse.Namespace:
 def main() -> None:
     args = parse_args()
     start = date.fromisoformat(args.start_date)
+    if args.total_rows:
+        path = Path(args.out)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        written = 0
+        for frame in generate_frames(start, args.rows, args.total_rows, seed=args.seed):
+            frame.to_csv(path, mode="a" if written else "w", header=not written, index=False)
+            written += len(frame)
+        print(f"Wrote {written} rows to {args.out}")
+        return
     records = generate_records(start, args.rows, seed=args.seed)
     write_csv(records, Path(args.out))
     print(f"Wrote {len(records)} rows to {args.out}")